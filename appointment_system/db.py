@@ -0,0 +1,16 @@
+"""
+Database connection setup.
+
+configure_sqlite() is connected to connection_created (see
+booking.apps) and applies settings.SQLITE_PRAGMAS to each new SQLite
+connection. It does nothing for other backends.
+"""
+from django.conf import settings
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
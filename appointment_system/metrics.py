@@ -0,0 +1,166 @@
+"""
+In-process request metrics rendered in the Prometheus text format.
+
+RequestMetricsMiddleware records one observation per request into the
+module level registry. The metrics view renders, per endpoint, summaries
+of wall time, database time and query count with p50/p95/p99 quantiles
+taken over the most recent observations. Other apps can add their own
+series with register_collector().
+
+Metrics are per process; scrape every worker (or run one) to aggregate.
+"""
+import hmac
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Number of recent observations per endpoint the quantiles are computed from
+WINDOW_SIZE = 1024
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+SERIES = (
+    ('http_request_duration_seconds', 'Wall time spent handling requests.'),
+    ('http_request_db_duration_seconds', 'Time spent in database queries per request.'),
+    ('http_request_db_queries', 'Number of database queries per request.'),
+)
+
+
+class Summary:
+    """Count, sum and a sliding window of recent values for one series."""
+
+    __slots__ = ('count', 'total', 'window')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.window = deque(maxlen=WINDOW_SIZE)
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.window.append(value)
+
+    def quantiles(self):
+        values = sorted(self.window)
+        if not values:
+            return {}
+        return {q: values[min(len(values) - 1, int(q * len(values)))] for q in QUANTILES}
+
+
+class Registry:
+    """Thread-safe per-endpoint summaries of request timings."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._collectors = []
+
+    def observe(self, endpoint, method, status, duration, db_duration, db_queries):
+        with self._lock:
+            key = (endpoint, method)
+            if key not in self._endpoints:
+                self._endpoints[key] = {
+                    'summaries': {name: Summary() for name, _ in SERIES},
+                    'statuses': {},
+                }
+            entry = self._endpoints[key]
+            summaries = entry['summaries']
+            summaries['http_request_duration_seconds'].observe(duration)
+            summaries['http_request_db_duration_seconds'].observe(db_duration)
+            summaries['http_request_db_queries'].observe(db_queries)
+            entry['statuses'][status] = entry['statuses'].get(status, 0) + 1
+
+    def register_collector(self, collector):
+        """
+        Add a callable returning extra (name, help, type, [(labels, value), ...])
+        tuples to include in every rendering.
+        """
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def render(self):
+        """Render all series in the Prometheus text exposition format."""
+        with self._lock:
+            endpoints = {
+                key: (
+                    {name: (s.count, s.total, s.quantiles()) for name, s in entry['summaries'].items()},
+                    dict(entry['statuses']),
+                )
+                for key, entry in sorted(self._endpoints.items())
+            }
+            collectors = list(self._collectors)
+
+        lines = []
+        for name, help_text in SERIES:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} summary')
+            for (endpoint, method), (summaries, _) in endpoints.items():
+                count, total, quantiles = summaries[name]
+                labels = _labels(endpoint=endpoint, method=method)
+                for q, value in quantiles.items():
+                    lines.append(f'{name}{{{labels},quantile="{q}"}} {value:.6g}')
+                lines.append(f'{name}_sum{{{labels}}} {total:.6g}')
+                lines.append(f'{name}_count{{{labels}}} {count}')
+
+        lines.append('# HELP http_responses_total Responses by endpoint and status code.')
+        lines.append('# TYPE http_responses_total counter')
+        for (endpoint, method), (_, statuses) in endpoints.items():
+            for code, count in sorted(statuses.items()):
+                lines.append(f'http_responses_total{{{_labels(endpoint=endpoint, method=method, status=code)}}} {count}')
+
+        for collector in collectors:
+            for name, help_text, kind, samples in collector():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    suffix = f'{{{_labels(**labels)}}}' if labels else ''
+                    lines.append(f'{name}{suffix} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(**labels):
+    escaped = (
+        (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels.items()
+    )
+    return ','.join(f'{key}="{value}"' for key, value in escaped)
+
+
+registry = Registry()
+
+register_collector = registry.register_collector
+
+
+def _has_metrics_token(request):
+    token = settings.METRICS_TOKEN
+    header = request.headers.get('Authorization', '')
+    return bool(token) and hmac.compare_digest(header, f'Bearer {token}')
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint.
+
+    Available to staff users, or to scrapers sending
+    "Authorization: Bearer <METRICS_TOKEN>" when METRICS_TOKEN is set.
+    """
+    if not _has_metrics_token(request):
+        return _staff_metrics_view(request)
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
+
+
+@staff_member_required
+def _staff_metrics_view(request):
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,255 @@
+"""
+Project level middleware.
+
+RequestMetricsMiddleware is opt-in (settings.REQUEST_METRICS): when it is
+not listed in MIDDLEWARE nothing is timed and no database hook is
+installed.
+
+ConcurrencyLimitMiddleware sheds API requests with 503 once
+settings.MAX_CONCURRENT_REQUESTS are in progress in the process.
+
+ReplicaRoutingMiddleware decides per request whether reads may go to the
+read replicas (appointment_system.routers).
+"""
+import threading
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import JsonResponse
+
+from . import routers
+from .metrics import register_collector, registry
+
+# Timer of the request being handled; a ContextVar so queries that async
+# views run in sync_to_async() threads are attributed to their request
+_current_timer = ContextVar('request_metrics_timer', default=None)
+
+
+class QueryTimer:
+    __slots__ = ('count', 'duration')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper adding each query to the current request's timer."""
+    timer = _current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timer.count += 1
+        timer.duration += perf_counter() - start
+
+
+def install_query_timer(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record wall time, database query count and database time per request.
+
+    Adds a Server-Timing header to every response and feeds the per-endpoint
+    summaries served by appointment_system.metrics.metrics_view.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+        connection_created.connect(install_query_timer, dispatch_uid='request_metrics')
+        for connection in connections.all(initialized_only=True):
+            install_query_timer(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        timer = QueryTimer()
+        token = _current_timer.set(timer)
+        start = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        return self.finish(request, response, perf_counter() - start, timer)
+
+    async def __acall__(self, request):
+        timer = QueryTimer()
+        token = _current_timer.set(timer)
+        start = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        return self.finish(request, response, perf_counter() - start, timer)
+
+    def finish(self, request, response, duration, timer):
+        match = request.resolver_match
+        endpoint = (match.view_name or match.route) if match else 'unmatched'
+        registry.observe(endpoint, request.method, response.status_code, duration, timer.duration, timer.count)
+
+        response['Server-Timing'] = (
+            f'app;dur={duration * 1000:.2f}, '
+            f'db;dur={timer.duration * 1000:.2f};desc="{timer.count} queries"'
+        )
+        return response
+
+
+class AdmissionCounter:
+    """Requests in progress and requests shed by ConcurrencyLimitMiddleware in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.shed = 0
+
+    def enter(self, limit):
+        """Count a request in, or count it as shed and return False when limit are in progress."""
+        with self._lock:
+            if self.in_flight >= limit:
+                self.shed += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def reset(self):
+        with self._lock:
+            self.shed = 0
+
+    def collect_metrics(self):
+        with self._lock:
+            in_flight, shed = self.in_flight, self.shed
+        return [
+            ('http_requests_in_flight', 'API requests in progress in this process.', 'gauge', [({}, in_flight)]),
+            ('http_requests_shed_total', 'API requests rejected by the concurrency limit.', 'counter', [({}, shed)]),
+        ]
+
+
+admission = AdmissionCounter()
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    Reject requests to settings.CONCURRENCY_LIMIT_PREFIX with 503 and
+    Retry-After while settings.MAX_CONCURRENT_REQUESTS requests are already
+    in progress, so overload turns into fast rejections instead of a queue
+    of slow requests in front of the database. 0 disables the limit.
+
+    The limit is per process; size it to the database connections a worker
+    can use. A streaming response counts only until it is returned, not
+    while it is being streamed.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        register_collector(admission.collect_metrics)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if not self.limited(request):
+            return self.get_response(request)
+        if not admission.enter(settings.MAX_CONCURRENT_REQUESTS):
+            return self.shed_response()
+        try:
+            return self.get_response(request)
+        finally:
+            admission.leave()
+
+    async def __acall__(self, request):
+        if not self.limited(request):
+            return await self.get_response(request)
+        if not admission.enter(settings.MAX_CONCURRENT_REQUESTS):
+            return self.shed_response()
+        try:
+            return await self.get_response(request)
+        finally:
+            admission.leave()
+
+    def limited(self, request):
+        return settings.MAX_CONCURRENT_REQUESTS > 0 and request.path.startswith(settings.CONCURRENCY_LIMIT_PREFIX)
+
+    def shed_response(self):
+        response = JsonResponse({'detail': 'The server is busy, please retry.'}, status=503)
+        response['Retry-After'] = str(settings.CONCURRENCY_RETRY_AFTER)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let safe requests read from the read replicas (see
+    appointment_system.routers), except for clients pinned to the primary.
+
+    A request that writes to the database sets the PIN_COOKIE cookie to
+    pin its client to the primary for settings.DATABASE_REPLICA_PIN_SECONDS.
+    Clients that do not keep cookies only read their writes once the
+    replicas caught up.
+    """
+    sync_capable = True
+    async_capable = True
+
+    PIN_COOKIE = 'pin_primary'
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        register_collector(routers.collect_metrics)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        routing = self.routing(request)
+        token = routers._current_routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            routers._current_routing.reset(token)
+        return self.finish(routing, response)
+
+    async def __acall__(self, request):
+        routing = self.routing(request)
+        token = routers._current_routing.set(routing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routers._current_routing.reset(token)
+        return self.finish(routing, response)
+
+    def routing(self, request):
+        pinned = self.PIN_COOKIE in request.COOKIES
+        return routers.RequestRouting(
+            use_replicas=bool(settings.DATABASE_REPLICAS) and request.method in self.SAFE_METHODS and not pinned
+        )
+
+    def finish(self, routing, response):
+        if routing.wrote and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                self.PIN_COOKIE, '1', max_age=settings.DATABASE_REPLICA_PIN_SECONDS, httponly=True, samesite='Lax'
+            )
+        return response
@@ -0,0 +1,135 @@
+"""
+Read replica routing.
+
+ReplicaRouter sends reads of the models in settings.DATABASE_REPLICA_MODELS
+to the read replicas listed in settings.DATABASE_REPLICAS. Everything else
+uses the primary (default). Replicas are only read while
+ReplicaRoutingMiddleware allows it for the current request:
+
+- only safe (GET, HEAD, OPTIONS) requests read from replicas;
+- a request that writes reads from the primary from then on, and its
+  client stays pinned to the primary for
+  settings.DATABASE_REPLICA_PIN_SECONDS, so it reads its own writes
+  despite replication lag;
+- reads inside a transaction on the primary stay on the primary;
+- code running outside a request (management commands, shells) always
+  uses the primary.
+
+A request picks one replica at random and keeps it for all its reads.
+Replicas are health checked with SELECT 1 at most every
+settings.DATABASE_REPLICA_HEALTH_INTERVAL seconds per process, and reads
+fall back to another replica or the primary while a check fails.
+"""
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+# Replica routing state of the request being handled, set by
+# ReplicaRoutingMiddleware; a ContextVar so that queries run in
+# sync_to_async() threads by async views see their request's state
+_current_routing = ContextVar('replica_routing', default=None)
+
+_health_lock = threading.Lock()
+_health = {}
+
+
+class RequestRouting:
+    """Replica routing state of one request."""
+
+    __slots__ = ('use_replicas', 'replica', 'wrote')
+
+    def __init__(self, use_replicas):
+        self.use_replicas = use_replicas
+        self.replica = None
+        self.wrote = False
+
+
+def check_replica(alias):
+    """Whether the database alias answers SELECT 1."""
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except DatabaseError:
+        try:
+            connection.close()
+        except DatabaseError:
+            pass
+        return False
+    return True
+
+
+def is_healthy(alias):
+    """The result of the last health check of a replica, checking again once it is older than the interval."""
+    now = time.monotonic()
+    with _health_lock:
+        checked = _health.get(alias)
+    if checked is not None and now - checked[1] < settings.DATABASE_REPLICA_HEALTH_INTERVAL:
+        return checked[0]
+
+    healthy = check_replica(alias)
+    with _health_lock:
+        _health[alias] = (healthy, now)
+    return healthy
+
+
+def reset_health():
+    with _health_lock:
+        _health.clear()
+
+
+def choose_replica():
+    """A random healthy replica, or None when none is configured or healthy."""
+    replicas = [alias for alias in settings.DATABASE_REPLICAS if is_healthy(alias)]
+    return random.choice(replicas) if replicas else None
+
+
+def collect_metrics():
+    """Replica health for appointment_system.metrics.register_collector()."""
+    with _health_lock:
+        health = dict(_health)
+    return [
+        ('db_replica_healthy', 'Result of the last health check of each read replica.', 'gauge', [
+            ({'database': alias}, int(healthy)) for alias, (healthy, _) in sorted(health.items())
+        ]),
+    ]
+
+
+class ReplicaRouter:
+    """Database router reading replicated models from replicas where the request allows it."""
+
+    def db_for_read(self, model, **hints):
+        routing = _current_routing.get()
+        if routing is None or not routing.use_replicas or routing.wrote:
+            return None
+        if model._meta.label_lower not in settings.DATABASE_REPLICA_MODELS:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        if routing.replica is None:
+            routing.replica = choose_replica() or DEFAULT_DB_ALIAS
+        return routing.replica
+
+    def db_for_write(self, model, **hints):
+        routing = _current_routing.get()
+        if routing is not None:
+            routing.wrote = True
+        # Explicitly, so that instances read from a replica are saved to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
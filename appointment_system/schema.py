@@ -0,0 +1,81 @@
+"""
+Pre-generated OpenAPI schema.
+
+`python manage.py generate_schema` writes the schema as swagger.json and
+swagger.yaml into settings.SCHEMA_DIR at build or deploy time.
+schema_file_view serves those files from memory with a content hash ETag
+and a long-lived Cache-Control header, so schema requests cost neither
+view introspection nor disk reads. When a file is missing, the schema is
+generated on the first request instead and memoized for the life of the
+process.
+
+The swagger/ and redoc/ pages are plain templates
+(drf-yasg/swagger-ui.html and drf-yasg/redoc.html) that load their spec
+from schema_file_view in the browser, so serving them never introspects
+the API.
+"""
+import functools
+import hashlib
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+
+INFO = openapi.Info(
+    title="Appointment Booking API",
+    default_version='v1',
+    description="API for booking appointments",
+    terms_of_service="https://www.google.com/policies/terms/",
+    contact=openapi.Contact(email="contact@example.com"),
+    license=openapi.License(name="BSD License"),
+)
+
+# format (as in the swagger<format>/ URL) -> (file name, codec, content type)
+FORMATS = {
+    '.json': ('swagger.json', OpenAPICodecJson, 'application/json'),
+    '.yaml': ('swagger.yaml', OpenAPICodecYaml, 'application/yaml'),
+}
+
+
+def generate_schema(format):
+    """Introspect the API and return its schema encoded in format ('.json' or '.yaml')."""
+    _, codec, _ = FORMATS[format]
+    schema = OpenAPISchemaGenerator(INFO).get_schema(request=None, public=True)
+    return codec(validators=[]).encode(schema)
+
+
+def schema_path(format, directory=None):
+    return (directory or settings.SCHEMA_DIR) / FORMATS[format][0]
+
+
+@functools.lru_cache(maxsize=None)
+def load_schema(format):
+    """
+    Return (content, etag) of the schema in format, read from SCHEMA_DIR or
+    generated when the file is missing. Memoized per process.
+    """
+    try:
+        content = schema_path(format).read_bytes()
+    except FileNotFoundError:
+        content = generate_schema(format)
+    return content, f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+def schema_file_view(request, format):
+    """Serve the schema in format with its ETag, answering a matching If-None-Match with 304."""
+    if format not in FORMATS:
+        raise Http404('Unknown schema format')
+    content, etag = load_schema(format)
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match and etag in parse_etags(if_none_match):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(content, content_type=FORMATS[format][2])
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=settings.SCHEMA_MAX_AGE)
+    return response
@@ -57,6 +57,8 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'appointment_system.middleware.ConcurrencyLimitMiddleware',
+    'appointment_system.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -66,6 +68,20 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Requests under CONCURRENCY_LIMIT_PREFIX allowed in progress at once per
+# process (0 disables); more are rejected with 503 and Retry-After
+MAX_CONCURRENT_REQUESTS = int(os.getenv('MAX_CONCURRENT_REQUESTS', '64'))
+CONCURRENCY_LIMIT_PREFIX = os.getenv('CONCURRENCY_LIMIT_PREFIX', '/api/')
+CONCURRENCY_RETRY_AFTER = int(os.getenv('CONCURRENCY_RETRY_AFTER', '1'))
+
+# Opt-in per-request timing: Server-Timing headers and Prometheus metrics
+# at /metrics/ (staff users, or "Authorization: Bearer <METRICS_TOKEN>")
+REQUEST_METRICS = os.getenv('REQUEST_METRICS', 'False') == 'True'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+if REQUEST_METRICS:
+    MIDDLEWARE.insert(0, 'appointment_system.middleware.RequestMetricsMiddleware')
+
 # Static files settings
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [
@@ -94,17 +110,138 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'appointment_system.wsgi.application'
 
+# Serve the availability and booking endpoints with native async views.
+# Only worthwhile when deployed under ASGI (appointment_system.asgi).
+BOOKING_ASYNC_VIEWS = os.getenv('BOOKING_ASYNC_VIEWS', 'False') == 'True'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
+# DB_ENGINE selects the profile: 'sqlite' (default) or 'postgres'.
+
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgres':
+    # DB_POOL=True uses Django's native psycopg connection pool (needs
+    # psycopg[pool]); Django requires CONN_MAX_AGE=0 alongside it.
+    DB_POOL = os.getenv('DB_POOL', 'True') == 'True'
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('DB_NAME', 'appointment_system'),
+            'USER': os.getenv('DB_USER', 'postgres'),
+            'PASSWORD': os.getenv('DB_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', '127.0.0.1'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+            'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+                    'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '20')),
+                    'timeout': int(os.getenv('DB_POOL_TIMEOUT', '10')),
+                },
+            } if DB_POOL else {},
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            # Keep connections open between requests instead of reconnecting
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # Seconds a connection waits for a lock before "database is locked"
+                'timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', '5000')) / 1000,
+                # Take the write lock when a transaction starts so concurrent
+                # writers queue up instead of failing on lock upgrades
+                'transaction_mode': os.getenv('SQLITE_TRANSACTION_MODE', 'IMMEDIATE'),
+            },
+        }
+    }
+
+# Read replicas (appointment_system.routers): DB_REPLICAS lists the hosts
+# (postgres) or database files (sqlite) of copies of the default database,
+# comma separated. Each becomes a 'replicaN' alias with the default's other
+# settings; tests use the default database in their place.
+DATABASE_REPLICAS = []
+for index, replica in enumerate(filter(None, os.getenv('DB_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'HOST' if DB_ENGINE == 'postgres' else 'NAME': replica.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{index}')
+
+DATABASE_ROUTERS = ['appointment_system.routers.ReplicaRouter']
+
+# Models whose reads may go to a replica ("app_label.model")
+DATABASE_REPLICA_MODELS = {'booking.appointment', 'booking.provider'}
+
+# Seconds a client that wrote keeps reading from the primary, which should
+# exceed the replication lag; and seconds a replica health check is reused
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv('DB_REPLICA_PIN_SECONDS', '5'))
+DATABASE_REPLICA_HEALTH_INTERVAL = int(os.getenv('DB_REPLICA_HEALTH_INTERVAL', '5'))
+
+
+# Pragmas applied to every new SQLite connection (appointment_system.db).
+# WAL lets readers run alongside the writer; synchronous=NORMAL is durable
+# in WAL mode except for the last transactions before a power loss.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', '5000')),
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'appointment-system'),
+        'OPTIONS': {
+            # Local memory only: room for the per-date entries of a few years
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '10000')),
+        } if 'locmem' in os.getenv('CACHE_BACKEND', 'locmem') else {},
     }
 }
 
+# Cache alias and timeout (seconds) used for the per-date booked slot cache
+BOOKING_CACHE_ALIAS = os.getenv('BOOKING_CACHE_ALIAS', 'default')
+BOOKING_CACHE_TIMEOUT = int(os.getenv('BOOKING_CACHE_TIMEOUT', '300'))
+
+# Backend broadcasting slot events to Server-Sent Events subscribers
+BOOKING_EVENTS_BACKEND = os.getenv('BOOKING_EVENTS_BACKEND', 'booking.events.InProcessBackend')
+
+# Seconds a booking response is replayed for retries with the same
+# Idempotency-Key, and seconds a key stays claimed by an unfinished request
+BOOKING_IDEMPOTENCY_TTL = int(os.getenv('BOOKING_IDEMPOTENCY_TTL', '86400'))
+BOOKING_IDEMPOTENCY_LOCK_TIMEOUT = int(os.getenv('BOOKING_IDEMPOTENCY_LOCK_TIMEOUT', '60'))
+
+# Seconds a slot hold keeps a slot for its holder, and the number of expired
+# holds each new hold deletes at most
+BOOKING_HOLD_TTL = int(os.getenv('BOOKING_HOLD_TTL', '300'))
+BOOKING_HOLD_RECLAIM_BATCH = int(os.getenv('BOOKING_HOLD_RECLAIM_BATCH', '100'))
+
+# Age in days after which the archive_appointments command may move an
+# appointment to the archive table; availability queries look for older
+# dates in both tables
+BOOKING_ARCHIVE_AFTER_DAYS = int(os.getenv('BOOKING_ARCHIVE_AFTER_DAYS', '90'))
+
+# The appointment admin counts at most this many rows of a filtered list,
+# and shows the planner's estimate for unfiltered lists of larger tables
+# (PostgreSQL), instead of an exact COUNT(*)
+BOOKING_ADMIN_COUNT_LIMIT = int(os.getenv('BOOKING_ADMIN_COUNT_LIMIT', '10000'))
+
+# Seconds browsers and shared caches may reuse an availability response
+# before revalidating it with If-None-Match
+BOOKING_AVAILABILITY_MAX_AGE = int(os.getenv('BOOKING_AVAILABILITY_MAX_AGE', '5'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -158,9 +295,35 @@ SWAGGER_SETTINGS = {
     'TAGS_SORTER': 'alpha',
 }
 
+# Directory the generate_schema command writes swagger.json and swagger.yaml
+# to, and seconds clients may cache the served schema before revalidating
+SCHEMA_DIR = Path(os.getenv('SCHEMA_DIR', BASE_DIR / 'schema'))
+SCHEMA_MAX_AGE = int(os.getenv('SCHEMA_MAX_AGE', '86400'))
+
 # Add REST framework settings
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
-    ]
+    ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'booking.throttling.IPRateThrottle',
+        'booking.throttling.EndpointRateThrottle',
+    ],
+    # Proxies in front of the app whose X-Forwarded-For entries are trusted
+    # to identify clients (0 uses REMOTE_ADDR)
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '0')),
+}
+
+# Token-bucket rates ("<requests>/<s|min|h|d>", empty to disable) per client
+# IP: 'ip' over the whole API, the others per endpoint URL name
+BOOKING_THROTTLE_AVAILABILITY_RATE = os.getenv('BOOKING_THROTTLE_AVAILABILITY_RATE', '10/s')
+BOOKING_THROTTLE_BOOKING_RATE = os.getenv('BOOKING_THROTTLE_BOOKING_RATE', '30/min')
+BOOKING_THROTTLE_RATES = {
+    'ip': os.getenv('BOOKING_THROTTLE_IP_RATE', '20/s'),
+    'available_slots': BOOKING_THROTTLE_AVAILABILITY_RATE,
+    'provider_available_slots': BOOKING_THROTTLE_AVAILABILITY_RATE,
+    'next_available_slots': BOOKING_THROTTLE_AVAILABILITY_RATE,
+    'book_appointment': BOOKING_THROTTLE_BOOKING_RATE,
+    'bulk_book_appointments': BOOKING_THROTTLE_BOOKING_RATE,
+    'create_hold': BOOKING_THROTTLE_BOOKING_RATE,
 }
@@ -14,33 +14,21 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import TemplateView
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Appointment Booking API",
-        default_version='v1',
-        description="API for booking appointments",
-        terms_of_service="https://www.google.com/policies/terms/",
-        contact=openapi.Contact(email="contact@example.com"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+from .metrics import metrics_view
+from .schema import schema_file_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/v1/', include('booking.urls')),
+    path('api/v1/', include('booking.async_urls' if settings.BOOKING_ASYNC_VIEWS else 'booking.urls')),
     path('', TemplateView.as_view(template_name='index.html')),
+    path('metrics/', metrics_view, name='metrics'),
     
     # Swagger URLs
-    path('swagger<format>/', schema_view.without_ui(cache_timeout=0), name='schema-json'),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    path('swagger<format>/', schema_file_view, name='schema-json'),
+    path('swagger/', TemplateView.as_view(template_name='drf-yasg/swagger-ui.html'), name='schema-swagger-ui'),
+    path('redoc/', TemplateView.as_view(template_name='drf-yasg/redoc.html'), name='schema-redoc'),
 ]
\ No newline at end of file
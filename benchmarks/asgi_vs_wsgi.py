@@ -0,0 +1,208 @@
+"""
+Compare sync WSGI and async ASGI throughput of the booking API.
+
+Requests are dispatched in-process straight into Django's WSGIHandler (from a
+thread pool, like a threaded WSGI server) and ASGIHandler (from one event
+loop), so the numbers measure the framework and view code rather than an
+HTTP server. Each mode runs in its own subprocess against a fresh SQLite
+database; the ASGI run sets BOOKING_ASYNC_VIEWS=True so the native async
+views are routed.
+
+Usage:
+    python benchmarks/asgi_vs_wsgi.py [--requests 2000] [--concurrency 100]
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The scripted client sends everything from one IP as fast as it can:
+# turn off the per-IP rate limits and load shedding it would only measure
+NO_LIMITS = {
+    'BOOKING_THROTTLE_IP_RATE': '',
+    'BOOKING_THROTTLE_AVAILABILITY_RATE': '',
+    'BOOKING_THROTTLE_BOOKING_RATE': '',
+    'MAX_CONCURRENT_REQUESTS': '0',
+}
+
+SLOTS = ['10:00 AM', '10:30 AM', '11:00 AM', '11:30 AM', '12:00 PM', '12:30 PM',
+         '02:00 PM', '02:30 PM', '03:00 PM', '03:30 PM', '04:00 PM', '04:30 PM']
+
+
+def availability_requests(count):
+    """GET requests spread over 30 dates, so most are answered from the cache."""
+    first = date(2030, 1, 1)
+    return [
+        ('GET', '/api/v1/available-slots/', f'date={first + timedelta(days=i % 30)}', b'')
+        for i in range(count)
+    ]
+
+
+def booking_requests(count):
+    """POST requests that each book a different free slot."""
+    first = date(2031, 1, 1)
+    requests = []
+    for i in range(count):
+        body = json.dumps({
+            'name': f'Bench {i}',
+            'phone_number': '1234567890',
+            'date': str(first + timedelta(days=i // len(SLOTS))),
+            'time_slot': SLOTS[i % len(SLOTS)],
+        }).encode()
+        requests.append(('POST', '/api/v1/book-appointment/', '', body))
+    return requests
+
+
+def run_wsgi(requests, concurrency):
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connections
+
+    application = get_wsgi_application()
+
+    def call(request):
+        method, path, query, body = request
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'HTTP_HOST': 'localhost',
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.url_scheme': 'http',
+            'wsgi.errors': sys.stderr,
+        }
+        statuses = []
+        response = application(environ, lambda status, headers: statuses.append(status))
+        b''.join(response)
+        response.close()
+        return int(statuses[0].split()[0])
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        statuses = list(pool.map(call, requests))
+        elapsed = time.perf_counter() - start
+        pool.map(lambda _: connections.close_all(), range(concurrency))
+    return statuses, elapsed
+
+
+def run_asgi(requests, concurrency):
+    from django.core.asgi import get_asgi_application
+
+    application = get_asgi_application()
+
+    async def call(request, semaphore):
+        method, path, query, body = request
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': method,
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': query.encode(),
+            'headers': [
+                (b'host', b'localhost'),
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+            ],
+            'server': ('localhost', 80),
+        }
+        messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+        sent = []
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            # Keep the connection open until the response has been sent
+            await asyncio.Event().wait()
+
+        async def send(message):
+            sent.append(message)
+
+        async with semaphore:
+            await application(scope, receive, send)
+        return sent[0]['status']
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+        start = time.perf_counter()
+        statuses = await asyncio.gather(*(call(request, semaphore) for request in requests))
+        return statuses, time.perf_counter() - start
+
+    return asyncio.run(main())
+
+
+def run_mode(mode, count, concurrency):
+    """Run both workloads for one mode and return {workload: requests per second}."""
+    import django
+
+    sys.path.insert(0, BASE_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'appointment_system.settings')
+    django.setup()
+
+    from django.conf import settings
+    from django.db import connection
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.DATABASES['default'].setdefault('TEST', {})['NAME'] = os.path.join(tmp, 'bench.sqlite3')
+        connection.creation.create_test_db(verbosity=0)
+        connection.close()
+
+        runner = run_asgi if mode == 'asgi' else run_wsgi
+        results = {}
+        for workload, requests in (('availability', availability_requests(count)),
+                                   ('booking', booking_requests(count))):
+            statuses, elapsed = runner(requests, concurrency)
+            failed = sum(1 for code in statuses if code >= 400)
+            results[workload] = {'rps': round(count / elapsed, 1), 'failed': failed}
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--mode', choices=['wsgi', 'asgi'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.requests, args.concurrency)))
+        return
+
+    results = {}
+    for mode in ('wsgi', 'asgi'):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, BOOKING_ASYNC_VIEWS=str(mode == 'asgi'), **NO_LIMITS)
+            if env.get('DB_ENGINE', 'sqlite') == 'sqlite':
+                # Connecting creates the (unused) default database file;
+                # keep it out of the working tree
+                env['DB_NAME'] = os.path.join(tmp, 'db.sqlite3')
+            output = subprocess.run(
+                [sys.executable, __file__, '--mode', mode,
+                 '--requests', str(args.requests), '--concurrency', str(args.concurrency)],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+        results[mode] = json.loads(output.splitlines()[-1])
+
+    print(f"{args.requests} requests per workload, concurrency {args.concurrency}")
+    print(f"{'workload':<14}{'WSGI req/s':>14}{'ASGI req/s':>14}{'failed':>10}")
+    for workload in ('availability', 'booking'):
+        wsgi, asgi = results['wsgi'][workload], results['asgi'][workload]
+        print(f"{workload:<14}{wsgi['rps']:>14}{asgi['rps']:>14}{wsgi['failed'] + asgi['failed']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+# benchmarks/bench_api.py
+"""
+Micro-benchmarks of the booking API through Django's test client.
+
+Run explicitly (the file is not matched by pytest.ini's python_files):
+
+    pytest benchmarks/bench_api.py --bench-rows 10000
+    pytest benchmarks/bench_api.py --bench-rows 1000000 --benchmark-json bench.json
+
+Compare two saved runs with `pytest-benchmark compare`.
+"""
+import itertools
+import json
+import pytest
+from datetime import timedelta
+from django.urls import reverse
+from booking.models import Appointment, Provider
+from booking.schedule import DEFAULT_SCHEDULE
+
+pytestmark = pytest.mark.django_db
+
+def booking_payload(day, time_slot):
+    return json.dumps({
+        "name": "Bench User",
+        "phone_number": "1234567890",
+        "date": day.isoformat(),
+        "time_slot": time_slot
+    })
+
+def test_single_date_availability(benchmark, client, seeded_date, clear_cache):
+    """Single-date availability with a warm cache"""
+    url = reverse('available_slots') + f'?date={seeded_date}'
+    
+    response = benchmark(client.get, url)
+    
+    assert response.status_code == 200
+
+def test_single_date_availability_uncached(benchmark, client, seeded_date, clear_cache):
+    """Single-date availability that always misses the cache and queries the index"""
+    url = reverse('available_slots') + f'?date={seeded_date}'
+    
+    response = benchmark.pedantic(client.get, args=(url,), setup=clear_cache, rounds=200)
+    
+    assert response.status_code == 200
+
+def test_range_availability(benchmark, client, seeded_date, clear_cache):
+    """31-day range availability with a cold cache, answered by one query"""
+    end = seeded_date + timedelta(days=30)
+    url = reverse('available_slots') + f'?start={seeded_date}&end={end}'
+    
+    response = benchmark.pedantic(client.get, args=(url,), setup=clear_cache, rounds=200)
+    
+    assert response.status_code == 200
+    assert len(json.loads(response.content)['days']) == 31
+
+def test_next_available_fully_booked(benchmark, client, seeded_date, clear_cache):
+    """Next-available search over a fully booked horizon with a cold cache: the bounded worst case"""
+    url = reverse('next_available_slots') + f'?from={seeded_date}&count=3'
+    
+    response = benchmark.pedantic(client.get, args=(url,), setup=clear_cache, rounds=100)
+    
+    assert response.status_code == 200
+
+def test_provider_range_availability(benchmark, client, free_date, clear_cache):
+    """31-day availability of 300 providers, a third of them half booked, with a cold cache"""
+    providers = Provider.objects.bulk_create(Provider(name=f'Bench Provider {i}') for i in range(300))
+    Appointment.objects.bulk_create(
+        Appointment(
+            name='Bench User',
+            phone_number='1234567890',
+            date=free_date + timedelta(days=day),
+            time_slot=time_slot,
+            provider=provider
+        )
+        for provider in providers[::3]
+        for day in range(31)
+        for time_slot in DEFAULT_SCHEDULE.minutes[::2]
+    )
+    end = free_date + timedelta(days=30)
+    url = reverse('provider_available_slots') + f'?start={free_date}&end={end}'
+    
+    response = benchmark.pedantic(client.get, args=(url,), setup=clear_cache, rounds=50)
+    
+    assert response.status_code == 200
+    assert len(json.loads(response.content)['providers']) == 300
+
+def test_contended_booking(benchmark, client, seeded_date):
+    """Booking an already taken slot: the constraint conflict and 409 path"""
+    url = reverse('book_appointment')
+    data = booking_payload(seeded_date, DEFAULT_SCHEDULE.slots[0])
+    
+    response = benchmark(client.post, url, data=data, content_type='application/json')
+    
+    assert response.status_code == 409
+
+def test_uncontended_booking(benchmark, client, free_date):
+    """Booking a free slot each round"""
+    url = reverse('book_appointment')
+    free_slots = (
+        booking_payload(free_date + timedelta(days=day), time_slot)
+        for day in itertools.count()
+        for time_slot in DEFAULT_SCHEDULE.slots
+    )
+    
+    def book():
+        return client.post(url, data=next(free_slots), content_type='application/json')
+    
+    response = benchmark.pedantic(book, rounds=500)
+    
+    assert response.status_code == 200
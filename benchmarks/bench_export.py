@@ -0,0 +1,45 @@
+# benchmarks/bench_export.py
+"""
+Throughput and memory of the streaming appointment export.
+
+Exports the whole seeded dataset through booking.export and reports
+rows/sec and the peak Python memory allocated while streaming, which
+should stay flat as --bench-rows grows. Run explicitly:
+
+    pytest benchmarks/bench_export.py --bench-rows=1000000
+"""
+import tracemalloc
+import pytest
+from booking.export import export_chunks, export_rows
+
+pytestmark = pytest.mark.django_db
+
+@pytest.mark.parametrize('compress', [False, True], ids=['plain', 'gzip'])
+@pytest.mark.parametrize('format', ['csv', 'ndjson'])
+def test_export_throughput(benchmark, seeded_range, format, compress):
+    """Export every seeded appointment, discarding the output"""
+    stats = {}
+
+    def counted(rows):
+        stats['rows'] = 0
+        for row in rows:
+            stats['rows'] += 1
+            yield row
+
+    def export():
+        stats['bytes'] = sum(len(chunk) for chunk in export_chunks(counted(export_rows(*seeded_range)), format, compress))
+
+    tracemalloc.start()
+    try:
+        benchmark.pedantic(export, rounds=3, iterations=1)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert stats['rows'] > 0
+    benchmark.extra_info.update(
+        rows=stats['rows'],
+        bytes=stats['bytes'],
+        rows_per_second=round(stats['rows'] / benchmark.stats.stats.mean),
+        peak_memory_bytes=peak,
+    )
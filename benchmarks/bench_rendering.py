@@ -0,0 +1,57 @@
+# benchmarks/bench_rendering.py
+"""
+Per-request framework overhead of the availability endpoint.
+
+Calls the views directly with RequestFactory (no middleware, warm cache,
+so almost no actual work) and compares the lean JSON path against the
+previous DRF path: default content negotiation, JSONRenderer and the
+browsable API for Accept: text/html clients. Run explicitly:
+
+    pytest benchmarks/bench_rendering.py --benchmark-group-by=param:accept
+"""
+import json
+import pytest
+from django.test import RequestFactory
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from booking import views
+from booking.calendars import get_calendar
+from booking.cache import get_booked_slots, get_versions
+
+pytestmark = pytest.mark.django_db
+
+ACCEPT_HEADERS = {
+    'json': 'application/json',
+    'browser': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+}
+
+@api_view(['GET'])
+def drf_available_slots(request):
+    """The single-date path of get_available_slots before the lean renderer"""
+    dates, error_message = views.parse_date(request.query_params.get('date'))
+    calendar = get_calendar()
+    etag = views.availability_etag(get_versions(dates), calendar.version)
+    if views.etag_matches(request, etag):
+        return views.not_modified_response(etag)
+    data = {'available_slots': calendar.schedule_for(dates[0]).available(get_booked_slots(dates[0]))}
+    return views.set_availability_caching(Response(data), etag)
+
+def render(view, request):
+    response = view(request)
+    if hasattr(response, 'render'):
+        response.render()
+    return response
+
+@pytest.mark.parametrize('accept', ACCEPT_HEADERS)
+@pytest.mark.parametrize('path', ['drf', 'lean'])
+def test_available_slots_overhead(benchmark, seeded_date, clear_cache, path, accept):
+    """Single-date availability served from a warm cache"""
+    view = drf_available_slots if path == 'drf' else views.get_available_slots
+    request = RequestFactory().get('/', {'date': seeded_date.isoformat()}, HTTP_ACCEPT=ACCEPT_HEADERS[accept])
+    render(view, request)
+
+    response = benchmark(render, view, request)
+
+    assert response.status_code == 200
+    if accept == 'json' or path == 'lean':
+        assert json.loads(response.content) == json.loads(render(views.get_available_slots, request).content)
@@ -0,0 +1,92 @@
+"""
+Concurrent booking throughput before and after the SQLite tuning.
+
+Runs the same booking workload (every request books a different slot)
+through Django's WSGIHandler from a thread pool, once per database
+profile, each in its own subprocess against a fresh on-disk SQLite file:
+
+    baseline  rollback journal, synchronous=FULL, deferred transactions,
+              a new connection per request
+    tuned     the defaults from settings: WAL, synchronous=NORMAL,
+              immediate transactions, persistent connections
+
+Usage:
+    python benchmarks/concurrent_booking.py [--requests 2000] [--concurrency 32]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from asgi_vs_wsgi import BASE_DIR, NO_LIMITS, booking_requests, run_wsgi
+
+PROFILES = {
+    'baseline': {
+        'DB_CONN_MAX_AGE': '0',
+        'SQLITE_JOURNAL_MODE': 'DELETE',
+        'SQLITE_SYNCHRONOUS': 'FULL',
+        'SQLITE_TRANSACTION_MODE': 'DEFERRED',
+    },
+    'tuned': {},
+}
+
+
+def run_profile(count, concurrency):
+    import django
+
+    sys.path.insert(0, BASE_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'appointment_system.settings')
+    django.setup()
+
+    from django.core.management import call_command
+    from django.db import connections
+
+    call_command('migrate', verbosity=0)
+    connections.close_all()
+
+    statuses, elapsed = run_wsgi(booking_requests(count), concurrency)
+    return {
+        'rps': round(count / elapsed, 1),
+        'failed': sum(1 for code in statuses if code >= 400),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_profile(args.requests, args.concurrency)))
+        return
+
+    results = {}
+    for profile, overrides in PROFILES.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(
+                os.environ,
+                DB_ENGINE='sqlite',
+                DB_NAME=os.path.join(tmp, 'bench.sqlite3'),
+                BOOKING_ASYNC_VIEWS='False',
+                **NO_LIMITS,
+                **overrides,
+            )
+            output = subprocess.run(
+                [sys.executable, __file__, '--child',
+                 '--requests', str(args.requests), '--concurrency', str(args.concurrency)],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+        results[profile] = json.loads(output.splitlines()[-1])
+
+    print(f"{args.requests} bookings, concurrency {args.concurrency}")
+    print(f"{'profile':<10}{'req/s':>10}{'failed':>10}")
+    for profile, result in results.items():
+        print(f"{profile:<10}{result['rps']:>10}{result['failed']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# benchmarks/conftest.py
+import pytest
+from datetime import date, timedelta
+from django.core.cache import caches
+from django.conf import settings
+from django.core.management import call_command
+from booking.schedule import DEFAULT_SCHEDULE
+
+SEED_START = date(2000, 1, 1)
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--bench-rows',
+        type=int,
+        default=10_000,
+        help='Number of appointments seeded before the benchmarks run (e.g. 10000 or 1000000)'
+    )
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker, request):
+    """Seed the test database once per session"""
+    with django_db_blocker.unblock():
+        call_command('seed_appointments', request.config.getoption('--bench-rows'), start_date=SEED_START, verbosity=0)
+
+@pytest.fixture(scope='session')
+def seeded_days(request):
+    """Number of fully booked days in the seeded dataset"""
+    return request.config.getoption('--bench-rows') // len(DEFAULT_SCHEDULE.minutes)
+
+@pytest.fixture
+def seeded_date(seeded_days):
+    """A date in the middle of the seeded dataset"""
+    return SEED_START + timedelta(days=seeded_days // 2)
+
+@pytest.fixture
+def seeded_range(seeded_days):
+    """First and last date of the seeded dataset"""
+    return SEED_START, SEED_START + timedelta(days=seeded_days)
+
+@pytest.fixture
+def free_date(seeded_days):
+    """The first date after the seeded dataset"""
+    return SEED_START + timedelta(days=seeded_days + 1)
+
+@pytest.fixture(autouse=True)
+def bookable_seed_dates(settings):
+    """The seeded dates start in the past: keep them and the free dates after
+    them out of the archivable (and no longer bookable) past"""
+    settings.BOOKING_ARCHIVE_AFTER_DAYS = (date.today() - SEED_START).days
+
+@pytest.fixture(autouse=True)
+def no_rate_limits(settings):
+    """Benchmarks fire requests from one client as fast as they can"""
+    settings.BOOKING_THROTTLE_RATES = {}
+    settings.MAX_CONCURRENT_REQUESTS = 0
+
+@pytest.fixture
+def clear_cache():
+    def clear():
+        caches[settings.BOOKING_CACHE_ALIAS].clear()
+    clear()
+    return clear
@@ -0,0 +1,165 @@
+"""
+Load driver for a running instance of the booking API.
+
+Fires requests from a pool of worker threads over real HTTP and reports
+throughput, status codes and latency percentiles per scenario. Seed the
+target first so availability queries hit a realistic table, and turn off
+the per-IP rate limits and load shedding, since every request comes from
+this one client, e.g.:
+
+    python manage.py seed_appointments 1000000
+    BOOKING_THROTTLE_IP_RATE= BOOKING_THROTTLE_AVAILABILITY_RATE= BOOKING_THROTTLE_BOOKING_RATE= \
+        MAX_CONCURRENT_REQUESTS=0 python manage.py runserver --noreload
+    python benchmarks/load.py --seeded-rows 1000000 --json run.json
+
+Scenarios:
+    availability  single-date availability of random seeded dates
+    range         31-day range availability starting at random seeded dates
+    contended     every request tries to book the same slot
+    uncontended   every request books a different free slot
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+SLOTS = ['10:00 AM', '10:30 AM', '11:00 AM', '11:30 AM', '12:00 PM', '12:30 PM',
+         '02:00 PM', '02:30 PM', '03:00 PM', '03:30 PM', '04:00 PM', '04:30 PM']
+
+SCENARIOS = ('availability', 'range', 'contended', 'uncontended')
+
+SEED_START = date(2000, 1, 1)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Scenario:
+    """Builds the request for the i-th call of a scenario."""
+
+    def __init__(self, name, base_url, seeded_days, run_id):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.seeded_days = max(seeded_days, 1)
+        # Bookings land on days nobody else uses: after the seeded data (and
+        # today, since past dates may no longer be booked) and offset by run,
+        # so repeated runs do not collide with each other
+        first_free = max(SEED_START + timedelta(days=self.seeded_days + 1), date.today())
+        self.free_start = first_free + timedelta(days=(run_id % 500) * 3000)
+        self.rng = random.Random(run_id)
+        self.lock = threading.Lock()
+
+    def random_day(self):
+        with self.lock:
+            return SEED_START + timedelta(days=self.rng.randrange(self.seeded_days))
+
+    def request(self, i):
+        if self.name == 'availability':
+            return urllib.request.Request(f'{self.base_url}/api/v1/available-slots/?date={self.random_day()}')
+        if self.name == 'range':
+            start = self.random_day()
+            end = start + timedelta(days=30)
+            return urllib.request.Request(f'{self.base_url}/api/v1/available-slots/?start={start}&end={end}')
+
+        if self.name == 'contended':
+            day, time_slot = self.free_start, SLOTS[0]
+        else:
+            day = self.free_start + timedelta(days=1 + i // len(SLOTS))
+            time_slot = SLOTS[i % len(SLOTS)]
+        body = json.dumps({
+            'name': f'Load {i}',
+            'phone_number': '1234567890',
+            'date': day.isoformat(),
+            'time_slot': time_slot,
+        }).encode()
+        return urllib.request.Request(
+            f'{self.base_url}/api/v1/book-appointment/',
+            data=body,
+            headers={'Content-Type': 'application/json'},
+            method='POST',
+        )
+
+
+def call(scenario, i):
+    request = scenario.request(i)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            response.read()
+            code = response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        code = e.code
+    except OSError:
+        code = 0
+    return code, time.perf_counter() - start
+
+
+def run(scenario, requests, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(lambda i: call(scenario, i), range(requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for _, latency in results)
+    statuses = {}
+    for code, _ in results:
+        statuses[str(code)] = statuses.get(str(code), 0) + 1
+
+    return {
+        'scenario': scenario.name,
+        'requests': requests,
+        'concurrency': concurrency,
+        'seconds': round(elapsed, 3),
+        'rps': round(requests / elapsed, 1),
+        'statuses': statuses,
+        'latency_ms': {
+            name: round(percentile(latencies, fraction) * 1000, 2)
+            for name, fraction in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99), ('max', 1.0))
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load driver for the booking API')
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--scenario', choices=SCENARIOS, action='append',
+                        help='Scenario to run; repeat for several (default: all)')
+    parser.add_argument('--requests', type=int, default=1000, help='Requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--seeded-rows', type=int, default=10_000,
+                        help='Rows created by seed_appointments on the target')
+    parser.add_argument('--run-id', type=int, default=int(time.time()),
+                        help='Seed for random dates and the offset of booked days')
+    parser.add_argument('--json', metavar='PATH', help='Write the results to PATH as JSON')
+    args = parser.parse_args()
+
+    seeded_days = args.seeded_rows // len(SLOTS)
+    results = []
+    for name in args.scenario or SCENARIOS:
+        result = run(Scenario(name, args.base_url, seeded_days, args.run_id), args.requests, args.concurrency)
+        results.append(result)
+        latency = result['latency_ms']
+        print(
+            f"{name:<13} {result['rps']:>9} req/s  p50 {latency['p50']}ms  p95 {latency['p95']}ms  "
+            f"p99 {latency['p99']}ms  statuses {result['statuses']}",
+            file=sys.stderr,
+        )
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'base_url': args.base_url, 'run_id': args.run_id, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
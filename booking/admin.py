@@ -1,3 +1,249 @@
-from django.contrib import admin
+from datetime import date
 
-# Register your models here.
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.options import IncorrectLookupParameters, ShowFacets
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Q
+from django.template.response import TemplateResponse
+from django.utils.functional import cached_property
+
+from . import events
+from .cache import invalidate_on_commit
+from .models import Appointment, DateOverride, Holiday, Provider, WeeklyHours
+
+HOURS_FIELDS = ('opens_at', 'closes_at', 'break_start', 'break_end', 'slot_interval')
+
+# Query parameter of the keyset cursor: the date and id of the last row shown
+CURSOR_VAR = 'after'
+
+# Bulk actions on more rows publish no slot events (one per row); the
+# availability versions of the dates still change, so clients revalidate
+SLOT_EVENTS_LIMIT = 100
+
+@admin.register(Provider)
+class ProviderAdmin(admin.ModelAdmin):
+    list_display = ('name', 'is_active', 'opens_at', 'closes_at', 'slot_interval')
+    list_filter = ('is_active',)
+    search_fields = ('name',)
+
+@admin.register(WeeklyHours)
+class WeeklyHoursAdmin(admin.ModelAdmin):
+    list_display = ('weekday', 'provider', 'is_closed') + HOURS_FIELDS
+    list_filter = ('weekday', 'is_closed')
+    list_select_related = ('provider',)
+
+@admin.register(DateOverride)
+class DateOverrideAdmin(admin.ModelAdmin):
+    list_display = ('date', 'provider', 'is_closed') + HOURS_FIELDS
+    list_filter = ('is_closed',)
+    list_select_related = ('provider',)
+    date_hierarchy = 'date'
+
+@admin.register(Holiday)
+class HolidayAdmin(admin.ModelAdmin):
+    list_display = ('date', 'name')
+    date_hierarchy = 'date'
+
+
+def publish_slot_events_on_commit(slot_events, using):
+    """Broadcast (event_type, day, time_slot, provider) events with one callback once the transaction commits."""
+    def publish():
+        for event in slot_events:
+            events.publish(*event)
+    if slot_events:
+        transaction.on_commit(publish, using=using)
+
+
+def estimated_row_count(model, using):
+    """The planner's estimate of the rows of a model's table on PostgreSQL, or None."""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [model._meta.db_table])
+        row = cursor.fetchone()
+    # -1 until the table is first vacuumed or analyzed
+    return row[0] if row and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that never counts more than settings.BOOKING_ADMIN_COUNT_LIMIT
+    rows. Unfiltered lists of larger tables report the planner's estimate
+    (estimated is set), other lists stop counting at the limit (at_least
+    is set when it is reached).
+    """
+    estimated = False
+    at_least = False
+
+    @cached_property
+    def count(self):
+        limit = settings.BOOKING_ADMIN_COUNT_LIMIT
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= limit:
+                self.estimated = True
+                return estimate
+        count = queryset.order_by()[:limit].count()
+        self.at_least = count >= limit
+        return count
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Change list paged by keyset on (date, id), newest first, instead of
+    OFFSET: each page is an index range scan from the last row of the
+    previous one, however deep it is. Pages are linked by a "next" cursor
+    rather than numbered, and the columns cannot be re-sorted.
+    """
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_ordering(self, request, queryset):
+        return ['-date', '-pk']
+
+    def get_results(self, request):
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+
+        queryset = self.queryset
+        cursor = request.GET.get(CURSOR_VAR)
+        if cursor:
+            try:
+                day, pk = cursor.split('.')
+                day, pk = date.fromisoformat(day), int(pk)
+            except ValueError:
+                raise IncorrectLookupParameters
+            queryset = queryset.filter(Q(date__lt=day) | Q(date=day, pk__lt=pk))
+
+        rows = list(queryset[:self.list_per_page + 1])
+        self.result_list = rows[:self.list_per_page]
+        last = self.result_list[-1] if len(rows) > self.list_per_page else None
+        self.next_page_url = last and self.get_query_string({CURSOR_VAR: f'{last.date.isoformat()}.{last.pk}'})
+        self.first_page_url = cursor and self.get_query_string(remove=[CURSOR_VAR])
+
+        self.result_count = paginator.count
+        self.show_full_result_count = False
+        self.full_result_count = None
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = bool(self.next_page_url or self.first_page_url)
+        self.paginator = paginator
+
+
+class AppointmentActionForm(helpers.ActionForm):
+    provider = forms.ModelChoiceField(
+        Provider.objects.all(), required=False, label='Provider', empty_label='No provider'
+    )
+
+
+@admin.register(Appointment)
+class AppointmentAdmin(admin.ModelAdmin):
+    """
+    Admin of the appointment table, usable at millions of rows: keyset
+    pagination (KeysetChangeList) without exact counts
+    (EstimatedCountPaginator), filters on the indexed date and provider
+    columns, prefix search served by the name and phone indexes, and bulk
+    actions that run as one UPDATE or DELETE statement.
+    """
+    list_display = ('date', 'time_slot_label', 'provider', 'name', 'phone_number', 'created_at')
+    list_filter = ('date', 'provider')
+    list_select_related = ('provider',)
+    search_fields = ('name__startswith', 'phone_number__startswith')
+    search_help_text = 'Start of the name or phone number (case sensitive)'
+    ordering = ('-date', '-id')
+    sortable_by = ()
+    show_facets = ShowFacets.NEVER
+    paginator = EstimatedCountPaginator
+    action_form = AppointmentActionForm
+    actions = ('delete_appointments', 'reassign_provider')
+    raw_id_fields = ('provider',)
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # Replaced by delete_appointments, which does not load every object
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.display(description='Time slot')
+    def time_slot_label(self, appointment):
+        return appointment.time_slot_label
+
+    def _lock_slots(self, queryset):
+        """
+        The queryset without ordering and joins, the dates of its rows and,
+        for at most SLOT_EVENTS_LIMIT rows, their (date, time_slot,
+        provider_id), locked until the transaction ends (None for more rows).
+        """
+        queryset = queryset.order_by().select_related(None)
+        fields = ('date', 'time_slot', 'provider_id')
+        slots = list(queryset.select_for_update().values_list(*fields)[:SLOT_EVENTS_LIMIT + 1])
+        if len(slots) > SLOT_EVENTS_LIMIT:
+            return queryset, set(queryset.values_list('date', flat=True).distinct()), None
+        return queryset, {day for day, _, _ in slots}, slots
+
+    @admin.action(description='Delete selected appointments', permissions=['delete'])
+    def delete_appointments(self, request, queryset):
+        if request.POST.get('post') != 'yes':
+            paginator = self.get_paginator(request, queryset, self.list_per_page)
+            return TemplateResponse(request, 'admin/booking/appointment/delete_selected_confirmation.html', {
+                **self.admin_site.each_context(request),
+                'title': 'Are you sure?',
+                'opts': self.model._meta,
+                'objects_name': self.model._meta.verbose_name_plural,
+                'count': paginator.count,
+                'paginator': paginator,
+                'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+                'select_across': request.POST.get('select_across') == '1',
+                'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+                'media': self.media,
+            })
+
+        with transaction.atomic(using=queryset.db):
+            queryset, days, slots = self._lock_slots(queryset)
+            # One DELETE without loading the rows or sending model signals,
+            # so the signal handlers' invalidation and events are done here
+            deleted = queryset._raw_delete(queryset.db)
+            invalidate_on_commit(*days)
+            if slots is not None:
+                publish_slot_events_on_commit([(events.SLOT_FREED, *slot) for slot in slots], queryset.db)
+        self.message_user(request, f'Deleted {deleted} appointments.', messages.SUCCESS)
+
+    @admin.action(description='Move selected appointments to the chosen provider', permissions=['change'])
+    def reassign_provider(self, request, queryset):
+        form = self.action_form(request.POST)
+        provider = form.fields['provider'].clean(request.POST.get('provider'))
+        provider_id = provider and provider.id
+        try:
+            with transaction.atomic(using=queryset.db):
+                queryset, days, slots = self._lock_slots(queryset)
+                # One UPDATE without model signals, see delete_appointments
+                updated = queryset.update(provider=provider)
+                invalidate_on_commit(*days)
+                if slots is not None:
+                    publish_slot_events_on_commit([
+                        event
+                        for day, time_slot, old_provider_id in slots if old_provider_id != provider_id
+                        for event in (
+                            (events.SLOT_FREED, day, time_slot, old_provider_id),
+                            (events.SLOT_TAKEN, day, time_slot, provider_id),
+                        )
+                    ], queryset.db)
+        except IntegrityError:
+            self.message_user(
+                request, 'The provider is already booked in some of these slots. No appointments were moved.',
+                messages.ERROR
+            )
+            return
+        self.message_user(request, f'Moved {updated} appointments to {provider or "no provider"}.', messages.SUCCESS)
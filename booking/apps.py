@@ -4,3 +4,17 @@ from django.apps import AppConfig
 class BookingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'booking'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from . import signals  # noqa: F401
+        from .cache import collect_metrics
+        from .idempotency import collect_metrics as collect_idempotency_metrics
+        from .throttling import collect_metrics as collect_throttle_metrics
+        from appointment_system.db import configure_sqlite
+        from appointment_system.metrics import register_collector
+
+        register_collector(collect_metrics)
+        register_collector(collect_idempotency_metrics)
+        register_collector(collect_throttle_metrics)
+        connection_created.connect(configure_sqlite, dispatch_uid='configure_sqlite')
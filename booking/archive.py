@@ -0,0 +1,107 @@
+"""
+Archival of past appointments.
+
+The archive_appointments command moves appointments older than
+settings.BOOKING_ARCHIVE_AFTER_DAYS from the live Appointment table into
+ArchivedAppointment, in batches that each commit on their own, so the
+live table (and its indexes) only holds recent and future appointments
+and an interrupted run is resumed by running it again. On PostgreSQL the
+archive is partitioned by date range, one partition per year, created
+before the first rows of a year are moved in.
+
+Archived appointments still take their slots. Queries that can reach
+archivable dates read both tables through appointment_rows(), which adds
+the archive with UNION ALL and stays a single query; queries of later
+dates read the live table alone. Bookings and holds are only checked
+against the live table, so dates before archive_cutoff() cannot be booked
+or held (booking.views.clean_slot_data).
+
+Moving rows does not change availability, so it sends no model signals,
+invalidates no cached slots and publishes no slot events.
+"""
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+
+from .models import Appointment, ArchivedAppointment
+
+# Fields copied from Appointment to ArchivedAppointment
+FIELDS = ('id', 'name', 'phone_number', 'provider_id', 'date', 'time_slot', 'created_at')
+
+
+def archive_cutoff(today=None):
+    """The first date whose appointments are never archived."""
+    return (today or date.today()) - timedelta(days=settings.BOOKING_ARCHIVE_AFTER_DAYS)
+
+
+def appointment_rows(*fields, since=None, flat=False, **filters):
+    """
+    values_list(*fields) of the live and archived appointments matching
+    filters, as one query.
+
+    since is the earliest date the filters can match (None when unbounded);
+    when it is not older than archive_cutoff() the archive cannot hold
+    matching rows and only the live table is read. Rows come in no
+    particular order.
+    """
+    live = Appointment.objects.filter(**filters).values_list(*fields, flat=flat)
+    if since is not None and since >= archive_cutoff():
+        return live
+    archived = ArchivedAppointment.objects.filter(**filters).values_list(*fields, flat=flat)
+    return live.union(archived, all=True)
+
+
+def ensure_partitions(years, using=DEFAULT_DB_ALIAS):
+    """Create the yearly archive partitions of years on PostgreSQL; does nothing elsewhere."""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    table = ArchivedAppointment._meta.db_table
+    with connection.cursor() as cursor:
+        for year in sorted(years):
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {table}_y{year:04d} PARTITION OF {table} '
+                f"FOR VALUES FROM ('{year:04d}-01-01') TO ('{year + 1:04d}-01-01')"
+            )
+
+
+def archive_batch(before, batch_size):
+    """
+    Move up to batch_size of the oldest appointments dated before before
+    into the archive in one transaction. Returns the number moved.
+    """
+    using = router.db_for_write(Appointment)
+    with transaction.atomic(using=using):
+        # Rows locked by a concurrent run are left to it
+        rows = list(
+            Appointment.objects.using(using).select_for_update(skip_locked=True)
+            .filter(date__lt=before).order_by('date').values_list(*FIELDS)[:batch_size]
+        )
+        if not rows:
+            return 0
+
+        ensure_partitions({row[FIELDS.index('date')].year for row in rows}, using)
+        ArchivedAppointment.objects.using(using).bulk_create(
+            [ArchivedAppointment(**dict(zip(FIELDS, row))) for row in rows]
+        )
+        # A raw DELETE without model signals: the slots stay taken by the
+        # archived rows, so there is nothing to invalidate or publish
+        Appointment.objects.filter(pk__in=[row[0] for row in rows])._raw_delete(using)
+    return len(rows)
+
+
+def archive_appointments(before, batch_size=5000, max_batches=None):
+    """
+    Move every appointment dated before before into the archive, batch by
+    batch, stopping after max_batches batches when given. Returns the
+    number moved.
+    """
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = archive_batch(before, batch_size)
+        if not moved:
+            break
+        total += moved
+        batches += 1
+    return total
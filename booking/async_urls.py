@@ -0,0 +1,14 @@
+from django.urls import path
+from . import async_views, urls
+
+ASYNC_VIEWS = {
+    'available_slots': async_views.get_available_slots,
+    'book_appointment': async_views.book_appointment,
+}
+
+# Same routes as booking.urls with the hot endpoints served by native async views
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS[pattern.name], name=pattern.name)
+    if pattern.name in ASYNC_VIEWS else pattern
+    for pattern in urls.urlpatterns
+]
@@ -0,0 +1,171 @@
+"""
+Native async versions of the availability and booking endpoints.
+
+Under ASGI these run on the event loop instead of hopping through the
+sync-to-async thread pool for every request. They use the async cache and
+ORM APIs and are plain Django views, so they accept and return the same
+JSON as the DRF views in booking.views but bypass DRF. Routed by
+booking.async_urls when settings.BOOKING_ASYNC_VIEWS is enabled.
+
+slot_events streams slot updates with Server-Sent Events and is routed in
+both URL configurations. It holds its connection open, which only works
+under ASGI: a WSGI server would buffer the endless stream in a worker
+thread, so there it answers 204, which tells EventSource clients not to
+reconnect.
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from . import events
+from .bitset import EMPTY
+from .calendars import aget_calendar
+from .cache import aget_booked_slots, aget_booked_slots_for_dates, aget_provider_bookings_for_dates, aget_versions
+from .holds import BOOKED_MESSAGE, SlotUnavailable
+from .idempotency import idempotent
+from .models import Provider
+from .renderers import RawJSONResponse, json_response
+from .throttling import throttled
+from .views import (
+    availability_content, availability_etag, availability_range_content, booking_provider_ids, clean_booking_data, etag_matches, insert_appointment,
+    not_modified_response, parse_date, parse_date_range, parse_hold_token, set_availability_caching, slot_taken_data,
+)
+
+# Seconds between keep-alive comments on an idle event stream
+HEARTBEAT_SECONDS = 15
+
+# Milliseconds an EventSource waits before reconnecting
+RETRY_MILLISECONDS = 3000
+
+
+@require_GET
+@throttled
+async def get_available_slots(request):
+    """
+    Retrieve available appointment slots for a specific date or a date range.
+
+    Same parameters and responses as booking.views.get_available_slots.
+    """
+    range_mode = 'start' in request.GET or 'end' in request.GET
+    if range_mode:
+        dates, error_message = parse_date_range(request.GET.get('start'), request.GET.get('end'))
+    else:
+        dates, error_message = parse_date(request.GET.get('date'))
+    if error_message:
+        return json_response({'error': error_message}, status=400)
+
+    calendar = await aget_calendar()
+    etag = availability_etag(await aget_versions(dates), calendar.version)
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+
+    if range_mode:
+        booked_by_date = await aget_booked_slots_for_dates(dates)
+        content = availability_range_content(calendar, dates, booked_by_date)
+    else:
+        content = availability_content(calendar, dates[0], await aget_booked_slots(dates[0]))
+
+    return set_availability_caching(RawJSONResponse(content), etag)
+
+
+@csrf_exempt
+@require_POST
+@throttled
+@idempotent
+async def book_appointment(request):
+    """
+    Book a new appointment.
+
+    Same request body and responses as booking.views.book_appointment.
+    Django's async ORM cannot open atomic blocks, so the INSERT and its
+    savepoint run in one sync_to_async() call.
+    """
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return json_response({'error': 'Request body must be valid JSON'}, status=400)
+    if not isinstance(data, dict):
+        return json_response({'error': 'Request body must be a JSON object'}, status=400)
+
+    provider_ids = booking_provider_ids([data])
+    providers = await Provider.objects.filter(is_active=True).ain_bulk(provider_ids) if provider_ids else {}
+    calendar = await aget_calendar()
+    booking, error_message = clean_booking_data(data, providers, calendar)
+    if not error_message:
+        hold, error_message = parse_hold_token(data.get('hold'))
+    if error_message:
+        return json_response({'error': error_message}, status=400)
+
+    try:
+        appointment = await sync_to_async(insert_appointment)(booking, hold)
+    except (IntegrityError, SlotUnavailable) as e:
+        error = str(e) if isinstance(e, SlotUnavailable) else BOOKED_MESSAGE
+        schedule = calendar.schedule_for(booking['date'], booking['provider'])
+        return json_response(slot_taken_data(booking, await abooked_slots_of(booking), schedule, error), status=409)
+
+    return json_response({
+        'success': True,
+        'message': 'Appointment booked successfully',
+        'appointment_id': appointment.id
+    })
+
+
+async def abooked_slots_of(booking):
+    """Async version of booking.views.booked_slots_of()."""
+    provider = booking['provider']
+    if provider is None:
+        return await aget_booked_slots(booking['date'])
+    bookings = await aget_provider_bookings_for_dates([booking['date']])
+    return bookings[booking['date']].get(provider.id, EMPTY)
+
+
+@require_GET
+async def slot_events(request):
+    """
+    Stream slot updates for a date as Server-Sent Events.
+
+    Parameters:
+    - request: HTTP GET request with 'date' parameter (YYYY-MM-DD format)
+
+    Events:
+    event: slot_taken
+    data: {"type": "slot_taken", "date": "2024-03-09", "time_slot": "10:00 AM", "provider": null}
+
+    event: slot_freed
+    data: {"type": "slot_freed", "date": "2024-03-09", "time_slot": "10:00 AM", "provider": 3}
+
+    "provider" is the provider's id, or null for the default schedule.
+
+    Responds 204 No Content when not served under ASGI.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    dates, error_message = parse_date(request.GET.get('date'))
+    if error_message:
+        return JsonResponse({'error': error_message}, status=400)
+
+    return StreamingHttpResponse(
+        event_stream(dates[0]),
+        content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+async def event_stream(day):
+    with events.subscribe(day) as subscription:
+        # Sent once subscribed, so a client can tell no event was missed since
+        yield f'retry: {RETRY_MILLISECONDS}\n\n'
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), HEARTBEAT_SECONDS)
+            except TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
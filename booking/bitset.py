@@ -0,0 +1,109 @@
+"""
+Compact sets of minutes of the day.
+
+A SlotSet holds minutes of the day as the bits of one Python integer: bit m
+is set when minute m is in the set. Union, intersection and difference are
+single integer operations, membership is a shift and the smallest members
+are found by isolating the lowest set bit, so availability over many dates
+and providers never scans lists of slots.
+
+SlotSets do not depend on any schedule, so the bookings of providers with
+different hours combine with the same operations;
+booking.schedule.Schedule turns them back into slot labels.
+"""
+from itertools import islice
+
+
+class SlotSet:
+    """
+    Immutable set of minutes of the day.
+
+    Supports |, &, - and ^ with other SlotSets, `in`, len(), ordered
+    iteration, first(), after() and take().
+    """
+
+    __slots__ = ('bits',)
+
+    def __init__(self, minutes=()):
+        bits = 0
+        for minute in minutes:
+            bits |= 1 << minute
+        object.__setattr__(self, 'bits', bits)
+
+    @classmethod
+    def from_bits(cls, bits):
+        """Wrap an integer whose set bits are the minutes of the set."""
+        slot_set = cls.__new__(cls)
+        object.__setattr__(slot_set, 'bits', bits)
+        return slot_set
+
+    def __setattr__(self, name, value):
+        raise AttributeError('SlotSet is immutable')
+
+    def __reduce__(self):
+        return (type(self).from_bits, (self.bits,))
+
+    def __contains__(self, minute):
+        return minute >= 0 and (self.bits >> minute) & 1 == 1
+
+    def __iter__(self):
+        """Yield the minutes in ascending order."""
+        bits = self.bits
+        while bits:
+            lowest = bits & -bits
+            yield lowest.bit_length() - 1
+            bits ^= lowest
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def __bool__(self):
+        return self.bits != 0
+
+    def __eq__(self, other):
+        if not isinstance(other, SlotSet):
+            return NotImplemented
+        return self.bits == other.bits
+
+    def __hash__(self):
+        return hash(self.bits)
+
+    def __or__(self, other):
+        if not isinstance(other, SlotSet):
+            return NotImplemented
+        return SlotSet.from_bits(self.bits | other.bits)
+
+    def __and__(self, other):
+        if not isinstance(other, SlotSet):
+            return NotImplemented
+        return SlotSet.from_bits(self.bits & other.bits)
+
+    def __sub__(self, other):
+        if not isinstance(other, SlotSet):
+            return NotImplemented
+        return SlotSet.from_bits(self.bits & ~other.bits)
+
+    def __xor__(self, other):
+        if not isinstance(other, SlotSet):
+            return NotImplemented
+        return SlotSet.from_bits(self.bits ^ other.bits)
+
+    def __repr__(self):
+        return f'SlotSet({list(self)})'
+
+    def first(self):
+        """The smallest minute of the set, or None when it is empty."""
+        if not self.bits:
+            return None
+        return (self.bits & -self.bits).bit_length() - 1
+
+    def after(self, minute):
+        """The minutes of the set greater than minute."""
+        return SlotSet.from_bits(self.bits >> (minute + 1) << (minute + 1))
+
+    def take(self, count):
+        """The count smallest minutes of the set, in ascending order."""
+        return list(islice(self, count))
+
+
+EMPTY = SlotSet()
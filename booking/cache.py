@@ -0,0 +1,403 @@
+"""
+Per-date cache of booked slots.
+
+Availability for a date only changes when an Appointment on that date is
+written, so the set of booked slots (a SlotSet of minutes of the day) is
+cached per date
+in the Django cache named by settings.BOOKING_CACHE_ALIAS. Entries are
+dropped by the model signals in booking.signals whenever an appointment is
+saved or deleted; the timeout only bounds how long a missed invalidation
+can live.
+
+With read replicas (appointment_system.routers), invalidating a date also
+marks it as written for settings.DATABASE_REPLICA_PIN_SECONDS. Entries of
+marked dates are reloaded from the primary, so a replica that has not yet
+seen the latest bookings cannot put stale slots into the shared cache.
+
+Appointments with a provider are cached separately, per date, as a
+{provider id: booked SlotSet} map covering every provider, so availability
+across any number of providers is computed from one entry per date.
+
+Dates old enough to have been archived are loaded from the live and the
+archive table together (booking.archive.appointment_rows()).
+
+Live slot holds (booking.holds) are kept per date in a separate entry
+that is written through on every hold change, never loaded by readers:
+a missing entry means no holds. Every read below fetches it together
+with the booked slots and reports held slots as booked until their
+expiry time, so holds lapse without any write.
+
+Every date also has an opaque availability version that changes on each
+invalidation, and whenever a hold of the date is placed, released or
+expires. Versions back the ETags of the availability endpoint. A version
+lost to eviction or expiry is replaced by a fresh random one, and creating
+a version drops the date's cached slots, so every entry served under a
+version was loaded after it. Versions expire with the same timeout as the
+entries: with a cache per process (the default local memory cache),
+bookings made through another process are seen, with a new ETag, after
+settings.BOOKING_CACHE_TIMEOUT seconds at most, and a client is never
+told "not modified" for data that changed longer ago than that. A shared
+cache (e.g. Redis) makes every invalidation reach all processes at once.
+"""
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .archive import appointment_rows
+from .bitset import SlotSet
+
+KEY_PREFIX = 'booking:booked'
+PROVIDERS_KEY_PREFIX = 'booking:providers'
+VERSION_KEY_PREFIX = 'booking:version'
+HELD_KEY_PREFIX = 'booking:held'
+WRITTEN_KEY_PREFIX = 'booking:written'
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+
+def _cache():
+    return caches[settings.BOOKING_CACHE_ALIAS]
+
+
+def _key(day):
+    return f'{KEY_PREFIX}:{day}'
+
+
+def _providers_key(day):
+    return f'{PROVIDERS_KEY_PREFIX}:{day}'
+
+
+def _version_key(day):
+    return f'{VERSION_KEY_PREFIX}:{day}'
+
+
+def _held_key(day):
+    return f'{HELD_KEY_PREFIX}:{day}'
+
+
+def _written_key(day):
+    return f'{WRITTEN_KEY_PREFIX}:{day}'
+
+
+def _entry_keys(days):
+    """Keys of the cached booked slots of days."""
+    return [key for day in days for key in (_key(day), _providers_key(day))]
+
+
+def _extra_keys(days):
+    """Keys fetched together with the entries of days: held entries, and written marks when there are replicas."""
+    keys = [_held_key(day) for day in days]
+    if settings.DATABASE_REPLICAS:
+        keys.extend(_written_key(day) for day in days)
+    return keys
+
+
+def _fresh(queryset, days, found):
+    """queryset, read from the primary when one of days is marked as recently written in found."""
+    if any(_written_key(day) in found for day in days):
+        return queryset.using(DEFAULT_DB_ALIAS)
+    return queryset
+
+
+def _live_holds(held, now):
+    """The (provider id, minute) pairs of the holds in a held entry that expire after now."""
+    return [(provider_id, minute) for provider_id, minute, expires in held or () if expires > now]
+
+
+def _held_slots(held, now):
+    """SlotSet of the live holds on the default calendar in a held entry."""
+    return SlotSet(minute for provider_id, minute in _live_holds(held, now) if provider_id is None)
+
+
+def _with_provider_holds(bookings, held, now):
+    """Copy of a {provider id: SlotSet} map with the live provider holds of a held entry added."""
+    held_by_provider = {}
+    for provider_id, minute in _live_holds(held, now):
+        if provider_id is not None:
+            held_by_provider.setdefault(provider_id, []).append(minute)
+    if not held_by_provider:
+        return bookings
+    bookings = dict(bookings)
+    for provider_id, minutes in held_by_provider.items():
+        bookings[provider_id] = bookings.get(provider_id, SlotSet()) | SlotSet(minutes)
+    return bookings
+
+
+def _version(token, held, now):
+    live = _live_holds(held, now)
+    if not live:
+        return token
+    return f'{token}.' + ','.join(f'{provider_id or ""}:{minute}' for provider_id, minute in sorted(live, key=str))
+
+
+def set_held(day, holds):
+    """
+    Replace the held entry of a date with its live holds, given as
+    (provider id or None, minute of the day, expiry timestamp) tuples.
+    """
+    if holds:
+        # No hold outlives its entry: holds expire at most BOOKING_HOLD_TTL after they are placed
+        _cache().set(_held_key(day), tuple(holds), settings.BOOKING_HOLD_TTL + 1)
+    else:
+        _cache().delete(_held_key(day))
+
+
+def _new_version():
+    return uuid.uuid4().hex
+
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def get_stats():
+    """Return a snapshot of the hit/miss/invalidation counters of this process."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_stats():
+    """Reset the counters returned by get_stats()."""
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
+
+
+def collect_metrics():
+    """Cache counters for appointment_system.metrics.register_collector()."""
+    stats = get_stats()
+    return [
+        ('booking_availability_cache_requests_total', 'Availability cache lookups by result.', 'counter', [
+            ({'result': 'hit'}, stats['hits']),
+            ({'result': 'miss'}, stats['misses']),
+        ]),
+        ('booking_availability_cache_invalidations_total', 'Dates dropped from the availability cache.', 'counter', [
+            ({}, stats['invalidations']),
+        ]),
+    ]
+
+
+def get_booked_slots(day):
+    """Return the SlotSet of booked or held slots (minutes of the day) for a date."""
+    found = _cache().get_many([_key(day), *_extra_keys([day])])
+    held = _held_slots(found.get(_held_key(day)), time.time())
+    booked = found.get(_key(day))
+    if booked is not None:
+        _count('hits')
+        return booked | held
+
+    _count('misses')
+    rows = appointment_rows('time_slot', flat=True, since=day, date=day, provider__isnull=True)
+    booked = SlotSet(_fresh(rows, [day], found))
+    _cache().set(_key(day), booked, settings.BOOKING_CACHE_TIMEOUT)
+    return booked | held
+
+
+def get_booked_slots_for_dates(days):
+    """
+    Return a {date: SlotSet of booked slots} map for several dates.
+
+    Cached dates come from one get_many() call and all missing dates are
+    loaded from the database with a single query.
+    """
+    keys = {_key(day): day for day in days}
+    found = _cache().get_many([*keys, *_extra_keys(days)])
+    booked_by_date = {day: found[key] for key, day in keys.items() if key in found}
+    _count('hits', len(booked_by_date))
+
+    missing = [day for key, day in keys.items() if key not in found]
+    if missing:
+        _count('misses', len(missing))
+        loaded = {day: set() for day in missing}
+        # A range scan over the (date, time_slot) index; rows of dates that
+        # were already cached are simply skipped
+        booked = appointment_rows(
+            'date', 'time_slot', since=min(missing), date__range=(min(missing), max(missing)), provider__isnull=True
+        )
+        for booked_date, time_slot in _fresh(booked, missing, found):
+            if booked_date in loaded:
+                loaded[booked_date].add(time_slot)
+
+        loaded = {day: SlotSet(slots) for day, slots in loaded.items()}
+        _cache().set_many({_key(day): slots for day, slots in loaded.items()}, settings.BOOKING_CACHE_TIMEOUT)
+        booked_by_date.update(loaded)
+
+    return _add_held_slots(booked_by_date, found)
+
+
+def _add_held_slots(booked_by_date, found):
+    now = time.time()
+    return {day: booked | _held_slots(found.get(_held_key(day)), now) for day, booked in booked_by_date.items()}
+
+
+async def aget_booked_slots(day):
+    """Async version of get_booked_slots() using the async cache and ORM APIs."""
+    found = await _cache().aget_many([_key(day), *_extra_keys([day])])
+    held = _held_slots(found.get(_held_key(day)), time.time())
+    booked = found.get(_key(day))
+    if booked is not None:
+        _count('hits')
+        return booked | held
+
+    _count('misses')
+    rows = appointment_rows('time_slot', flat=True, since=day, date=day, provider__isnull=True)
+    booked = SlotSet([time_slot async for time_slot in _fresh(rows, [day], found)])
+    await _cache().aset(_key(day), booked, settings.BOOKING_CACHE_TIMEOUT)
+    return booked | held
+
+
+async def aget_booked_slots_for_dates(days):
+    """Async version of get_booked_slots_for_dates()."""
+    keys = {_key(day): day for day in days}
+    found = await _cache().aget_many([*keys, *_extra_keys(days)])
+    booked_by_date = {day: found[key] for key, day in keys.items() if key in found}
+    _count('hits', len(booked_by_date))
+
+    missing = [day for key, day in keys.items() if key not in found]
+    if missing:
+        _count('misses', len(missing))
+        loaded = {day: set() for day in missing}
+        booked = appointment_rows(
+            'date', 'time_slot', since=min(missing), date__range=(min(missing), max(missing)), provider__isnull=True
+        )
+        async for booked_date, time_slot in _fresh(booked, missing, found):
+            if booked_date in loaded:
+                loaded[booked_date].add(time_slot)
+
+        loaded = {day: SlotSet(slots) for day, slots in loaded.items()}
+        await _cache().aset_many({_key(day): slots for day, slots in loaded.items()}, settings.BOOKING_CACHE_TIMEOUT)
+        booked_by_date.update(loaded)
+
+    return _add_held_slots(booked_by_date, found)
+
+
+def _load_provider_bookings(rows, missing):
+    loaded = {day: {} for day in missing}
+    for booked_date, provider_id, time_slot in rows:
+        if booked_date in loaded:
+            loaded[booked_date].setdefault(provider_id, []).append(time_slot)
+    return {
+        day: {provider_id: SlotSet(slots) for provider_id, slots in providers.items()}
+        for day, providers in loaded.items()
+    }
+
+
+def _provider_bookings_query(missing):
+    # A range scan over the (date, provider, time_slot) index
+    return appointment_rows(
+        'date', 'provider_id', 'time_slot',
+        since=min(missing), date__range=(min(missing), max(missing)), provider__isnull=False
+    )
+
+
+def get_provider_bookings_for_dates(days):
+    """
+    Return a {date: {provider id: SlotSet of booked slots}} map for several dates.
+
+    Providers without bookings on a date are absent. Dates missing from the
+    cache are loaded with one query for all providers.
+    """
+    keys = {_providers_key(day): day for day in days}
+    found = _cache().get_many([*keys, *_extra_keys(days)])
+    bookings_by_date = {day: found[key] for key, day in keys.items() if key in found}
+    _count('hits', len(bookings_by_date))
+
+    missing = [day for key, day in keys.items() if key not in found]
+    if missing:
+        _count('misses', len(missing))
+        loaded = _load_provider_bookings(_fresh(_provider_bookings_query(missing), missing, found), missing)
+        _cache().set_many({_providers_key(day): bookings for day, bookings in loaded.items()}, settings.BOOKING_CACHE_TIMEOUT)
+        bookings_by_date.update(loaded)
+
+    return _add_provider_holds(bookings_by_date, found)
+
+
+def _add_provider_holds(bookings_by_date, found):
+    now = time.time()
+    return {
+        day: _with_provider_holds(bookings, found.get(_held_key(day)), now)
+        for day, bookings in bookings_by_date.items()
+    }
+
+
+async def aget_provider_bookings_for_dates(days):
+    """Async version of get_provider_bookings_for_dates()."""
+    keys = {_providers_key(day): day for day in days}
+    found = await _cache().aget_many([*keys, *_extra_keys(days)])
+    bookings_by_date = {day: found[key] for key, day in keys.items() if key in found}
+    _count('hits', len(bookings_by_date))
+
+    missing = [day for key, day in keys.items() if key not in found]
+    if missing:
+        _count('misses', len(missing))
+        rows = [row async for row in _fresh(_provider_bookings_query(missing), missing, found)]
+        loaded = _load_provider_bookings(rows, missing)
+        await _cache().aset_many({_providers_key(day): bookings for day, bookings in loaded.items()}, settings.BOOKING_CACHE_TIMEOUT)
+        bookings_by_date.update(loaded)
+
+    return _add_provider_holds(bookings_by_date, found)
+
+
+def get_versions(days):
+    """
+    Return a {date: version} map of the availability versions of several
+    dates. A version names the invalidation and the live holds of its date.
+    """
+    keys = {_version_key(day): day for day in days}
+    found = _cache().get_many([*keys, *map(_held_key, days)])
+    created = []
+    for key in keys.keys() - found.keys():
+        version = _new_version()
+        # Another process may have created the version in the meantime
+        if _cache().add(key, version, settings.BOOKING_CACHE_TIMEOUT):
+            created.append(keys[key])
+        else:
+            version = _cache().get(key) or version
+        found[key] = version
+    if created:
+        _cache().delete_many(_entry_keys(created))
+    now = time.time()
+    return {day: _version(found[key], found.get(_held_key(day)), now) for key, day in keys.items()}
+
+
+async def aget_versions(days):
+    """Async version of get_versions()."""
+    keys = {_version_key(day): day for day in days}
+    found = await _cache().aget_many([*keys, *map(_held_key, days)])
+    created = []
+    for key in keys.keys() - found.keys():
+        version = _new_version()
+        if await _cache().aadd(key, version, settings.BOOKING_CACHE_TIMEOUT):
+            created.append(keys[key])
+        else:
+            version = await _cache().aget(key) or version
+        found[key] = version
+    if created:
+        await _cache().adelete_many(_entry_keys(created))
+    now = time.time()
+    return {day: _version(found[key], found.get(_held_key(day)), now) for key, day in keys.items()}
+
+
+def invalidate(*days):
+    """Drop the cached booked slots of the given dates and bump their versions."""
+    _count('invalidations', len(days))
+    _cache().delete_many(_entry_keys(days))
+    _cache().set_many({_version_key(day): _new_version() for day in days}, settings.BOOKING_CACHE_TIMEOUT)
+    if settings.DATABASE_REPLICAS:
+        _cache().set_many({_written_key(day): True for day in days}, settings.DATABASE_REPLICA_PIN_SECONDS)
+
+
+def invalidate_on_commit(*days):
+    """
+    Drop the cached booked slots of the given dates now and again once the
+    current transaction commits, so a reader that repopulated an entry from
+    uncommitted state in between cannot leave it stale.
+    """
+    invalidate(*days)
+    transaction.on_commit(lambda: invalidate(*days))
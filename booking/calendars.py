@@ -0,0 +1,142 @@
+"""
+Business-hours calendars.
+
+The hours of a date are resolved, in order of precedence, from:
+
+1. Holiday: nobody can be booked
+2. DateOverride of the provider (or of the default calendar) for the date
+3. WeeklyHours of the provider (or of the default calendar) for the weekday
+4. The provider's own hours, or DEFAULT_SCHEDULE
+
+All rules are compiled into a Calendar of shared Schedule objects that
+resolves any date with a few dict lookups. The compiled Calendar is kept in
+process and tagged with the rules version stored in the Django cache named
+by settings.BOOKING_CACHE_ALIAS; rule changes replace the version (see
+booking.signals), so every process recompiles once on its next request
+instead of on every request. The version expires after
+settings.BOOKING_CACHE_TIMEOUT seconds, so with a cache per process (the
+default local memory cache) rule changes made through another process are
+picked up, and change the availability ETags, within that time.
+"""
+import threading
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .models import DateOverride, Holiday, WeeklyHours
+from .schedule import CLOSED_SCHEDULE, DEFAULT_SCHEDULE
+
+VERSION_KEY = 'booking:calendar:version'
+
+_compiled_lock = threading.Lock()
+_compiled = None
+
+
+class Calendar:
+    """Compiled calendar rules; use schedule_for() to resolve the Schedule of a date."""
+
+    __slots__ = ('version', 'holidays', 'overrides', 'weekly')
+
+    def __init__(self, version, holidays, overrides, weekly):
+        # holidays: set of dates
+        # overrides: {(provider id or None, date): Schedule}
+        # weekly: {(provider id or None, weekday): Schedule}
+        self.version = version
+        self.holidays = frozenset(holidays)
+        self.overrides = overrides
+        self.weekly = weekly
+
+    def schedule_for(self, day, provider=None):
+        """The Schedule of a date for a provider, or for the default calendar when provider is None."""
+        if day in self.holidays:
+            return CLOSED_SCHEDULE
+
+        provider_id = provider.id if provider is not None else None
+        schedule = self.overrides.get((provider_id, day))
+        if schedule is None:
+            schedule = self.weekly.get((provider_id, day.weekday()))
+        if schedule is None:
+            schedule = provider.schedule if provider is not None else DEFAULT_SCHEDULE
+        return schedule
+
+
+def _rule_schedule(rule):
+    return CLOSED_SCHEDULE if rule.is_closed else rule.schedule
+
+
+def compile_calendar(version):
+    """Load every calendar rule (three queries) into a Calendar tagged with version."""
+    return Calendar(
+        version,
+        holidays=Holiday.objects.values_list('date', flat=True),
+        overrides={(rule.provider_id, rule.date): _rule_schedule(rule) for rule in DateOverride.objects.all()},
+        weekly={(rule.provider_id, rule.weekday): _rule_schedule(rule) for rule in WeeklyHours.objects.all()},
+    )
+
+
+def _cache():
+    return caches[settings.BOOKING_CACHE_ALIAS]
+
+
+def _new_version():
+    return uuid.uuid4().hex
+
+
+def _current(version):
+    compiled = _compiled
+    if compiled is not None and compiled.version == version:
+        return compiled
+    return None
+
+
+def _store(calendar):
+    global _compiled
+    with _compiled_lock:
+        _compiled = calendar
+    return calendar
+
+
+def get_version():
+    """The current rules version; a version lost to eviction or expiry is replaced by a fresh one."""
+    version = _cache().get(VERSION_KEY)
+    if version is None:
+        version = _new_version()
+        if not _cache().add(VERSION_KEY, version, settings.BOOKING_CACHE_TIMEOUT):
+            version = _cache().get(VERSION_KEY) or version
+    return version
+
+
+async def aget_version():
+    """Async version of get_version()."""
+    version = await _cache().aget(VERSION_KEY)
+    if version is None:
+        version = _new_version()
+        if not await _cache().aadd(VERSION_KEY, version, settings.BOOKING_CACHE_TIMEOUT):
+            version = await _cache().aget(VERSION_KEY) or version
+    return version
+
+
+def get_calendar():
+    """Return the compiled Calendar of the current rules, compiling it only when the rules changed."""
+    version = get_version()
+    return _current(version) or _store(compile_calendar(version))
+
+
+async def aget_calendar():
+    """Async version of get_calendar()."""
+    version = await aget_version()
+    return _current(version) or _store(await sync_to_async(compile_calendar)(version))
+
+
+def invalidate():
+    """Replace the rules version so every process recompiles its Calendar."""
+    _cache().set(VERSION_KEY, _new_version(), settings.BOOKING_CACHE_TIMEOUT)
+
+
+def invalidate_on_commit():
+    """Replace the rules version now and again once the current transaction commits."""
+    invalidate()
+    transaction.on_commit(invalidate)
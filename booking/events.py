@@ -0,0 +1,125 @@
+"""
+Slot update broadcasting for the Server-Sent Events endpoint.
+
+Committed appointment writes publish "slot_taken" / "slot_freed" events for
+their date (see booking.signals). Clients subscribed to that date through
+booking.async_views.slot_events receive them without polling.
+
+The hub delegates to the backend named by settings.BOOKING_EVENTS_BACKEND.
+The default InProcessBackend only reaches subscribers connected to the
+same process; a multi-process deployment needs a backend built on a shared
+broker (e.g. Redis pub/sub) with the same publish()/subscribe() interface.
+"""
+import asyncio
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .schedule import minutes_to_label
+
+SLOT_TAKEN = 'slot_taken'
+SLOT_FREED = 'slot_freed'
+
+# Events buffered per subscriber before the oldest ones are dropped
+QUEUE_SIZE = 100
+
+
+class Subscription:
+    """Queue of the events of one date for one subscriber; use as a context manager."""
+
+    def __init__(self, backend, key):
+        self.backend = backend
+        self.key = key
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+
+    async def get(self):
+        """Wait for the next event (safe to cancel, e.g. by asyncio.wait_for)."""
+        return await self.queue.get()
+
+    def deliver(self, event):
+        """Called on the subscriber's loop; drops the oldest event when full."""
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    def close(self):
+        self.backend.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class InProcessBackend:
+    """
+    Broadcast to the subscriptions opened in this process.
+
+    publish() may be called from any thread; events are handed to each
+    subscriber's event loop with call_soon_threadsafe().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+
+    def publish(self, day, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(str(day), ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The subscriber's loop has been closed
+                pass
+
+    def subscribe(self, day):
+        """Open a Subscription to the events of day; call from a running event loop."""
+        subscription = Subscription(self, str(day))
+        with self._lock:
+            self._subscriptions.setdefault(subscription.key, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.key)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.key]
+
+    def subscriber_count(self, day=None):
+        with self._lock:
+            if day is not None:
+                return len(self._subscriptions.get(str(day), ()))
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = import_string(settings.BOOKING_EVENTS_BACKEND)()
+    return _backend
+
+
+def publish(event_type, day, time_slot, provider=None):
+    """Broadcast that time_slot (minute of the day) of a provider (id or None) on day was taken or freed."""
+    get_backend().publish(day, {
+        'type': event_type,
+        'date': str(day),
+        'time_slot': minutes_to_label(time_slot),
+        'provider': provider,
+    })
+
+
+def subscribe(day):
+    return get_backend().subscribe(day)
@@ -0,0 +1,104 @@
+"""
+Streaming export of appointments as CSV or NDJSON.
+
+export_rows() reads the appointments of a date range, live and archived
+(booking.archive), as values_list() tuples through iterator(), so only
+chunk_size rows are held at a time; on PostgreSQL they come from a
+server-side cursor. export_chunks() encodes them chunk by chunk and can
+gzip the stream on the fly, so memory use stays flat however many rows
+are exported.
+
+The export endpoint (booking.views.export_appointments) streams the
+chunks in a StreamingHttpResponse and the export_appointments command
+writes them to a file.
+"""
+import csv
+import io
+import zlib
+from itertools import islice
+
+from .archive import appointment_rows
+from .renderers import dumps
+from .schedule import minutes_to_label
+
+COLUMNS = ('id', 'date', 'time_slot', 'provider_id', 'name', 'phone_number', 'created_at')
+
+# format -> content type
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+CHUNK_SIZE = 2000
+
+# Leading characters that make spreadsheets evaluate a cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def export_rows(start, end, chunk_size=CHUNK_SIZE):
+    """Iterator over the COLUMNS tuples of the appointments from start to end (inclusive), by date and slot."""
+    rows = appointment_rows(*COLUMNS, since=start, date__range=(start, end)).order_by('date', 'time_slot', 'id')
+    return rows.iterator(chunk_size=chunk_size)
+
+
+def _record(row):
+    """An exported row: the time slot as its label, dates and times in ISO 8601."""
+    appointment_id, day, time_slot, provider_id, name, phone_number, created_at = row
+    return appointment_id, day.isoformat(), minutes_to_label(time_slot), provider_id, name, phone_number, created_at.isoformat()
+
+
+def _csv_safe(value):
+    # Phone numbers such as +1234567890 are data, anything else starting
+    # like a formula is quoted so spreadsheets do not evaluate it
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES) and not value[1:].isdigit():
+        return "'" + value
+    return value
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def csv_chunks(rows, chunk_size=CHUNK_SIZE):
+    """Encode rows as CSV with a header line, yielding bytes every chunk_size rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    yield buffer.getvalue().encode()
+
+    for batch in _batches(rows, chunk_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_safe(value) for value in _record(row)] for row in batch)
+        yield buffer.getvalue().encode()
+
+
+def ndjson_chunks(rows, chunk_size=CHUNK_SIZE):
+    """Encode rows as one JSON object per line, yielding bytes every chunk_size rows."""
+    for batch in _batches(rows, chunk_size):
+        yield b''.join(dumps(dict(zip(COLUMNS, _record(row)))) + b'\n' for row in batch)
+
+
+def gzip_chunks(chunks):
+    """Compress a stream of byte chunks into one gzip stream."""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_chunks(rows, format, compress=False, chunk_size=CHUNK_SIZE):
+    """The byte chunks of rows exported in format ('csv' or 'ndjson'), gzipped when compress is set."""
+    chunks = csv_chunks(rows, chunk_size) if format == 'csv' else ndjson_chunks(rows, chunk_size)
+    return gzip_chunks(chunks) if compress else chunks
+
+
+def export_filename(start, end, format, compress=False):
+    return f'appointments-{start}-{end}.{format}' + ('.gz' if compress else '')
@@ -0,0 +1,120 @@
+"""
+Short-lived slot holds.
+
+A client that picked a slot can hold it (POST holds/) while the booking
+form is completed. The slot then shows as taken to everybody else until the
+hold is released, turned into an appointment by booking the slot with the
+hold token, or expires settings.BOOKING_HOLD_TTL seconds after it was
+placed.
+
+SlotHold rows are unique per slot and a slot cannot be held while it is
+booked. Expired holds are not swept by a job. Every read ignores them
+(expires_at > now), the expired hold of a slot is deleted when the slot is
+held or claimed again, and each new hold deletes a bounded batch of the
+oldest expired holds found through the expires_at index.
+
+Availability reads see holds through the per-date held entry of
+booking.cache, rewritten after every hold change. Bookings never trust
+that entry: it is per process with the default cache, can be evicted and
+is only rewritten once the hold commits, so every booking looks up the
+slot's hold in the database, through its unique index, in the transaction
+that inserts the appointment (see claim_slot()).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import cache, events
+from .models import Appointment, SlotHold
+from .signals import publish_on_commit
+
+BOOKED_MESSAGE = 'This slot is already booked'
+HELD_MESSAGE = 'This slot is being booked by someone else'
+
+
+class SlotUnavailable(Exception):
+    """Raised when a slot is booked or held by somebody else; the message says which."""
+
+
+def slot_filter(slot):
+    """Lookup of the rows taking the slot of a booking or hold dict (date, time_slot, provider)."""
+    return {'date': slot['date'], 'time_slot': slot['time_slot'], 'provider': slot['provider']}
+
+
+def reclaim_expired(now=None, limit=None):
+    """
+    Delete up to limit (settings.BOOKING_HOLD_RECLAIM_BATCH) of the oldest
+    expired holds with one statement over the expires_at index.
+    """
+    now = now or timezone.now()
+    limit = limit or settings.BOOKING_HOLD_RECLAIM_BATCH
+    expired = SlotHold.objects.filter(expires_at__lte=now).order_by('expires_at').values('pk')[:limit]
+    return SlotHold.objects.filter(pk__in=expired).delete()[0]
+
+
+def refresh_held(day):
+    """Rewrite the cached live holds of a date from the database."""
+    holds = SlotHold.objects.filter(date=day, expires_at__gt=timezone.now()).values_list(
+        'provider_id', 'time_slot', 'expires_at'
+    )
+    cache.set_held(day, [(provider_id, time_slot, expires_at.timestamp()) for provider_id, time_slot, expires_at in holds])
+
+
+def refresh_held_on_commit(day):
+    transaction.on_commit(lambda: refresh_held(day))
+
+
+def hold_slot(slot):
+    """
+    Hold a free slot for settings.BOOKING_HOLD_TTL seconds and return the
+    SlotHold. Raises SlotUnavailable when it is booked or held.
+    """
+    now = timezone.now()
+    reclaim_expired(now)
+    with transaction.atomic():
+        if Appointment.objects.filter(**slot_filter(slot)).exists():
+            raise SlotUnavailable(BOOKED_MESSAGE)
+        SlotHold.objects.filter(**slot_filter(slot), expires_at__lte=now).delete()
+        try:
+            with transaction.atomic():
+                hold = SlotHold.objects.create(
+                    **slot_filter(slot), expires_at=now + timedelta(seconds=settings.BOOKING_HOLD_TTL)
+                )
+        except IntegrityError:
+            raise SlotUnavailable(HELD_MESSAGE)
+
+        refresh_held_on_commit(hold.date)
+        publish_on_commit(events.SLOT_TAKEN, hold.date, hold.time_slot, hold.provider_id)
+    return hold
+
+
+def release_hold(token):
+    """Delete the hold with this token; returns whether it existed."""
+    with transaction.atomic():
+        hold = SlotHold.objects.filter(token=token).first()
+        if hold is None:
+            return False
+        SlotHold.objects.filter(pk=hold.pk).delete()
+        refresh_held_on_commit(hold.date)
+        if hold.expires_at > timezone.now():
+            publish_on_commit(events.SLOT_FREED, hold.date, hold.time_slot, hold.provider_id)
+    return True
+
+
+def claim_slot(slot, token=None):
+    """
+    Take over the hold of a slot that is about to be booked.
+
+    Deletes the slot's hold when it is the one named by token or has
+    expired, and raises SlotUnavailable when somebody else holds the slot.
+    Call it inside the transaction that inserts the appointment.
+    """
+    hold = SlotHold.objects.filter(**slot_filter(slot)).only('token', 'expires_at').first()
+    if hold is None:
+        return
+    if hold.token != token and hold.expires_at > timezone.now():
+        raise SlotUnavailable(HELD_MESSAGE)
+    SlotHold.objects.filter(pk=hold.pk).delete()
+    refresh_held_on_commit(slot['date'])
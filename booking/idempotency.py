@@ -0,0 +1,222 @@
+"""
+Idempotency-Key support for POST endpoints.
+
+A client that retries a request with the same Idempotency-Key header gets
+the stored response of the first attempt back (with an Idempotent-Replayed
+header) instead of having the request processed again. Responses are kept
+in the Django cache named by settings.BOOKING_CACHE_ALIAS for
+settings.BOOKING_IDEMPOTENCY_TTL seconds, so the store is bounded by the
+cache's own eviction.
+
+While the first attempt is being processed the key holds an in-flight
+marker; concurrent retries are answered with 409 and Retry-After. Server
+errors and 429 responses are not stored, so the request can be retried. Reusing a key for a
+different request body is rejected with 422.
+"""
+import functools
+import hashlib
+import threading
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+KEY_PREFIX = 'booking:idempotency'
+MAX_KEY_LENGTH = 255
+
+# Seconds a concurrent retry is asked to wait for the first attempt
+RETRY_AFTER = 1
+
+_stats_lock = threading.Lock()
+_stats = {'stored': 0, 'replayed': 0, 'in_flight': 0, 'mismatched': 0}
+
+
+def _cache():
+    return caches[settings.BOOKING_CACHE_ALIAS]
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def get_stats():
+    """Return a snapshot of the counters of this process."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_stats():
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
+
+
+def collect_metrics():
+    """Idempotency counters for appointment_system.metrics.register_collector()."""
+    stats = get_stats()
+    return [
+        ('booking_idempotent_requests_total', 'Requests carrying an Idempotency-Key by outcome.', 'counter', [
+            ({'outcome': outcome}, count) for outcome, count in stats.items()
+        ]),
+    ]
+
+
+def _key(request, idempotency_key):
+    digest = hashlib.sha256(f'{request.path}\n{idempotency_key}'.encode()).hexdigest()
+    return f'{KEY_PREFIX}:{digest}'
+
+
+def _fingerprint(request):
+    return hashlib.sha256(request.body).hexdigest()
+
+
+def _error(message, status):
+    return JsonResponse({'error': message}, status=status)
+
+
+def _claim(request):
+    """
+    Validate the request's Idempotency-Key.
+
+    Returns (cache key, fingerprint, None), or (None, None, error response).
+    """
+    idempotency_key = request.headers[HEADER]
+    if len(idempotency_key) > MAX_KEY_LENGTH:
+        return None, None, _error(f'{HEADER} cannot be longer than {MAX_KEY_LENGTH} characters', 400)
+    return _key(request, idempotency_key), _fingerprint(request), None
+
+
+def _begin(request):
+    """
+    Claim the request's Idempotency-Key.
+
+    Returns (cache key, fingerprint, None) when the request should be
+    processed and stored, (None, None, None) when it should be processed
+    without storing, or (None, None, response) when it is answered from the
+    store.
+    """
+    key, fingerprint, response = _claim(request)
+    if response is not None:
+        return None, None, response
+    if _cache().add(key, {'fingerprint': fingerprint}, settings.BOOKING_IDEMPOTENCY_LOCK_TIMEOUT):
+        return key, fingerprint, None
+
+    stored = _cache().get(key)
+    if stored is None:
+        # Expired in between; process the request without storing it
+        return None, None, None
+    return None, None, _stored_response(stored, fingerprint)
+
+
+async def _abegin(request):
+    """Async version of _begin()."""
+    key, fingerprint, response = _claim(request)
+    if response is not None:
+        return None, None, response
+    if await _cache().aadd(key, {'fingerprint': fingerprint}, settings.BOOKING_IDEMPOTENCY_LOCK_TIMEOUT):
+        return key, fingerprint, None
+
+    stored = await _cache().aget(key)
+    if stored is None:
+        return None, None, None
+    return None, None, _stored_response(stored, fingerprint)
+
+
+def _stored_response(stored, fingerprint):
+    if stored['fingerprint'] != fingerprint:
+        _count('mismatched')
+        return _error(f'{HEADER} was already used for a different request', 422)
+    if 'status' not in stored:
+        _count('in_flight')
+        response = _error(f'A request with this {HEADER} is still being processed', 409)
+        response['Retry-After'] = str(RETRY_AFTER)
+        return response
+
+    _count('replayed')
+    response = HttpResponse(stored['content'], status=stored['status'], content_type=stored['content_type'])
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def _entry(fingerprint, response):
+    if hasattr(response, 'render'):
+        response.render()
+    return {
+        'fingerprint': fingerprint,
+        'status': response.status_code,
+        'content_type': response['Content-Type'],
+        'content': response.content,
+    }
+
+
+def _stored(response):
+    # Server errors and rate limiting are transient; let the retry through
+    return response.status_code < 500 and response.status_code != 429
+
+
+def _finish(key, fingerprint, response):
+    if not _stored(response):
+        _cache().delete(key)
+        return response
+    _cache().set(key, _entry(fingerprint, response), settings.BOOKING_IDEMPOTENCY_TTL)
+    _count('stored')
+    return response
+
+
+async def _afinish(key, fingerprint, response):
+    """Async version of _finish()."""
+    if not _stored(response):
+        await _cache().adelete(key)
+        return response
+    await _cache().aset(key, _entry(fingerprint, response), settings.BOOKING_IDEMPOTENCY_TTL)
+    _count('stored')
+    return response
+
+
+def idempotent(view):
+    """
+    Make a sync or async view honour the Idempotency-Key header.
+
+    Requests without the header are passed through unchanged. Apply it
+    outside DRF's @api_view (and inside @swagger_auto_schema).
+    """
+    if iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if HEADER not in request.headers:
+                return await view(request, *args, **kwargs)
+            key, fingerprint, response = await _abegin(request)
+            if response is not None:
+                return response
+            if key is None:
+                return await view(request, *args, **kwargs)
+            try:
+                response = await view(request, *args, **kwargs)
+            except BaseException:
+                await _cache().adelete(key)
+                raise
+            return await _afinish(key, fingerprint, response)
+
+        return markcoroutinefunction(wrapper)
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if HEADER not in request.headers:
+            return view(request, *args, **kwargs)
+        key, fingerprint, response = _begin(request)
+        if response is not None:
+            return response
+        if key is None:
+            return view(request, *args, **kwargs)
+        try:
+            response = view(request, *args, **kwargs)
+        except BaseException:
+            _cache().delete(key)
+            raise
+        return _finish(key, fingerprint, response)
+
+    return wrapper
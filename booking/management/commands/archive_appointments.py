@@ -0,0 +1,37 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from booking.archive import archive_appointments
+
+
+class Command(BaseCommand):
+    help = (
+        'Move appointments older than --days (default BOOKING_ARCHIVE_AFTER_DAYS) '
+        'from the live table into the archive table. Each batch commits on its '
+        'own, so an interrupted run is resumed by running the command again.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Minimum age in days of archived appointments (at least BOOKING_ARCHIVE_AFTER_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help='Stop after this many batches, e.g. to bound the run time')
+
+    def handle(self, *args, days, batch_size, max_batches, **options):
+        if days is None:
+            days = settings.BOOKING_ARCHIVE_AFTER_DAYS
+        if days < settings.BOOKING_ARCHIVE_AFTER_DAYS:
+            # Availability queries only look for younger appointments in the live table
+            raise CommandError(
+                f'Appointments younger than BOOKING_ARCHIVE_AFTER_DAYS ({settings.BOOKING_ARCHIVE_AFTER_DAYS}) '
+                'days cannot be archived'
+            )
+        if batch_size < 1 or (max_batches is not None and max_batches < 1):
+            raise CommandError('batch size and max batches must be positive')
+
+        before = date.today() - timedelta(days=days)
+        moved = archive_appointments(before, batch_size=batch_size, max_batches=max_batches)
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} appointments dated before {before}'))
@@ -0,0 +1,46 @@
+from datetime import date
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from booking.export import CHUNK_SIZE, FORMATS, export_chunks, export_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Export the live and archived appointments from --start to --end (inclusive) '
+        'as CSV or NDJSON, optionally gzipped. Rows are streamed in chunks, so memory '
+        'use does not grow with the size of the export.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='File to write to')
+        parser.add_argument('--start', type=date.fromisoformat, required=True, help='First date (YYYY-MM-DD)')
+        parser.add_argument('--end', type=date.fromisoformat, required=True, help='Last date (YYYY-MM-DD)')
+        parser.add_argument('--format', choices=list(FORMATS), default='csv')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output with gzip')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                            help='Rows fetched from the database and encoded at a time')
+
+    def handle(self, *args, output, start, end, format, gzip, chunk_size, **options):
+        if start > end:
+            raise CommandError('--end must not be before --start')
+        if chunk_size < 1:
+            raise CommandError('chunk size must be positive')
+
+        count = 0
+
+        def counted(rows):
+            nonlocal count
+            for row in rows:
+                count += 1
+                yield row
+
+        path = Path(output)
+        # Write next to the target and rename, so readers never see a half written export
+        temporary = path.with_suffix(path.suffix + '.tmp')
+        with temporary.open('wb') as file:
+            for chunk in export_chunks(counted(export_rows(start, end, chunk_size)), format, gzip, chunk_size):
+                file.write(chunk)
+        temporary.replace(path)
+        self.stdout.write(self.style.SUCCESS(f'Exported {count} appointments to {path}'))
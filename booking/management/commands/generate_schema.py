@@ -0,0 +1,30 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from appointment_system.schema import FORMATS, generate_schema, schema_path
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate the OpenAPI schema into SCHEMA_DIR (swagger.json and swagger.yaml) '
+        'so it is served without introspecting the API. Run at build or deploy time.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', help='Directory to write to (default: settings.SCHEMA_DIR)')
+
+    def handle(self, *args, output_dir=None, **options):
+        directory = Path(output_dir) if output_dir else settings.SCHEMA_DIR
+        directory.mkdir(parents=True, exist_ok=True)
+
+        for format in FORMATS:
+            path = schema_path(format, directory)
+            content = generate_schema(format)
+            # Write next to the target and rename, so a running server never
+            # reads a half written file
+            temporary = path.with_suffix(path.suffix + '.tmp')
+            temporary.write_bytes(content)
+            temporary.replace(path)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {path} ({len(content)} bytes)'))
@@ -0,0 +1,45 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from booking.cache import invalidate_on_commit
+from booking.models import Appointment
+from booking.schedule import DEFAULT_SCHEDULE
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed the database with COUNT synthetic appointments for benchmarking. '
+        'Every slot of consecutive days is filled, starting at --start-date; '
+        'rows that already exist are skipped, so the command can be re-run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('count', type=int, help='Number of appointments, e.g. 10000 or 1000000')
+        parser.add_argument('--start-date', type=date.fromisoformat, default=date(2000, 1, 1),
+                            help='First day to fill (YYYY-MM-DD, default 2000-01-01)')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, count, start_date, batch_size, **options):
+        if count < 0 or batch_size < 1:
+            raise CommandError('count must not be negative and batch size must be positive')
+
+        slots_per_day = len(DEFAULT_SCHEDULE.minutes)
+        for offset in range(0, count, batch_size):
+            batch = []
+            for i in range(offset, min(offset + batch_size, count)):
+                day, slot = divmod(i, slots_per_day)
+                batch.append(Appointment(
+                    name=f'Seed {i}',
+                    phone_number=f'+1{i:010d}',
+                    date=start_date + timedelta(days=day),
+                    time_slot=DEFAULT_SCHEDULE.minutes[slot],
+                ))
+            Appointment.objects.bulk_create(batch, ignore_conflicts=True)
+            # bulk_create() sends no post_save signals
+            invalidate_on_commit(*{appointment.date for appointment in batch})
+
+        last_day = start_date + timedelta(days=max(count - 1, 0) // slots_per_day)
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {count} appointments from {start_date} to {last_day}'
+        ))
@@ -0,0 +1,121 @@
+from datetime import datetime
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+# Offending rows listed at most in the error of a failed migration
+MAX_REPORTED = 20
+
+
+def label_to_minutes(label):
+    """Minute of the day of a label such as "2:00 PM", or None if it is not one."""
+    try:
+        parsed = datetime.strptime(label.strip(), '%I:%M %p')
+    except (AttributeError, ValueError):
+        return None
+    return parsed.hour * 60 + parsed.minute
+
+
+def check_labels(Appointment):
+    """
+    Refuse to migrate labels that are not times, and appointments whose
+    differently written labels (e.g. "2:00 PM" and "02:00 PM") are the same
+    slot of a date, which the new unique constraint would reject. Nothing
+    is resolved automatically: the error lists the rows to fix or delete.
+    """
+    problems = []
+    seen = {}
+    rows = Appointment.objects.order_by('id').values_list('id', 'date', 'time_slot')
+    for appointment_id, day, label in rows.iterator(chunk_size=BATCH_SIZE):
+        minutes = label_to_minutes(label)
+        if minutes is None:
+            problems.append(f'appointment {appointment_id} on {day}: time slot {label!r} is not a time such as "10:00 AM"')
+        elif (day, minutes) in seen:
+            first_id, first_label = seen[(day, minutes)]
+            problems.append(
+                f'appointment {appointment_id} on {day}: time slot {label!r} is the same slot as '
+                f'{first_label!r} of appointment {first_id}'
+            )
+        else:
+            seen[(day, minutes)] = (appointment_id, label)
+
+    if problems:
+        listed = problems[:MAX_REPORTED]
+        if len(problems) > MAX_REPORTED:
+            listed.append(f'... and {len(problems) - MAX_REPORTED} more')
+        raise ValueError(
+            'Cannot convert appointment time slots to minutes; fix or delete these appointments '
+            'and migrate again:\n  ' + '\n  '.join(listed)
+        )
+
+
+def labels_to_minutes(apps, schema_editor):
+    Appointment = apps.get_model('booking', 'Appointment')
+    check_labels(Appointment)
+    batch = []
+    for appointment in Appointment.objects.only('time_slot').iterator(chunk_size=BATCH_SIZE):
+        appointment.time_slot_minutes = label_to_minutes(appointment.time_slot)
+        batch.append(appointment)
+        if len(batch) == BATCH_SIZE:
+            Appointment.objects.bulk_update(batch, ['time_slot_minutes'])
+            batch = []
+    Appointment.objects.bulk_update(batch, ['time_slot_minutes'])
+
+
+def minutes_to_labels(apps, schema_editor):
+    Appointment = apps.get_model('booking', 'Appointment')
+    batch = []
+    for appointment in Appointment.objects.only('time_slot_minutes').iterator(chunk_size=BATCH_SIZE):
+        hour, minute = divmod(appointment.time_slot_minutes, 60)
+        appointment.time_slot = f"{(hour - 1) % 12 + 1:02d}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+        batch.append(appointment)
+        if len(batch) == BATCH_SIZE:
+            Appointment.objects.bulk_update(batch, ['time_slot'])
+            batch = []
+    Appointment.objects.bulk_update(batch, ['time_slot'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='time_slot_minutes',
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        # Nullable so the column can be re-added empty when unapplying
+        migrations.AlterField(
+            model_name='appointment',
+            name='time_slot',
+            field=models.CharField(max_length=10, null=True),
+        ),
+        migrations.RunPython(labels_to_minutes, minutes_to_labels),
+        migrations.AlterUniqueTogether(
+            name='appointment',
+            unique_together=set(),
+        ),
+        migrations.RemoveField(
+            model_name='appointment',
+            name='time_slot',
+        ),
+        migrations.RenameField(
+            model_name='appointment',
+            old_name='time_slot_minutes',
+            new_name='time_slot',
+        ),
+        migrations.AlterField(
+            model_name='appointment',
+            name='time_slot',
+            field=models.PositiveSmallIntegerField(),
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(fields=('date', 'time_slot'), name='booking_appointment_date_time_slot_uniq'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.6 on 2026-10-17 20:45
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0002_time_slot_minutes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Provider',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('is_active', models.BooleanField(default=True)),
+                ('opens_at', models.PositiveSmallIntegerField(default=600, validators=[django.core.validators.MaxValueValidator(1440)])),
+                ('closes_at', models.PositiveSmallIntegerField(default=1020, validators=[django.core.validators.MaxValueValidator(1440)])),
+                ('break_start', models.PositiveSmallIntegerField(default=780, validators=[django.core.validators.MaxValueValidator(1440)])),
+                ('break_end', models.PositiveSmallIntegerField(default=840, validators=[django.core.validators.MaxValueValidator(1440)])),
+                ('slot_interval', models.PositiveSmallIntegerField(default=30, validators=[django.core.validators.MinValueValidator(5)])),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.RemoveConstraint(
+            model_name='appointment',
+            name='booking_appointment_date_time_slot_uniq',
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='provider',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='appointments', to='booking.provider'),
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('provider__isnull', True)), fields=('date', 'time_slot'), name='booking_appointment_date_time_slot_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(fields=('date', 'provider', 'time_slot'), name='booking_appointment_date_provider_time_slot_uniq'),
+        ),
+    ]
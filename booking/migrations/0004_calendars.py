@@ -0,0 +1,61 @@
+# Generated by Django 5.1.6 on 2026-10-17 20:52
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0003_providers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Holiday',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('name', models.CharField(max_length=100)),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DateOverride',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('opens_at', models.PositiveSmallIntegerField(default=600, validators=[django.core.validators.MaxValueValidator(1440)])),
+                ('closes_at', models.PositiveSmallIntegerField(default=1020, validators=[django.core.validators.MaxValueValidator(1440)])),
+                ('break_start', models.PositiveSmallIntegerField(default=780, validators=[django.core.validators.MaxValueValidator(1440)])),
+                ('break_end', models.PositiveSmallIntegerField(default=840, validators=[django.core.validators.MaxValueValidator(1440)])),
+                ('slot_interval', models.PositiveSmallIntegerField(default=30, validators=[django.core.validators.MinValueValidator(5)])),
+                ('date', models.DateField()),
+                ('is_closed', models.BooleanField(default=False)),
+                ('provider', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='date_overrides', to='booking.provider')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(condition=models.Q(('provider__isnull', True)), fields=('date',), name='booking_dateoverride_date_uniq'), models.UniqueConstraint(fields=('provider', 'date'), name='booking_dateoverride_provider_date_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='WeeklyHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('opens_at', models.PositiveSmallIntegerField(default=600, validators=[django.core.validators.MaxValueValidator(1440)])),
+                ('closes_at', models.PositiveSmallIntegerField(default=1020, validators=[django.core.validators.MaxValueValidator(1440)])),
+                ('break_start', models.PositiveSmallIntegerField(default=780, validators=[django.core.validators.MaxValueValidator(1440)])),
+                ('break_end', models.PositiveSmallIntegerField(default=840, validators=[django.core.validators.MaxValueValidator(1440)])),
+                ('slot_interval', models.PositiveSmallIntegerField(default=30, validators=[django.core.validators.MinValueValidator(5)])),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('is_closed', models.BooleanField(default=False)),
+                ('provider', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='weekly_hours', to='booking.provider')),
+            ],
+            options={
+                'verbose_name_plural': 'weekly hours',
+                'constraints': [models.UniqueConstraint(condition=models.Q(('provider__isnull', True)), fields=('weekday',), name='booking_weeklyhours_weekday_uniq'), models.UniqueConstraint(fields=('provider', 'weekday'), name='booking_weeklyhours_provider_weekday_uniq')],
+            },
+        ),
+    ]
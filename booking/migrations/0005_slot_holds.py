@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-17 21:04
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0004_calendars'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('date', models.DateField()),
+                ('time_slot', models.PositiveSmallIntegerField()),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('provider', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='booking.provider')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['expires_at'], name='booking_slothold_expires_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('provider__isnull', True)), fields=('date', 'time_slot'), name='booking_slothold_date_time_slot_uniq'), models.UniqueConstraint(fields=('date', 'provider', 'time_slot'), name='booking_slothold_date_provider_time_slot_uniq')],
+            },
+        ),
+    ]
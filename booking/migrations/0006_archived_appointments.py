@@ -0,0 +1,61 @@
+# Generated by Django 5.1.6 on 2026-10-17 21:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# PostgreSQL only: recreate the archive table partitioned by date range.
+# The partition key must be part of the primary key; ids stay unique as
+# they come from booking_appointment. Partitions are created per year by
+# booking.archive.ensure_partitions() before rows are moved in.
+PARTITIONED_TABLE = [
+    'DROP TABLE booking_archivedappointment',
+    """
+    CREATE TABLE booking_archivedappointment (
+        id bigint NOT NULL,
+        name varchar(100) NOT NULL,
+        phone_number varchar(15) NOT NULL,
+        provider_id bigint NULL
+            REFERENCES booking_provider (id) DEFERRABLE INITIALLY DEFERRED,
+        date date NOT NULL,
+        time_slot smallint NOT NULL CHECK (time_slot >= 0),
+        created_at timestamp with time zone NOT NULL,
+        archived_at timestamp with time zone NOT NULL,
+        PRIMARY KEY (id, date)
+    ) PARTITION BY RANGE (date)
+    """,
+    'CREATE INDEX booking_archived_date_idx ON booking_archivedappointment (date, provider_id, time_slot)',
+    'CREATE INDEX booking_archivedappointment_provider_id ON booking_archivedappointment (provider_id)',
+]
+
+
+def partition_archive(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in PARTITIONED_TABLE:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_slot_holds'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAppointment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+                ('phone_number', models.CharField(max_length=15)),
+                ('date', models.DateField()),
+                ('time_slot', models.PositiveSmallIntegerField()),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('provider', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='archived_appointments', to='booking.provider')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', 'provider', 'time_slot'], name='booking_archived_date_idx')],
+            },
+        ),
+        migrations.RunPython(partition_archive, migrations.RunPython.noop),
+    ]
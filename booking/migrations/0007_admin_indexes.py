@@ -0,0 +1,25 @@
+# Generated by Django 5.1.6 on 2026-10-17 21:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0006_archived_appointments'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['date', 'id'], name='booking_appt_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['name'], name='booking_appt_name_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['phone_number'], name='booking_appt_phone_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
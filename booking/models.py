@@ -1,5 +1,116 @@
+import uuid
+
 from django.db import models
-from django.core.validators import RegexValidator
+from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator, RegexValidator
+from .schedule import DEFAULT_SCHEDULE, compile_schedule, minutes_to_label
+
+MINUTES_PER_DAY = 24 * 60
+
+class BusinessHours(models.Model):
+    """Opening hours, lunch break and slot length; times are minutes of the day."""
+    opens_at = models.PositiveSmallIntegerField(
+        default=DEFAULT_SCHEDULE.start, validators=[MaxValueValidator(MINUTES_PER_DAY)]
+    )
+    closes_at = models.PositiveSmallIntegerField(
+        default=DEFAULT_SCHEDULE.end, validators=[MaxValueValidator(MINUTES_PER_DAY)]
+    )
+    break_start = models.PositiveSmallIntegerField(
+        default=DEFAULT_SCHEDULE.break_start, validators=[MaxValueValidator(MINUTES_PER_DAY)]
+    )
+    break_end = models.PositiveSmallIntegerField(
+        default=DEFAULT_SCHEDULE.break_end, validators=[MaxValueValidator(MINUTES_PER_DAY)]
+    )
+    slot_interval = models.PositiveSmallIntegerField(
+        default=DEFAULT_SCHEDULE.interval, validators=[MinValueValidator(5)]
+    )
+    
+    class Meta:
+        abstract = True
+    
+    def clean(self):
+        if self.opens_at >= self.closes_at:
+            raise ValidationError('Opening time must be before closing time')
+        if self.break_start > self.break_end:
+            raise ValidationError('Break must not end before it starts')
+    
+    @property
+    def schedule(self):
+        """The compiled Schedule of these hours (shared by every rule with the same hours)."""
+        return compile_schedule(
+            start=self.opens_at,
+            end=self.closes_at,
+            break_start=self.break_start,
+            break_end=self.break_end,
+            interval=self.slot_interval,
+        )
+
+class Provider(BusinessHours):
+    """A bookable resource, such as a practitioner or a room, with its own working hours."""
+    name = models.CharField(max_length=100)
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['id']
+    
+    def __str__(self):
+        return self.name
+
+class WeeklyHours(BusinessHours):
+    """
+    Hours of one weekday, for a provider or (without one) the default
+    calendar, replacing the provider's own hours or the default schedule.
+    """
+    WEEKDAYS = [(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')]
+    
+    provider = models.ForeignKey(Provider, null=True, blank=True, on_delete=models.CASCADE, related_name='weekly_hours')
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAYS)
+    is_closed = models.BooleanField(default=False)
+    
+    class Meta:
+        verbose_name_plural = 'weekly hours'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['weekday'],
+                condition=models.Q(provider__isnull=True),
+                name='booking_weeklyhours_weekday_uniq'
+            ),
+            models.UniqueConstraint(fields=['provider', 'weekday'], name='booking_weeklyhours_provider_weekday_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.provider or 'Default'} - {self.get_weekday_display()}"
+
+class DateOverride(BusinessHours):
+    """Hours of one date, for a provider or the default calendar, taking precedence over weekly hours."""
+    provider = models.ForeignKey(Provider, null=True, blank=True, on_delete=models.CASCADE, related_name='date_overrides')
+    date = models.DateField()
+    is_closed = models.BooleanField(default=False)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date'],
+                condition=models.Q(provider__isnull=True),
+                name='booking_dateoverride_date_uniq'
+            ),
+            models.UniqueConstraint(fields=['provider', 'date'], name='booking_dateoverride_provider_date_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.provider or 'Default'} - {self.date}"
+
+class Holiday(models.Model):
+    """A date on which nobody can be booked."""
+    date = models.DateField(unique=True)
+    name = models.CharField(max_length=100)
+    
+    class Meta:
+        ordering = ['date']
+    
+    def __str__(self):
+        return f"{self.name} ({self.date})"
 
 class Appointment(models.Model):
     name = models.CharField(max_length=100)
@@ -7,12 +118,113 @@ class Appointment(models.Model):
         max_length=15,
         validators=[RegexValidator(r'^\+?1?\d{9,15}$', message="Phone number must be entered in the format: '+999999999'. Up to 15 digits allowed.")]
     )
+    # Appointments without a provider are booked on the default schedule
+    provider = models.ForeignKey(
+        Provider, null=True, blank=True, on_delete=models.PROTECT, related_name='appointments'
+    )
+    date = models.DateField()
+    # Minute of the day the slot starts at, e.g. 600 for 10:00 AM
+    time_slot = models.PositiveSmallIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'time_slot'],
+                condition=models.Q(provider__isnull=True),
+                name='booking_appointment_date_time_slot_uniq'
+            ),
+            # Date first, so the bookings of every provider over a date range
+            # are read with one index range scan
+            models.UniqueConstraint(
+                fields=['date', 'provider', 'time_slot'],
+                name='booking_appointment_date_provider_time_slot_uniq'
+            ),
+        ]
+        indexes = [
+            # Keyset pagination of the admin list, newest dates first
+            models.Index(fields=['date', 'id'], name='booking_appt_date_id_idx'),
+            # Prefix (LIKE 'x%') search of the admin; the operator class is
+            # needed on PostgreSQL and ignored elsewhere
+            models.Index(fields=['name'], name='booking_appt_name_idx', opclasses=['varchar_pattern_ops']),
+            models.Index(
+                fields=['phone_number'], name='booking_appt_phone_idx', opclasses=['varchar_pattern_ops']
+            ),
+        ]
+    
+    @property
+    def time_slot_label(self):
+        return minutes_to_label(self.time_slot)
+    
+    def __str__(self):
+        return f"{self.name} - {self.date} {self.time_slot_label}"
+
+class ArchivedAppointment(models.Model):
+    """
+    A past appointment moved out of the live table by the
+    archive_appointments command (see booking.archive), keeping its id.
+    On PostgreSQL the table is partitioned by date range, one partition per
+    year.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    name = models.CharField(max_length=100)
+    phone_number = models.CharField(max_length=15)
+    provider = models.ForeignKey(
+        Provider, null=True, blank=True, on_delete=models.PROTECT, related_name='archived_appointments'
+    )
+    date = models.DateField()
+    time_slot = models.PositiveSmallIntegerField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'provider', 'time_slot'], name='booking_archived_date_idx'),
+        ]
+    
+    @property
+    def time_slot_label(self):
+        return minutes_to_label(self.time_slot)
+    
+    def __str__(self):
+        return f"{self.name} - {self.date} {self.time_slot_label} (archived)"
+
+class SlotHold(models.Model):
+    """
+    A short-lived reservation of a slot while its booking is completed.
+
+    Holds past expires_at count as free everywhere and are deleted lazily
+    (see booking.holds).
+    """
+    token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    provider = models.ForeignKey(
+        Provider, null=True, blank=True, on_delete=models.CASCADE, related_name='holds'
+    )
     date = models.DateField()
-    time_slot = models.CharField(max_length=10)
+    time_slot = models.PositiveSmallIntegerField()
+    expires_at = models.DateTimeField()
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
-        unique_together = ('date', 'time_slot')
+        # One hold per slot, like appointments
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'time_slot'],
+                condition=models.Q(provider__isnull=True),
+                name='booking_slothold_date_time_slot_uniq'
+            ),
+            models.UniqueConstraint(
+                fields=['date', 'provider', 'time_slot'],
+                name='booking_slothold_date_provider_time_slot_uniq'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at'], name='booking_slothold_expires_idx'),
+        ]
+    
+    @property
+    def time_slot_label(self):
+        return minutes_to_label(self.time_slot)
     
     def __str__(self):
-        return f"{self.name} - {self.date} {self.time_slot}"
\ No newline at end of file
+        return f"Hold {self.date} {self.time_slot_label} until {self.expires_at:%H:%M:%S}"
@@ -0,0 +1,91 @@
+"""
+Lean JSON rendering for the hot endpoints.
+
+The booking API only ever speaks JSON, so the hot views skip DRF's Accept
+header negotiation and browsable API (@json_only) and render with
+LeanJSONRenderer. Availability bodies are assembled from pre-encoded
+fragments (see Schedule.available_json) and returned as RawJSONResponse
+without a rendering step at all.
+
+orjson is used for encoding when it is installed (pip install orjson);
+otherwise the standard library encoder produces the same compact JSON.
+"""
+import json
+
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CONTENT_TYPE = 'application/json'
+
+_default = JSONEncoder().default
+
+
+def dumps(data):
+    """Encode data as compact UTF-8 JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def json_object(items):
+    """
+    Join (key, encoded value) pairs into the bytes of a JSON object.
+
+    Keys are emitted verbatim, so they must be plain strings that need no
+    escaping (field names, ISO dates).
+    """
+    return b'{' + b','.join(b'"%s":%s' % (key.encode(), value) for key, value in items) + b'}'
+
+
+class LeanJSONRenderer(BaseRenderer):
+    """Compact JSON renderer without DRF's indentation and charset handling."""
+
+    media_type = CONTENT_TYPE
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return dumps(data)
+
+
+class JSONOnlyNegotiation(DefaultContentNegotiation):
+    """Always pick the first renderer instead of matching it against the Accept header."""
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        renderer = renderers[0]
+        return renderer, renderer.media_type
+
+
+class RawJSONResponse(HttpResponse):
+    """Response with an already encoded JSON body."""
+
+    def __init__(self, content=b'', **kwargs):
+        kwargs.setdefault('content_type', CONTENT_TYPE)
+        super().__init__(content, **kwargs)
+
+
+def json_response(data, status=200):
+    """RawJSONResponse of data; the lean counterpart of JsonResponse for the async views."""
+    return RawJSONResponse(dumps(data), status=status)
+
+
+def json_only(view):
+    """
+    Serve an @api_view view with JSON parsing and LeanJSONRenderer only.
+
+    Apply it outside @api_view.
+    """
+    view.cls.renderer_classes = [LeanJSONRenderer]
+    view.cls.parser_classes = [JSONParser]
+    view.cls.content_negotiation_class = JSONOnlyNegotiation
+    return view
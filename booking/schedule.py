@@ -0,0 +1,186 @@
+"""
+Compiled appointment schedule.
+
+The business-hours, lunch break and slot interval rules are compiled once
+into an immutable slot table so views never parse time strings to work out
+which slots exist. Slots are stored as their minute of the day (600) and
+rendered as labels ("10:00 AM") only at the API edge. Booked and free
+slots are handled as booking.bitset.SlotSet bitsets.
+"""
+import functools
+import json
+from datetime import datetime
+from types import MappingProxyType
+
+from .bitset import SlotSet
+
+LABEL_FORMAT = '%I:%M %p'
+
+
+class InvalidTimeSlot(ValueError):
+    """Raised when a time slot label is not bookable under a schedule."""
+
+
+def minutes_to_label(minutes):
+    """Render a minute of the day as a slot label, e.g. 840 -> '02:00 PM'."""
+    hour, minute = divmod(minutes, 60)
+    suffix = 'AM' if hour < 12 else 'PM'
+    return f'{(hour - 1) % 12 + 1:02d}:{minute:02d} {suffix}'
+
+
+def label_to_minutes(label):
+    """Parse a slot label such as '2:00 PM' into a minute of the day."""
+    parsed = datetime.strptime(label, LABEL_FORMAT)
+    return parsed.hour * 60 + parsed.minute
+
+
+def _display(minutes):
+    """Human readable time used in error messages, e.g. '1:00 PM'."""
+    return minutes_to_label(minutes).lstrip('0')
+
+
+class Schedule:
+    """
+    Immutable table of the bookable slots of a day.
+
+    - slots: ordered tuple of slot labels
+    - minutes: ordered tuple of the slots' minutes of the day
+    - index: read-only label -> position map for O(1) lookups
+    - positions: read-only minute of the day -> position map
+    - mask: SlotSet of the slots' minutes of the day
+    - slot_bits: ordered tuple of each slot's bit in a SlotSet
+    """
+
+    __slots__ = ('start', 'end', 'break_start', 'break_end', 'interval',
+                 'slots', 'minutes', 'index', 'positions', 'mask', 'slot_bits')
+
+    def __init__(self, start, end, break_start, break_end, interval):
+        minutes = tuple(
+            minute for minute in range(start, end, interval)
+            if not break_start <= minute < break_end
+        )
+        values = {
+            'start': start,
+            'end': end,
+            'break_start': break_start,
+            'break_end': break_end,
+            'interval': interval,
+            'minutes': minutes,
+            'slots': tuple(minutes_to_label(minute) for minute in minutes),
+        }
+        values['index'] = MappingProxyType({label: i for i, label in enumerate(values['slots'])})
+        values['positions'] = MappingProxyType({minute: i for i, minute in enumerate(minutes)})
+        values['mask'] = SlotSet(minutes)
+        values['slot_bits'] = tuple(1 << minute for minute in minutes)
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Schedule is immutable')
+
+    def __contains__(self, label):
+        return label in self.index
+
+    def __iter__(self):
+        return iter(self.slots)
+
+    def __len__(self):
+        return len(self.slots)
+
+    def normalize(self, label):
+        """
+        Return the canonical label of a bookable slot.
+
+        Canonical labels are answered from the slot table; anything else
+        ('2:00 PM', '14:00') is parsed once and checked against the rules.
+        Raises InvalidTimeSlot with a user facing message otherwise.
+        """
+        if isinstance(label, str) and label in self.index:
+            return label
+        if not self.slots:
+            raise InvalidTimeSlot('No appointments are available on this date')
+
+        try:
+            minutes = label_to_minutes(label)
+        except (TypeError, ValueError):
+            raise InvalidTimeSlot("Invalid time format. Please use format like '10:00 AM'")
+
+        if not self.start <= minutes < self.end:
+            raise InvalidTimeSlot(
+                f"Appointments are only available between {_display(self.start)} and {_display(self.end)}"
+            )
+        if self.break_start <= minutes < self.break_end:
+            raise InvalidTimeSlot(
+                f"Appointments are not available during lunch hour "
+                f"({_display(self.break_start)} - {_display(self.break_end)})"
+            )
+        if (minutes - self.start) % self.interval != 0:
+            raise InvalidTimeSlot(f"Appointments must be scheduled at {self.interval}-minute intervals")
+
+        return minutes_to_label(minutes)
+
+    def parse(self, label):
+        """Return the minute of the day of a bookable slot label (see normalize())."""
+        return self.minutes[self.index[self.normalize(label)]]
+
+    def labels(self, slot_set):
+        """Return the labels, in order, of the slots of this schedule in slot_set (a SlotSet)."""
+        return list(_labels(self, slot_set.bits & self.mask.bits))
+
+    def free(self, booked):
+        """Return the SlotSet of slots not in booked (a SlotSet)."""
+        return self.mask - booked
+
+    def available(self, booked):
+        """Return the slot labels, in order, whose minute of the day is not in booked (a SlotSet)."""
+        if not booked:
+            return list(self.slots)
+        return list(_labels(self, self.mask.bits & ~booked.bits))
+
+    def available_json(self, booked):
+        """available() encoded as the bytes of a JSON array; memoized like the labels."""
+        return _labels_json(self, self.mask.bits & ~booked.bits)
+
+    def first_available(self, booked):
+        """Return the minute of the day of the first free slot, or None when the day is full."""
+        return (self.mask - booked).first()
+
+    def next_available(self, booked, after=None, count=3):
+        """Return up to count free slot labels following the minute after (or from the start)."""
+        free = self.mask - booked
+        if after is not None:
+            free = free.after(after)
+        return list(_labels(self, free.bits)[:count])
+
+
+@functools.lru_cache(maxsize=4096)
+def _labels(schedule, bits):
+    # Memoized: the same few booking patterns recur across dates and
+    # providers, so most lookups skip the per-slot bit tests
+    return tuple(label for bit, label in zip(schedule.slot_bits, schedule.slots) if bits & bit)
+
+
+@functools.lru_cache(maxsize=4096)
+def _labels_json(schedule, bits):
+    # Labels are fixed ASCII strings, so the encoded arrays are reused as is
+    return json.dumps(_labels(schedule, bits), separators=(',', ':')).encode()
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_schedule(start, end, break_start, break_end, interval):
+    """Return the Schedule for these rules, compiled once and shared by every caller."""
+    return Schedule(start, end, break_start, break_end, interval)
+
+# Business hours are 10:00 AM to 5:00 PM with a lunch break from 1:00 to
+# 2:00 PM and 30 minute appointments. Compiled once at import time; calendar
+# rules (booking.calendars) can replace it for given weekdays or dates.
+DEFAULT_SCHEDULE = compile_schedule(
+    start=10 * 60,
+    end=17 * 60,
+    break_start=13 * 60,
+    break_end=14 * 60,
+    interval=30,
+)
+
+# A day without any bookable slot
+CLOSED_SCHEDULE = compile_schedule(start=0, end=0, break_start=0, break_end=0, interval=DEFAULT_SCHEDULE.interval)
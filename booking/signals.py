@@ -0,0 +1,64 @@
+"""
+Keep the availability cache and slot event subscribers in step with
+Appointment writes, and compiled calendars in step with calendar rules.
+
+Handlers run for every save()/delete(), including the Django admin's
+forms. Bulk writes that bypass model signals, such as the appointment
+admin's actions, must call cache.invalidate_on_commit() and publish their
+slot events on commit (or call calendars.invalidate_on_commit())
+themselves.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import calendars, events
+from .cache import invalidate_on_commit
+from .models import Appointment, DateOverride, Holiday, WeeklyHours
+
+
+def publish_on_commit(event_type, day, time_slot, provider=None):
+    """Broadcast a slot event once the current transaction commits."""
+    transaction.on_commit(lambda: events.publish(event_type, day, time_slot, provider))
+
+
+@receiver(post_init, sender=Appointment)
+def remember_loaded_slot(sender, instance, **kwargs):
+    # Needed to invalidate the old date and free the old slot when an
+    # appointment is moved. Read through __dict__ so deferred fields are
+    # not fetched.
+    instance._loaded_date = instance.__dict__.get('date')
+    instance._loaded_time_slot = instance.__dict__.get('time_slot')
+    instance._loaded_provider_id = instance.__dict__.get('provider_id')
+
+
+@receiver(post_save, sender=Appointment)
+def appointment_saved(sender, instance, created, **kwargs):
+    days = {instance.date, instance._loaded_date} - {None}
+    invalidate_on_commit(*days)
+
+    old_slot = (instance._loaded_date, instance._loaded_time_slot, instance._loaded_provider_id)
+    if created or old_slot != (instance.date, instance.time_slot, instance.provider_id):
+        if not created and None not in old_slot[:2]:
+            publish_on_commit(events.SLOT_FREED, *old_slot)
+        publish_on_commit(events.SLOT_TAKEN, instance.date, instance.time_slot, instance.provider_id)
+
+    instance._loaded_date = instance.date
+    instance._loaded_time_slot = instance.time_slot
+    instance._loaded_provider_id = instance.provider_id
+
+
+@receiver(post_delete, sender=Appointment)
+def appointment_deleted(sender, instance, **kwargs):
+    invalidate_on_commit(instance.date)
+    publish_on_commit(events.SLOT_FREED, instance.date, instance.time_slot, instance.provider_id)
+
+
+@receiver(post_save, sender=WeeklyHours)
+@receiver(post_delete, sender=WeeklyHours)
+@receiver(post_save, sender=DateOverride)
+@receiver(post_delete, sender=DateOverride)
+@receiver(post_save, sender=Holiday)
+@receiver(post_delete, sender=Holiday)
+def calendar_rule_changed(sender, **kwargs):
+    calendars.invalidate_on_commit()
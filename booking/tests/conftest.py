@@ -1,8 +1,47 @@
 # booking/tests/conftest.py
 import pytest
+from datetime import date
+from django.core.cache import caches
+from django.conf import settings
 from django.test import Client
+from booking import cache as availability_cache
+from booking import calendars
+from booking import idempotency
+from booking import throttling
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix, tmp_path_factory):
+    """Use an on-disk SQLite test database so concurrent connections wait for locks
+    (shared in-memory databases raise "table is locked" immediately)"""
+    database = settings.DATABASES['default']
+    if database['ENGINE'] == 'django.db.backends.sqlite3':
+        database.setdefault('TEST', {})['NAME'] = str(tmp_path_factory.mktemp('db') / 'test.sqlite3')
+
+@pytest.fixture(autouse=True)
+def bookable_test_dates(settings):
+    """The tests book fixed dates from 2025 on: keep them out of the archivable
+    (and no longer bookable) past, whatever today is"""
+    settings.BOOKING_ARCHIVE_AFTER_DAYS = (date.today() - date(2025, 1, 1)).days
 
 @pytest.fixture
 def client():
     """Django test client fixture"""
-    return Client()
\ No newline at end of file
+    return Client()
+
+@pytest.fixture(autouse=True)
+def clear_availability_cache():
+    """Start every test with an empty availability cache and zeroed counters"""
+    caches[settings.BOOKING_CACHE_ALIAS].clear()
+    availability_cache.reset_stats()
+    idempotency.reset_stats()
+    throttling.reset_stats()
+    yield
+    caches[settings.BOOKING_CACHE_ALIAS].clear()
+
+@pytest.fixture(autouse=True)
+def compiled_calendar(request, clear_availability_cache):
+    """Compile the calendar rules before database tests, so query counts only
+    cover the code under test"""
+    if request.node.get_closest_marker('django_db'):
+        request.getfixturevalue('db')
+        calendars.get_calendar()
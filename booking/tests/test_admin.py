@@ -0,0 +1,150 @@
+# booking/tests/test_admin.py
+import pytest
+from datetime import date
+from django.contrib.admin import helpers
+from django.urls import reverse
+from booking import admin, events
+from booking.admin import AppointmentAdmin
+from booking.models import Appointment, Provider
+
+DAY = "2025-03-15"
+CHANGELIST = reverse('admin:booking_appointment_changelist')
+
+@pytest.fixture
+def appointments():
+    """Appointments at 10:00 AM on five dates, the fourth on DAY"""
+    return [
+        Appointment.objects.create(name=f"Patient {i}", phone_number=f"+1555000{i}", date=date(2025, 3, day), time_slot=600)
+        for i, day in enumerate([11, 12, 14, 15, 18])
+    ]
+
+@pytest.fixture
+def published(monkeypatch):
+    published = []
+    monkeypatch.setattr(events, 'publish', lambda *args: published.append(args))
+    return published
+
+def available(client):
+    return client.get(reverse('available_slots'), {'date': DAY}).json()['available_slots']
+
+def names(response):
+    return [appointment.name for appointment in response.context['cl'].result_list]
+
+@pytest.mark.django_db
+class TestAppointmentAdmin:
+
+    def test_keyset_pagination(self, admin_client, appointments, monkeypatch):
+        """Test that pages follow each other by cursor, newest dates first"""
+        monkeypatch.setattr(AppointmentAdmin, 'list_per_page', 2)
+        expected = [a.name for a in sorted(appointments, key=lambda a: (a.date, a.id), reverse=True)]
+
+        seen = []
+        response = admin_client.get(CHANGELIST)
+        while True:
+            assert response.status_code == 200
+            seen += names(response)
+            next_page = response.context['cl'].next_page_url
+            if not next_page:
+                break
+            assert 'after=' in next_page
+            response = admin_client.get(CHANGELIST + next_page)
+
+        assert seen == expected
+        assert response.context['cl'].result_count == 5
+        assert b'First page' in response.content
+
+    def test_invalid_cursor(self, admin_client):
+        """Test that a malformed cursor is reported like any bad lookup"""
+        response = admin_client.get(CHANGELIST, {'after': "yesterday"})
+        assert response.status_code == 302
+        assert response['Location'].endswith('?e=1')
+
+    def test_count_stops_at_limit(self, admin_client, appointments, settings):
+        """Test that lists are counted no further than BOOKING_ADMIN_COUNT_LIMIT"""
+        settings.BOOKING_ADMIN_COUNT_LIMIT = 3
+        response = admin_client.get(CHANGELIST)
+        assert response.context['cl'].result_count == 3
+        assert b'3+ appointments' in response.content
+        assert len(names(response)) == 5
+
+    def test_filters_and_prefix_search(self, admin_client, appointments):
+        """Test that the date filter and the prefix search narrow the list"""
+        Appointment.objects.create(name="Alice", phone_number="+15559999", date=DAY, time_slot=660)
+        Appointment.objects.create(name="Malice", phone_number="+15558888", date=DAY, time_slot=690)
+
+        response = admin_client.get(CHANGELIST, {'date__gte': DAY, 'date__lt': "2025-03-16"})
+        assert sorted(names(response)) == ["Alice", "Malice", "Patient 3"]
+
+        assert names(admin_client.get(CHANGELIST, {'q': "Ali"})) == ["Alice"]
+        assert names(admin_client.get(CHANGELIST, {'q': "+1555999"})) == ["Alice"]
+
+    def test_delete_action(self, admin_client, appointments, published, django_capture_on_commit_callbacks):
+        """Test that bulk delete asks for confirmation, then frees the slots in one statement"""
+        selected = [a.pk for a in appointments if str(a.date) == DAY]
+        data = {'action': 'delete_appointments', helpers.ACTION_CHECKBOX_NAME: selected}
+        assert "10:00 AM" not in available(admin_client)
+
+        response = admin_client.post(CHANGELIST, data)
+        assert response.status_code == 200
+        assert response.context['count'] == 1
+        assert Appointment.objects.count() == 5
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = admin_client.post(CHANGELIST, {**data, 'post': 'yes'})
+        assert response.status_code == 302
+        assert Appointment.objects.count() == 4
+        assert "10:00 AM" in available(admin_client)
+        assert published == [(events.SLOT_FREED, date(2025, 3, 15), 600, None)]
+
+    def test_delete_across_all_pages(self, admin_client, appointments, django_capture_on_commit_callbacks):
+        """Test that select across deletes every row matching the filters"""
+        with django_capture_on_commit_callbacks(execute=True):
+            response = admin_client.post(CHANGELIST + '?date__gte=2025-03-14', {
+                'action': 'delete_appointments', 'select_across': '1', 'post': 'yes',
+                helpers.ACTION_CHECKBOX_NAME: [appointments[4].pk],
+            })
+        assert response.status_code == 302
+        assert sorted(str(day) for day in Appointment.objects.values_list('date', flat=True)) == ["2025-03-11", "2025-03-12"]
+
+    def test_large_delete(self, admin_client, appointments, published, settings, monkeypatch, django_capture_on_commit_callbacks):
+        """Test that deleting more rows than SLOT_EVENTS_LIMIT counts them capped and invalidates by date only"""
+        settings.BOOKING_ADMIN_COUNT_LIMIT = 3
+        monkeypatch.setattr(admin, 'SLOT_EVENTS_LIMIT', 2)
+        data = {'action': 'delete_appointments', 'select_across': '1', helpers.ACTION_CHECKBOX_NAME: [appointments[0].pk]}
+        assert "10:00 AM" not in available(admin_client)
+
+        response = admin_client.post(CHANGELIST, data)
+        assert b'Appointments: 3+' in response.content
+
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            admin_client.post(CHANGELIST, {**data, 'post': 'yes'})
+        assert not Appointment.objects.exists()
+        assert "10:00 AM" in available(admin_client)
+        assert published == []
+        assert len(callbacks) == 1
+
+    def test_reassign_action(self, admin_client, appointments, published, django_capture_on_commit_callbacks):
+        """Test that appointments move to a provider with one UPDATE, unless the provider is booked"""
+        provider = Provider.objects.create(name="Dr. Smith")
+        moved = appointments[3]
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_client.post(CHANGELIST, {
+                'action': 'reassign_provider', 'provider': provider.id, helpers.ACTION_CHECKBOX_NAME: [moved.pk],
+            })
+
+        moved.refresh_from_db()
+        assert moved.provider == provider
+        assert "10:00 AM" in available(admin_client)
+        assert published == [
+            (events.SLOT_FREED, date(2025, 3, 15), 600, None),
+            (events.SLOT_TAKEN, date(2025, 3, 15), 600, provider.id),
+        ]
+
+        # Moving a second 10:00 AM appointment of the same date would double book the provider
+        clash = Appointment.objects.create(name="Clash", phone_number="+15551234", date=DAY, time_slot=600)
+        response = admin_client.post(CHANGELIST, {
+            'action': 'reassign_provider', 'provider': provider.id, helpers.ACTION_CHECKBOX_NAME: [clash.pk],
+        }, follow=True)
+        assert 'already booked' in str(list(response.context['messages'])[-1])
+        clash.refresh_from_db()
+        assert clash.provider is None
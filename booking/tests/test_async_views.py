@@ -0,0 +1,117 @@
+# booking/tests/test_async_views.py
+import pytest
+import json
+from asgiref.sync import async_to_sync
+from datetime import date
+from django.test import AsyncRequestFactory
+from booking import async_views
+from booking.models import Appointment, Holiday, Provider
+
+def call(view, request):
+    return async_to_sync(view)(request)
+
+def post(data):
+    return AsyncRequestFactory().post(
+        '/api/v1/book-appointment/',
+        data=json.dumps(data),
+        content_type='application/json'
+    )
+
+@pytest.mark.django_db
+class TestAsyncViews:
+    
+    def test_get_available_slots(self):
+        """Test that the async view returns the same slots as the DRF view"""
+        Appointment.objects.create(
+            name="Test User",
+            phone_number="1234567890",
+            date=date(2025, 3, 15),
+            time_slot=600
+        )
+        
+        response = call(async_views.get_available_slots, AsyncRequestFactory().get('/', {'date': '2025-03-15'}))
+        
+        assert response.status_code == 200
+        slots = json.loads(response.content)['available_slots']
+        assert len(slots) == 11
+        assert "10:00 AM" not in slots
+    
+    def test_get_available_slots_range(self):
+        """Test the async range mode and its validation"""
+        request = AsyncRequestFactory().get('/', {'start': '2025-03-15', 'end': '2025-03-16'})
+        response = call(async_views.get_available_slots, request)
+        
+        assert response.status_code == 200
+        assert list(json.loads(response.content)['days']) == ['2025-03-15', '2025-03-16']
+        
+        request = AsyncRequestFactory().get('/', {'start': '2025-03-16', 'end': '2025-03-15'})
+        assert call(async_views.get_available_slots, request).status_code == 400
+    
+    def test_conditional_get(self):
+        """Test that the async view honours If-None-Match like the DRF view"""
+        request = AsyncRequestFactory().get('/', {'date': '2025-03-15'})
+        etag = call(async_views.get_available_slots, request)['ETag']
+        
+        request = AsyncRequestFactory().get('/', {'date': '2025-03-15'}, headers={'If-None-Match': etag})
+        assert call(async_views.get_available_slots, request).status_code == 304
+    
+    def test_book_appointment(self):
+        """Test async booking, conflicts and validation"""
+        data = {
+            "name": "Test User",
+            "phone_number": "1234567890",
+            "date": "2025-03-15",
+            "time_slot": "10:00 AM"
+        }
+        
+        response = call(async_views.book_appointment, post(data))
+        assert response.status_code == 200
+        assert json.loads(response.content)['success'] is True
+        assert Appointment.objects.filter(date=date(2025, 3, 15), time_slot=600).exists()
+        
+        response = call(async_views.book_appointment, post(data))
+        assert response.status_code == 409
+        assert json.loads(response.content)['next_available_slots'][0] == "10:30 AM"
+        
+        response = call(async_views.book_appointment, post(dict(data, time_slot="1:00 PM")))
+        assert response.status_code == 400
+    
+    def test_book_provider_appointment(self):
+        """Test async booking of a provider's slot and its conflict suggestions"""
+        provider = Provider.objects.create(name="Room B", opens_at=480, closes_at=720, break_start=720, break_end=720, slot_interval=60)
+        data = {
+            "name": "Test User",
+            "phone_number": "1234567890",
+            "date": "2025-03-15",
+            "time_slot": "09:00 AM",
+            "provider": provider.id
+        }
+        
+        assert call(async_views.book_appointment, post(data)).status_code == 200
+        
+        response = call(async_views.book_appointment, post(data))
+        assert response.status_code == 409
+        assert json.loads(response.content)['next_available_slots'] == ["10:00 AM", "11:00 AM"]
+        
+        response = call(async_views.book_appointment, post(dict(data, provider=9999)))
+        assert response.status_code == 400
+    
+    def test_calendar_rules(self):
+        """Test that the async views follow the calendar rules"""
+        Holiday.objects.create(date=date(2025, 3, 15), name="Founders Day")
+        
+        response = call(async_views.get_available_slots, AsyncRequestFactory().get('/', {'date': '2025-03-15'}))
+        assert json.loads(response.content)['available_slots'] == []
+        
+        response = call(async_views.book_appointment, post({
+            "name": "Test User",
+            "phone_number": "1234567890",
+            "date": "2025-03-15",
+            "time_slot": "10:00 AM"
+        }))
+        assert response.status_code == 400
+    
+    def test_methods_enforced(self):
+        """Test that the async views only accept their HTTP method"""
+        response = call(async_views.book_appointment, AsyncRequestFactory().get('/'))
+        assert response.status_code == 405
@@ -0,0 +1,85 @@
+# booking/tests/test_bitset.py
+import pytest
+import pickle
+import random
+from booking.bitset import EMPTY, SlotSet
+from booking.schedule import DEFAULT_SCHEDULE, compile_schedule
+
+# Property tests: every seed draws random sets and schedules and checks
+# SlotSet and Schedule against plain set and list based reference semantics
+SEEDS = range(50)
+
+def random_minutes(rng):
+    return {rng.randrange(24 * 60) for _ in range(rng.randrange(40))}
+
+def random_schedule(rng):
+    interval = rng.choice([5, 10, 15, 20, 30, 45, 60])
+    start = rng.randrange(0, 12 * 60, 5)
+    end = rng.randrange(start + interval, 24 * 60 + 1)
+    break_start = rng.randrange(start, end + 1)
+    break_end = rng.randrange(break_start, end + 1)
+    return compile_schedule(start=start, end=end, break_start=break_start, break_end=break_end, interval=interval)
+
+def reference_available(schedule, booked):
+    """The original list scan over the slot table"""
+    return [slot for minute, slot in zip(schedule.minutes, schedule.slots) if minute not in booked]
+
+def reference_next_available(schedule, booked, after, count):
+    return [
+        slot for minute, slot in zip(schedule.minutes, schedule.slots)
+        if minute not in booked and (after is None or minute > after)
+    ][:count]
+
+class TestSlotSet:
+
+    @pytest.mark.parametrize('seed', SEEDS)
+    def test_set_semantics(self, seed):
+        """Test that SlotSet operations agree with Python sets"""
+        rng = random.Random(seed)
+        a, b = random_minutes(rng), random_minutes(rng)
+        slots_a, slots_b = SlotSet(a), SlotSet(b)
+
+        assert list(slots_a) == sorted(a)
+        assert len(slots_a) == len(a)
+        assert bool(slots_a) == bool(a)
+        assert list(slots_a | slots_b) == sorted(a | b)
+        assert list(slots_a & slots_b) == sorted(a & b)
+        assert list(slots_a - slots_b) == sorted(a - b)
+        assert list(slots_a ^ slots_b) == sorted(a ^ b)
+        assert all((minute in slots_a) == (minute in a) for minute in range(-1, 24 * 60))
+        assert slots_a.first() == (min(a) if a else None)
+
+        minute = rng.randrange(24 * 60)
+        count = rng.randrange(1, 10)
+        assert list(slots_a.after(minute)) == sorted(m for m in a if m > minute)
+        assert slots_a.take(count) == sorted(a)[:count]
+
+    def test_value_semantics(self):
+        """Test equality, hashing, immutability and pickling for the cache"""
+        slots = SlotSet([600, 630])
+        assert slots == SlotSet([630, 600])
+        assert hash(slots) == hash(SlotSet.from_bits(slots.bits))
+        assert slots != EMPTY
+        assert pickle.loads(pickle.dumps(slots)) == slots
+        with pytest.raises(AttributeError):
+            slots.bits = 0
+
+class TestScheduleWithSlotSets:
+
+    @pytest.mark.parametrize('seed', SEEDS)
+    def test_available_matches_list_scan(self, seed):
+        """Test that bitset availability matches the list based availability"""
+        rng = random.Random(seed)
+        schedule = random_schedule(rng) if seed % 5 else DEFAULT_SCHEDULE
+        booked = set(rng.sample(schedule.minutes, rng.randrange(len(schedule) + 1))) | random_minutes(rng)
+
+        assert schedule.available(SlotSet(booked)) == reference_available(schedule, booked)
+        assert schedule.labels(schedule.free(SlotSet(booked))) == reference_available(schedule, booked)
+
+        after = rng.choice((None,) + schedule.minutes)
+        count = rng.randrange(1, 6)
+        assert schedule.next_available(SlotSet(booked), after=after, count=count) == \
+            reference_next_available(schedule, booked, after, count)
+
+        free = [minute for minute in schedule.minutes if minute not in booked]
+        assert schedule.first_available(SlotSet(booked)) == (free[0] if free else None)
@@ -1,10 +1,15 @@
 # booking/tests/test_api.py
 import pytest
 import json
+import threading
 from datetime import date
+from django.db import connection
+from django.test import Client
 from django.urls import reverse
 from booking.models import Appointment
 
+THREADS = 16
+
 @pytest.mark.django_db
 class TestAvailableSlotsAPI:
     
@@ -36,7 +41,7 @@ class TestAvailableSlotsAPI:
             name="Test User",
             phone_number="1234567890", 
             date=date(2025, 3, 15),
-            time_slot="10:00 AM"
+            time_slot=600
         )
         
         # Check available slots
@@ -52,6 +57,74 @@ class TestAvailableSlotsAPI:
         # Other slots should still be available
         assert "10:30 AM" in content['available_slots']
 
+    def test_get_available_slots_range(self, client, django_assert_num_queries):
+        """Test fetching a per-day availability map for a date range in one query"""
+        Appointment.objects.create(
+            name="Test User",
+            phone_number="1234567890",
+            date=date(2025, 3, 16),
+            time_slot=600
+        )
+
+        url = reverse('available_slots') + '?start=2025-03-15&end=2025-03-17'
+        with django_assert_num_queries(1):
+            response = client.get(url)
+
+        assert response.status_code == 200
+        days = json.loads(response.content)['days']
+        assert list(days) == ['2025-03-15', '2025-03-16', '2025-03-17']
+        assert len(days['2025-03-15']) == 12
+        assert len(days['2025-03-16']) == 11
+        assert "10:00 AM" not in days['2025-03-16']
+
+    def test_get_available_slots_range_validation(self, client):
+        """Test that incomplete, reversed and oversized ranges are rejected"""
+        url = reverse('available_slots')
+
+        assert client.get(url + '?start=2025-03-15').status_code == 400
+        assert client.get(url + '?start=2025-03-15&end=2025-03-14').status_code == 400
+        assert client.get(url + '?start=2025-01-01&end=2025-12-31').status_code == 400
+
+    def test_conditional_get(self, client, django_assert_num_queries):
+        """Test that a matching If-None-Match is answered with 304 without queries"""
+        url = reverse('available_slots') + '?date=2025-03-15'
+        response = client.get(url)
+        etag = response['ETag']
+        
+        assert etag.startswith('"')
+        assert 'public' in response['Cache-Control']
+        assert 'max-age=' in response['Cache-Control']
+        
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+        assert response.content == b''
+        
+        # Other dates have their own version
+        other = client.get(reverse('available_slots') + '?date=2025-03-16')
+        assert other['ETag'] != etag
+    
+    def test_etag_changes_on_booking(self, client):
+        """Test that writing an appointment bumps the ETag of its date and of ranges covering it"""
+        url = reverse('available_slots') + '?date=2025-03-15'
+        range_url = reverse('available_slots') + '?start=2025-03-14&end=2025-03-16'
+        etag = client.get(url)['ETag']
+        range_etag = client.get(range_url)['ETag']
+        
+        Appointment.objects.create(
+            name="Test User",
+            phone_number="1234567890",
+            date=date(2025, 3, 15),
+            time_slot=600
+        )
+        
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+        assert "10:00 AM" not in json.loads(response.content)['available_slots']
+        assert client.get(range_url, HTTP_IF_NONE_MATCH=range_etag).status_code == 200
+
 @pytest.mark.django_db
 class TestBookAppointmentAPI:
     
@@ -77,7 +150,7 @@ class TestBookAppointmentAPI:
         
         # Verify appointment was created in the database
         appointment = Appointment.objects.get(name="Test User")
-        assert appointment.time_slot == "10:00 AM"
+        assert appointment.time_slot == 600
     
     def test_book_appointment_missing_fields(self, client):
         """Test booking with missing fields"""
@@ -106,7 +179,7 @@ class TestBookAppointmentAPI:
             name="Test User 1",
             phone_number="1234567890", 
             date=date(2025, 3, 15),
-            time_slot="10:00 AM"
+            time_slot=600
         )
         
         # Try to book the same slot
@@ -124,7 +197,156 @@ class TestBookAppointmentAPI:
             content_type='application/json'
         )
         
-        assert response.status_code == 400
+        assert response.status_code == 409
         content = json.loads(response.content)
         assert 'error' in content
-        assert 'already booked' in content['error']
\ No newline at end of file
+        assert 'already booked' in content['error']
+        assert content['next_available_slots'] == ["10:30 AM", "11:00 AM", "11:30 AM"]
+    
+    def test_book_appointment_single_insert(self, client, django_assert_max_num_queries):
+        """Test that a booking is a single INSERT after the slot's hold lookup, without an exists() check"""
+        url = reverse('book_appointment')
+        data = {
+            "name": "Test User",
+            "phone_number": "1234567890",
+            "date": "2025-03-15",
+            "time_slot": "10:00 AM"
+        }
+        
+        with django_assert_max_num_queries(4) as captured:
+            response = client.post(url, data=json.dumps(data), content_type='application/json')
+        
+        assert response.status_code == 200
+        # Savepoints come from running inside the test case's transaction
+        queries = [q['sql'] for q in captured.captured_queries if q['sql'].split()[0] not in ('SAVEPOINT', 'RELEASE')]
+        assert [sql.split()[0] for sql in queries] == ['SELECT', 'INSERT']
+        assert 'booking_slothold' in queries[0]
+
+
+@pytest.mark.django_db
+class TestBulkBookAppointmentsAPI:
+    
+    def post(self, client, appointments, mode=None):
+        data = {"appointments": appointments}
+        if mode:
+            data["mode"] = mode
+        return client.post(
+            reverse('bulk_book_appointments'),
+            data=json.dumps(data),
+            content_type='application/json'
+        )
+    
+    def appointment(self, time_slot, day="2025-03-15"):
+        return {
+            "name": "Test User",
+            "phone_number": "1234567890",
+            "date": day,
+            "time_slot": time_slot
+        }
+    
+    def test_bulk_book_success(self, client, django_assert_max_num_queries):
+        """Test that a valid batch is checked with one query and inserted with one statement"""
+        appointments = [self.appointment(slot) for slot in ("10:00 AM", "10:30 AM", "2:00 PM")]
+        
+        with django_assert_max_num_queries(4):
+            response = self.post(client, appointments)
+        
+        assert response.status_code == 200
+        content = json.loads(response.content)
+        assert content['success'] is True
+        assert content['created'] == 3
+        assert [result['status'] for result in content['results']] == ['created'] * 3
+        assert Appointment.objects.filter(date=date(2025, 3, 15)).count() == 3
+        assert Appointment.objects.filter(time_slot=840).exists()
+    
+    def test_atomic_batch_rejected(self, client):
+        """Test that one bad item rejects the whole batch in atomic mode"""
+        Appointment.objects.create(
+            name="Test User 1",
+            phone_number="1234567890", 
+            date=date(2025, 3, 15),
+            time_slot=600
+        )
+        appointments = [self.appointment("10:00 AM"), self.appointment("10:30 AM")]
+        
+        response = self.post(client, appointments)
+        
+        assert response.status_code == 409
+        results = json.loads(response.content)['results']
+        assert [result['status'] for result in results] == ['conflict', 'skipped']
+        assert Appointment.objects.count() == 1
+    
+    def test_best_effort_batch(self, client):
+        """Test that best-effort mode books valid items and reports the others"""
+        Appointment.objects.create(
+            name="Test User 1",
+            phone_number="1234567890", 
+            date=date(2025, 3, 15),
+            time_slot=600
+        )
+        appointments = [
+            self.appointment("10:00 AM"),
+            self.appointment("10:30 AM"),
+            self.appointment("10:30 AM"),
+            self.appointment("1:00 PM"),
+            self.appointment("11:00 AM", day="2025-03-16"),
+        ]
+        
+        response = self.post(client, appointments, mode='best_effort')
+        
+        assert response.status_code == 200
+        content = json.loads(response.content)
+        assert content['success'] is False
+        assert content['created'] == 2
+        statuses = [result['status'] for result in content['results']]
+        assert statuses == ['conflict', 'created', 'conflict', 'invalid', 'created']
+        assert 'lunch hour' in content['results'][3]['error']
+        assert Appointment.objects.count() == 3
+    
+    def test_bulk_book_invalidates_availability(self, client):
+        """Test that bulk inserts refresh the cached availability of their dates"""
+        url = reverse('available_slots') + '?date=2025-03-15'
+        assert len(json.loads(client.get(url).content)['available_slots']) == 12
+        
+        self.post(client, [self.appointment("10:00 AM")])
+        
+        assert "10:00 AM" not in json.loads(client.get(url).content)['available_slots']
+    
+    def test_bulk_book_validation(self, client):
+        """Test that malformed batches are rejected"""
+        assert self.post(client, []).status_code == 400
+        assert self.post(client, [self.appointment("10:00 AM")], mode='some').status_code == 400
+        assert self.post(client, [self.appointment("10:00 AM")] * 501).status_code == 400
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentBooking:
+    
+    def test_one_winner_per_slot(self):
+        """Test that many clients racing for one slot produce one booking and clean 409s"""
+        url = reverse('book_appointment')
+        barrier = threading.Barrier(THREADS)
+        statuses = []
+        
+        def book(i):
+            data = {
+                "name": f"User {i}",
+                "phone_number": f"12345678{i:02d}",
+                "date": "2025-03-15",
+                "time_slot": "10:00 AM"
+            }
+            try:
+                barrier.wait()
+                response = Client().post(url, data=json.dumps(data), content_type='application/json')
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+        
+        threads = [threading.Thread(target=book, args=(i,)) for i in range(THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert sorted(statuses) == [200] + [409] * (THREADS - 1)
+        assert Appointment.objects.filter(date=date(2025, 3, 15), time_slot=600).count() == 1
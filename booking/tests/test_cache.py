@@ -0,0 +1,118 @@
+# booking/tests/test_cache.py
+import pytest
+import time
+from datetime import date
+from booking import cache as availability_cache
+from booking.bitset import EMPTY, SlotSet
+from booking.models import Appointment
+
+@pytest.mark.django_db
+class TestAvailabilityCache:
+    
+    def test_hits_and_misses(self, django_assert_num_queries):
+        """Test that the second lookup of a date is served from the cache"""
+        Appointment.objects.create(
+            name="Test User",
+            phone_number="1234567890",
+            date=date(2025, 3, 15),
+            time_slot=600
+        )
+        
+        with django_assert_num_queries(1):
+            assert availability_cache.get_booked_slots(date(2025, 3, 15)) == SlotSet([600])
+        with django_assert_num_queries(0):
+            assert availability_cache.get_booked_slots(date(2025, 3, 15)) == SlotSet([600])
+        
+        stats = availability_cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+    
+    def test_save_and_delete_invalidate(self):
+        """Test that model writes drop the cached entry of their date"""
+        day = date(2025, 3, 15)
+        assert availability_cache.get_booked_slots(day) == EMPTY
+        
+        appointment = Appointment.objects.create(
+            name="Test User",
+            phone_number="1234567890",
+            date=day,
+            time_slot=600
+        )
+        assert availability_cache.get_booked_slots(day) == SlotSet([600])
+        
+        appointment.delete()
+        assert availability_cache.get_booked_slots(day) == EMPTY
+    
+    def test_moving_appointment_invalidates_both_dates(self):
+        """Test that changing an appointment's date refreshes the old and new dates"""
+        appointment = Appointment.objects.create(
+            name="Test User",
+            phone_number="1234567890",
+            date=date(2025, 3, 15),
+            time_slot=600
+        )
+        appointment = Appointment.objects.get(pk=appointment.pk)
+        assert availability_cache.get_booked_slots(date(2025, 3, 15)) == SlotSet([600])
+        assert availability_cache.get_booked_slots(date(2025, 3, 16)) == EMPTY
+        
+        appointment.date = date(2025, 3, 16)
+        appointment.save()
+        
+        assert availability_cache.get_booked_slots(date(2025, 3, 15)) == EMPTY
+        assert availability_cache.get_booked_slots(date(2025, 3, 16)) == SlotSet([600])
+    
+    def test_invalidation_after_commit(self, django_capture_on_commit_callbacks):
+        """Test that the entry is dropped again once the booking transaction commits"""
+        day = date(2025, 3, 15)
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            Appointment.objects.create(
+                name="Test User",
+                phone_number="1234567890",
+                date=day,
+                time_slot=600
+            )
+            # Simulate a concurrent reader repopulating the entry before commit
+            availability_cache.get_booked_slots(day)
+        
+        # The re-invalidation and the slot_taken event
+        assert len(callbacks) == 2
+        assert availability_cache.get_booked_slots(day) == SlotSet([600])
+        assert availability_cache.get_stats()['invalidations'] == 2
+    
+    def test_dates_lookup_uses_one_query(self, django_assert_num_queries):
+        """Test that missing dates are loaded together and cached ones are skipped"""
+        Appointment.objects.create(
+            name="Test User",
+            phone_number="1234567890",
+            date=date(2025, 3, 16),
+            time_slot=600
+        )
+        availability_cache.get_booked_slots(date(2025, 3, 15))
+        
+        days = [date(2025, 3, 15), date(2025, 3, 16), date(2025, 3, 17)]
+        with django_assert_num_queries(1):
+            booked = availability_cache.get_booked_slots_for_dates(days)
+        assert booked == {days[0]: EMPTY, days[1]: SlotSet([600]), days[2]: EMPTY}
+        
+        with django_assert_num_queries(0):
+            availability_cache.get_booked_slots_for_dates(days)
+    
+    def test_versions_expire_with_entries(self, monkeypatch, settings):
+        """Test that bookings made by another process get a new version once the entries expire"""
+        day = date(2025, 3, 15)
+        version = availability_cache.get_versions([day])[day]
+        assert availability_cache.get_booked_slots(day) == EMPTY
+        
+        # bulk_create sends no signals, like a write through another process's cache
+        Appointment.objects.bulk_create([Appointment(
+            name="Test User",
+            phone_number="1234567890",
+            date=day,
+            time_slot=600
+        )])
+        assert availability_cache.get_versions([day])[day] == version
+        
+        later = time.time() + settings.BOOKING_CACHE_TIMEOUT + 1
+        monkeypatch.setattr(time, 'time', lambda: later)
+        assert availability_cache.get_versions([day])[day] != version
+        assert availability_cache.get_booked_slots(day) == SlotSet([600])
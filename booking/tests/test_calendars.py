@@ -0,0 +1,118 @@
+# booking/tests/test_calendars.py
+import pytest
+import json
+import time
+from datetime import date
+from django.urls import reverse
+from booking import calendars
+from booking.models import DateOverride, Holiday, Provider, WeeklyHours
+from booking.schedule import CLOSED_SCHEDULE, DEFAULT_SCHEDULE
+
+SATURDAY = date(2025, 3, 15)
+MONDAY = date(2025, 3, 17)
+
+def book(client, **fields):
+    data = {
+        "name": "Test User",
+        "phone_number": "1234567890",
+        "date": SATURDAY.isoformat(),
+        "time_slot": "10:00 AM",
+        **fields
+    }
+    return client.post(reverse('book_appointment'), data=json.dumps(data), content_type='application/json')
+
+def available_slots(client, day):
+    response = client.get(reverse('available_slots') + f'?date={day}')
+    return json.loads(response.content)['available_slots']
+
+@pytest.mark.django_db
+class TestCalendar:
+
+    def test_precedence(self):
+        """Test that holidays beat date overrides, which beat weekly hours, which beat the base hours"""
+        provider = Provider.objects.create(name="Dr. Smith", opens_at=480)
+        WeeklyHours.objects.create(weekday=SATURDAY.weekday(), opens_at=540, closes_at=720, break_start=720, break_end=720)
+        DateOverride.objects.create(date=MONDAY, is_closed=True)
+        DateOverride.objects.create(provider=provider, date=SATURDAY, opens_at=600, closes_at=660)
+        Holiday.objects.create(date=date(2025, 12, 25), name="Christmas")
+
+        calendar = calendars.get_calendar()
+
+        assert calendar.schedule_for(SATURDAY).slots == ("09:00 AM", "09:30 AM", "10:00 AM", "10:30 AM", "11:00 AM", "11:30 AM")
+        assert calendar.schedule_for(MONDAY) is CLOSED_SCHEDULE
+        assert calendar.schedule_for(date(2025, 3, 18)) is DEFAULT_SCHEDULE
+        assert calendar.schedule_for(SATURDAY, provider).slots == ("10:00 AM", "10:30 AM")
+        assert calendar.schedule_for(MONDAY, provider) is provider.schedule
+        assert calendar.schedule_for(date(2025, 12, 25), provider) is CLOSED_SCHEDULE
+
+    def test_compiled_once_per_rules_version(self, django_assert_num_queries):
+        """Test that the calendar is only recompiled after a rule changes"""
+        calendar = calendars.get_calendar()
+        with django_assert_num_queries(0):
+            assert calendars.get_calendar() is calendar
+
+        Holiday.objects.create(date=SATURDAY, name="Closed")
+
+        with django_assert_num_queries(3):
+            calendar = calendars.get_calendar()
+        assert calendar.schedule_for(SATURDAY) is CLOSED_SCHEDULE
+
+    def test_version_expires(self, monkeypatch, settings):
+        """Test that rule changes made through another process are compiled once the version expires"""
+        calendar = calendars.get_calendar()
+
+        # bulk_create sends no signals, like a change through another process's cache
+        Holiday.objects.bulk_create([Holiday(date=SATURDAY, name="Closed")])
+        assert calendars.get_calendar() is calendar
+
+        later = time.time() + settings.BOOKING_CACHE_TIMEOUT + 1
+        monkeypatch.setattr(time, 'time', lambda: later)
+        calendar = calendars.get_calendar()
+        assert calendar.schedule_for(SATURDAY) is CLOSED_SCHEDULE
+
+@pytest.mark.django_db
+class TestCalendarAPI:
+
+    def test_weekly_hours(self, client):
+        """Test that weekly hours change availability and validation of that weekday only"""
+        WeeklyHours.objects.create(weekday=SATURDAY.weekday(), opens_at=540, closes_at=720, break_start=720, break_end=720)
+
+        assert available_slots(client, SATURDAY)[0] == "09:00 AM"
+        assert len(available_slots(client, MONDAY)) == 12
+        assert book(client, time_slot="09:00 AM").status_code == 200
+
+        response = book(client, time_slot="02:00 PM")
+        assert response.status_code == 400
+        assert json.loads(response.content)['error'] == "Appointments are only available between 9:00 AM and 12:00 PM"
+
+    def test_closed_dates(self, client):
+        """Test that holidays and closed overrides have no slots and cannot be booked"""
+        Holiday.objects.create(date=SATURDAY, name="Founders Day")
+        DateOverride.objects.create(date=MONDAY, is_closed=True)
+
+        for day in (SATURDAY, MONDAY):
+            assert available_slots(client, day) == []
+            response = book(client, date=day.isoformat())
+            assert response.status_code == 400
+            assert json.loads(response.content)['error'] == 'No appointments are available on this date'
+
+    def test_next_available_skips_closed_days(self, client):
+        """Test that the next-available search follows the calendar"""
+        Holiday.objects.create(date=SATURDAY, name="Founders Day")
+        WeeklyHours.objects.create(weekday=6, is_closed=True)
+
+        response = client.get(reverse('next_available_slots') + f'?from={SATURDAY}&count=1')
+
+        assert json.loads(response.content)['slots'] == [{'date': MONDAY.isoformat(), 'time_slot': "10:00 AM"}]
+
+    def test_rule_change_changes_etag(self, client):
+        """Test that a cached availability response is not reused after the rules change"""
+        url = reverse('available_slots') + f'?date={SATURDAY}'
+        etag = client.get(url)['ETag']
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        DateOverride.objects.create(date=SATURDAY, opens_at=600, closes_at=720)
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert len(json.loads(response.content)['available_slots']) == 4
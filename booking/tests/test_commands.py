@@ -0,0 +1,151 @@
+# booking/tests/test_commands.py
+import pytest
+import json
+from datetime import date, timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from appointment_system import schema
+from appointment_system.schema import load_schema
+from drf_yasg.generators import OpenAPISchemaGenerator
+from booking import archive, cache, views
+from booking.models import Appointment, ArchivedAppointment, Provider
+
+@pytest.mark.django_db
+class TestSeedAppointmentsCommand:
+    
+    def test_seed_fills_consecutive_days(self):
+        """Test that every slot of consecutive days is filled and re-runs are no-ops"""
+        out = StringIO()
+        call_command('seed_appointments', 30, start_date=date(2030, 1, 1), batch_size=7, stdout=out)
+        call_command('seed_appointments', 30, start_date=date(2030, 1, 1), stdout=StringIO())
+        
+        assert Appointment.objects.count() == 30
+        assert Appointment.objects.filter(date=date(2030, 1, 1)).count() == 12
+        assert Appointment.objects.filter(date=date(2030, 1, 3)).count() == 6
+        assert 'Seeded 30 appointments from 2030-01-01 to 2030-01-03' in out.getvalue()
+
+class TestGenerateSchemaCommand:
+
+    @pytest.fixture(autouse=True)
+    def schema_dir(self, settings, tmp_path):
+        settings.SCHEMA_DIR = tmp_path
+        load_schema.cache_clear()
+        yield tmp_path
+        load_schema.cache_clear()
+
+    def test_served_from_generated_file(self, client, schema_dir):
+        """Test that the generated schema is served as is, with an ETag and long-lived caching"""
+        call_command('generate_schema', stdout=StringIO())
+        content = (schema_dir / 'swagger.json').read_bytes()
+        assert '/book-appointment/' in json.loads(content)['paths']
+        assert (schema_dir / 'swagger.yaml').exists()
+
+        response = client.get(reverse('schema-json', kwargs={'format': '.json'}))
+
+        assert response.status_code == 200
+        assert response.content == content
+        assert 'max-age=86400' in response['Cache-Control']
+        not_modified = client.get(reverse('schema-json', kwargs={'format': '.json'}), HTTP_IF_NONE_MATCH=response['ETag'])
+        assert not_modified.status_code == 304
+
+    def test_generated_once_without_file(self, client, monkeypatch):
+        """Test that a missing file falls back to one memoized generation per format"""
+        calls = []
+        monkeypatch.setattr(schema, 'generate_schema', lambda format: calls.append(format) or b'{}')
+
+        for _ in range(3):
+            assert client.get(reverse('schema-json', kwargs={'format': '.yaml'})).status_code == 200
+        assert client.get(reverse('schema-json', kwargs={'format': '.xml'})).status_code == 404
+
+        assert calls == ['.yaml']
+
+    @pytest.mark.parametrize('name', ['schema-swagger-ui', 'schema-redoc'])
+    def test_ui_loads_pre_generated_spec(self, client, monkeypatch, name):
+        """Test that the documentation pages point at the served schema file without introspecting the API"""
+        calls = []
+        monkeypatch.setattr(OpenAPISchemaGenerator, 'get_schema', lambda *args, **kwargs: calls.append(args))
+
+        response = client.get(reverse(name))
+
+        assert response.status_code == 200
+        assert reverse('schema-json', kwargs={'format': '.json'}) in response.content.decode()
+        assert calls == []
+
+
+@pytest.mark.django_db
+class TestArchiveAppointmentsCommand:
+
+    @pytest.fixture(autouse=True)
+    def archive_after(self, settings):
+        settings.BOOKING_ARCHIVE_AFTER_DAYS = 90
+
+    @pytest.fixture
+    def appointments(self):
+        """Appointments 400, 200 and 100 days ago and tomorrow, the oldest with a provider"""
+        provider = Provider.objects.create(name="Dr. Smith")
+        days = [date.today() + timedelta(days=offset) for offset in (-400, -200, -100, 1)]
+        return [
+            Appointment.objects.create(
+                name=f"Patient {index}", phone_number="1234567890", date=day, time_slot=600,
+                provider=provider if index == 0 else None
+            )
+            for index, day in enumerate(days)
+        ]
+
+    def test_moves_old_appointments_in_batches(self, appointments):
+        """Test that appointments past the age move to the archive batch by batch, keeping their ids"""
+        out = StringIO()
+        call_command('archive_appointments', days=150, batch_size=1, max_batches=1, stdout=out)
+        assert 'Archived 1 appointments' in out.getvalue()
+        assert list(ArchivedAppointment.objects.values_list('id', flat=True)) == [appointments[0].id]
+
+        # A second run resumes where the first stopped
+        call_command('archive_appointments', days=150, batch_size=1, stdout=StringIO())
+        archived = ArchivedAppointment.objects.order_by('date')
+        assert [a.id for a in archived] == [appointments[0].id, appointments[1].id]
+        assert archived[0].provider_id == appointments[0].provider_id
+        assert archived[0].created_at == appointments[0].created_at
+        assert sorted(Appointment.objects.values_list('id', flat=True)) == [appointments[2].id, appointments[3].id]
+
+    def test_archived_slots_stay_booked(self, appointments, django_assert_num_queries):
+        """Test that availability reads archived appointments with the same number of queries"""
+        call_command('archive_appointments', days=150, stdout=StringIO())
+        oldest, old = appointments[0].date, appointments[1].date
+
+        with django_assert_num_queries(1):
+            assert 600 in cache.get_booked_slots(old)
+        assert 600 in cache.get_booked_slots_for_dates([old])[old]
+        assert 600 in cache.get_provider_bookings_for_dates([oldest])[oldest][appointments[0].provider_id]
+
+        rows = archive.appointment_rows('id', flat=True, since=None)
+        assert sorted(rows) == sorted(a.id for a in appointments)
+        # Dates that cannot be archived only read the live table
+        assert 'UNION' not in str(archive.appointment_rows('id', since=archive.archive_cutoff()).query)
+
+    def test_archivable_dates_cannot_be_booked(self, client, appointments):
+        """Test that bookings, bulk items and holds cannot take slots of dates that may be archived"""
+        call_command('archive_appointments', days=150, stdout=StringIO())
+        slot = {"date": str(appointments[1].date), "time_slot": "10:00 AM"}
+        booking = {"name": "Late", "phone_number": "1234567890", **slot}
+
+        for name, data in (('book_appointment', booking), ('create_hold', slot)):
+            response = client.post(reverse(name), data=json.dumps(data), content_type='application/json')
+            assert response.status_code == 400
+            assert response.json()['error'] == views.PAST_DATE_MESSAGE
+
+        response = client.post(reverse('bulk_book_appointments'), data=json.dumps({
+            "mode": "best_effort", "appointments": [booking],
+        }), content_type='application/json')
+        assert response.json()['results'][0]['error'] == views.PAST_DATE_MESSAGE
+        assert Appointment.objects.count() == 2
+
+    def test_age_below_setting_refused(self, settings, appointments):
+        """Test that dates availability reads from the live table alone are never archived"""
+        settings.BOOKING_ARCHIVE_AFTER_DAYS = 300
+        with pytest.raises(CommandError):
+            call_command('archive_appointments', days=150, stdout=StringIO())
+
+        call_command('archive_appointments', stdout=StringIO())
+        assert ArchivedAppointment.objects.count() == 1
@@ -0,0 +1,118 @@
+# booking/tests/test_db.py
+import pytest
+from datetime import date
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from appointment_system import routers
+from appointment_system.middleware import ReplicaRoutingMiddleware
+from booking import cache
+from booking.models import Appointment, Holiday
+
+@pytest.mark.django_db
+class TestSQLiteProfile:
+    
+    def test_pragmas_applied_on_connection(self):
+        """Test that new SQLite connections run in WAL mode with the configured pragmas"""
+        if connection.vendor != 'sqlite':
+            pytest.skip('SQLite profile only')
+        
+        with connection.cursor() as cursor:
+            assert cursor.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+            assert cursor.execute('PRAGMA synchronous').fetchone()[0] == 1
+            assert cursor.execute('PRAGMA busy_timeout').fetchone()[0] == 5000
+    
+    def test_immediate_transactions(self):
+        """Test that transactions take the write lock up front"""
+        if connection.vendor != 'sqlite':
+            pytest.skip('SQLite profile only')
+        
+        assert connection.transaction_mode == 'IMMEDIATE'
+
+
+@pytest.fixture
+def replica(settings, monkeypatch):
+    """Configure one healthy replica alias; returns the list of health checks made"""
+    settings.DATABASE_REPLICAS = ['replica']
+    checks = []
+    def check_replica(alias):
+        checks.append(alias)
+        return True
+    monkeypatch.setattr(routers, 'check_replica', check_replica)
+    routers.reset_health()
+    yield checks
+    routers.reset_health()
+
+def routed(request, view=None):
+    """Run a request through ReplicaRoutingMiddleware; the response body names the database Appointment reads use"""
+    def get_response(request):
+        if view is not None:
+            view()
+        return HttpResponse(Appointment.objects.all().db)
+    return ReplicaRoutingMiddleware(get_response)(request)
+
+@pytest.mark.django_db(transaction=True)
+class TestReplicaRouting:
+
+    def test_safe_requests_read_replica(self, replica):
+        """Test that GET requests read replicated models from a replica and the rest from the primary"""
+        response = routed(RequestFactory().get('/'))
+        assert response.content == b'replica'
+
+        def view():
+            assert Holiday.objects.all().db == 'default'
+        routed(RequestFactory().get('/'), view)
+
+        assert routed(RequestFactory().post('/')).content == b'default'
+        assert Appointment.objects.all().db == 'default'
+
+    def test_reads_after_writes_are_pinned(self, replica):
+        """Test that a request that wrote reads from the primary and pins its client there"""
+        def book():
+            Appointment.objects.create(name="A", phone_number="1", date=date(2025, 3, 15), time_slot=600)
+
+        response = routed(RequestFactory().get('/'), book)
+        assert response.content == b'default'
+        cookie = response.cookies[ReplicaRoutingMiddleware.PIN_COOKIE]
+        assert cookie['max-age'] == 5
+
+        request = RequestFactory().get('/')
+        request.COOKIES[ReplicaRoutingMiddleware.PIN_COOKIE] = cookie.value
+        assert routed(request).content == b'default'
+        assert routed(RequestFactory().get('/')).content == b'replica'
+
+    def test_unhealthy_replica_falls_back(self, settings, replica, monkeypatch):
+        """Test that reads use the primary while the replica fails its health check, checked once per interval"""
+        def check_replica(alias):
+            replica.append(alias)
+            return False
+        monkeypatch.setattr(routers, 'check_replica', check_replica)
+
+        assert routed(RequestFactory().get('/')).content == b'default'
+        assert routed(RequestFactory().get('/')).content == b'default'
+        assert replica == ['replica']
+
+        settings.DATABASE_REPLICA_HEALTH_INTERVAL = 0
+        routed(RequestFactory().get('/'))
+        assert replica == ['replica', 'replica']
+        assert routers.collect_metrics()[0][3] == [({'database': 'replica'}, 0)]
+
+    def test_written_dates_reload_from_primary(self, replica):
+        """Test that the availability cache reloads recently booked dates from the primary, not a lagging replica"""
+        Appointment.objects.create(name="A", phone_number="1", date=date(2025, 3, 15), time_slot=600)
+        cache.invalidate(date(2025, 3, 15))
+
+        def view():
+            # The 'replica' alias is not configured, so reading it would fail
+            assert 600 in cache.get_booked_slots(date(2025, 3, 15))
+            assert 600 in cache.get_booked_slots_for_dates([date(2025, 3, 15)])[date(2025, 3, 15)]
+        routed(RequestFactory().get('/'), view)
+
+    def test_no_replicas(self):
+        """Test that without replicas every read uses the primary and no cookie is set"""
+        def book():
+            Appointment.objects.create(name="A", phone_number="1", date=date(2025, 3, 15), time_slot=600)
+
+        response = routed(RequestFactory().get('/'), book)
+        assert response.content == b'default'
+        assert ReplicaRoutingMiddleware.PIN_COOKIE not in response.cookies
@@ -0,0 +1,152 @@
+# booking/tests/test_events.py
+import pytest
+import asyncio
+import json
+import threading
+from asgiref.sync import async_to_sync
+from datetime import date
+from django.test import AsyncRequestFactory
+from booking import async_views, events
+from booking.models import Appointment
+
+class TestInProcessBackend:
+
+    def test_publish_reaches_subscribers_of_the_date(self):
+        """Test that events published from another thread reach only that date's subscribers"""
+        backend = events.InProcessBackend()
+
+        async def scenario():
+            with backend.subscribe(date(2025, 3, 15)) as subscription, \
+                    backend.subscribe(date(2025, 3, 16)) as other:
+                assert backend.subscriber_count() == 2
+                publisher = threading.Thread(
+                    target=backend.publish,
+                    args=(date(2025, 3, 15), {'type': events.SLOT_TAKEN})
+                )
+                publisher.start()
+                publisher.join()
+                event = await asyncio.wait_for(subscription.get(), 1)
+                assert other.queue.empty()
+                return event
+
+        assert async_to_sync(scenario)() == {'type': events.SLOT_TAKEN}
+        assert backend.subscriber_count() == 0
+
+    def test_full_queue_drops_oldest_event(self):
+        """Test that a slow subscriber keeps the most recent events"""
+        backend = events.InProcessBackend()
+
+        async def scenario():
+            with backend.subscribe('2025-03-15') as subscription:
+                for i in range(events.QUEUE_SIZE + 1):
+                    subscription.deliver(i)
+                return await subscription.get()
+
+        assert async_to_sync(scenario)() == 1
+
+@pytest.mark.django_db
+class TestSlotEventPublishing:
+
+    @pytest.fixture
+    def published(self, monkeypatch):
+        published = []
+        monkeypatch.setattr(events, 'publish', lambda *args: published.append(args))
+        return published
+
+    def test_events_follow_commits(self, published, django_capture_on_commit_callbacks):
+        """Test that booking, moving and cancelling publish events once committed"""
+        day = date(2025, 3, 15)
+        with django_capture_on_commit_callbacks(execute=True):
+            appointment = Appointment.objects.create(
+                name="Test User",
+                phone_number="1234567890",
+                date=day,
+                time_slot=600
+            )
+            assert published == []
+
+        with django_capture_on_commit_callbacks(execute=True):
+            appointment.time_slot = 630
+            appointment.save()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            appointment.delete()
+
+        assert published == [
+            (events.SLOT_TAKEN, day, 600, None),
+            (events.SLOT_FREED, day, 600, None),
+            (events.SLOT_TAKEN, day, 630, None),
+            (events.SLOT_FREED, day, 630, None),
+        ]
+
+    def test_unchanged_slot_publishes_nothing(self, published, django_capture_on_commit_callbacks):
+        """Test that saving other fields does not announce the slot again"""
+        appointment = Appointment.objects.create(
+            name="Test User",
+            phone_number="1234567890",
+            date=date(2025, 3, 15),
+            time_slot=600
+        )
+        with django_capture_on_commit_callbacks(execute=True):
+            appointment.name = "Renamed User"
+            appointment.save()
+
+        assert published == []
+
+class TestSlotEventsView:
+
+    def test_stream(self):
+        """Test that the stream opens with a retry hint and relays published events"""
+        async def scenario():
+            request = AsyncRequestFactory().get('/api/v1/slot-events/', {'date': '2025-03-15'})
+            response = await async_views.slot_events(request)
+            assert response['Content-Type'] == 'text/event-stream'
+            assert response['Cache-Control'] == 'no-cache'
+
+            stream = response.streaming_content
+            chunks = [await anext(stream)]
+            assert events.get_backend().subscriber_count('2025-03-15') == 1
+            events.publish(events.SLOT_TAKEN, date(2025, 3, 15), 600)
+            chunks.append(await anext(stream))
+            await stream.aclose()
+            return chunks
+
+        retry, event = [chunk.decode() for chunk in async_to_sync(scenario)()]
+
+        assert retry == 'retry: 3000\n\n'
+        name, data = event.strip().split('\n')
+        assert name == 'event: slot_taken'
+        assert json.loads(data.removeprefix('data: ')) == {
+            'type': 'slot_taken',
+            'date': '2025-03-15',
+            'time_slot': '10:00 AM',
+            'provider': None
+        }
+        assert events.get_backend().subscriber_count() == 0
+
+    def test_heartbeat(self, monkeypatch):
+        """Test that an idle stream sends keep-alive comments"""
+        monkeypatch.setattr(async_views, 'HEARTBEAT_SECONDS', 0.01)
+
+        async def scenario():
+            request = AsyncRequestFactory().get('/api/v1/slot-events/', {'date': '2025-03-15'})
+            stream = (await async_views.slot_events(request)).streaming_content
+            chunks = [await anext(stream), await anext(stream)]
+            await stream.aclose()
+            return chunks
+
+        assert async_to_sync(scenario)()[1] == b': keep-alive\n\n'
+
+    def test_invalid_date(self):
+        """Test that a bad date is rejected before streaming"""
+        request = AsyncRequestFactory().get('/api/v1/slot-events/', {'date': 'invalid-date'})
+        response = async_to_sync(async_views.slot_events)(request)
+
+        assert response.status_code == 400
+
+    def test_not_streamed_under_wsgi(self, client):
+        """Test that WSGI requests get 204 instead of a stream that would hold a worker forever"""
+        response = client.get('/api/v1/slot-events/', {'date': '2025-03-15'})
+
+        assert response.status_code == 204
+        assert events.get_backend().subscriber_count() == 0
@@ -0,0 +1,103 @@
+# booking/tests/test_export.py
+import pytest
+import csv
+import gzip
+import io
+import json
+from datetime import date, timedelta
+from django.core.management import call_command
+from django.urls import reverse
+from booking.models import Appointment, ArchivedAppointment, Provider
+
+START = date(2025, 3, 1)
+END = date(2025, 3, 31)
+
+def export(client, **params):
+    response = client.get(reverse('export_appointments'), {'start': str(START), 'end': str(END), **params})
+    assert response.status_code == 200, response.content
+    return response, b''.join(response.streaming_content)
+
+@pytest.fixture
+def appointments():
+    provider = Provider.objects.create(name="Dr. Smith")
+    return [
+        Appointment.objects.create(name="Late", phone_number="+1234567890", date=date(2025, 3, 15), time_slot=630, provider=provider),
+        Appointment.objects.create(name="Early", phone_number="2", date=date(2025, 3, 15), time_slot=600),
+        Appointment.objects.create(name="First", phone_number="3", date=START, time_slot=720),
+        Appointment.objects.create(name="Outside", phone_number="4", date=END + timedelta(days=1), time_slot=600),
+    ]
+
+@pytest.mark.django_db
+class TestExportAppointments:
+
+    def test_csv(self, admin_client, appointments):
+        """Test that the CSV export holds the range's appointments by date and slot"""
+        response, content = export(admin_client)
+
+        assert response['Content-Type'] == 'text/csv'
+        assert response['Content-Disposition'] == 'attachment; filename="appointments-2025-03-01-2025-03-31.csv"'
+        rows = list(csv.DictReader(io.StringIO(content.decode())))
+        assert [row['name'] for row in rows] == ["First", "Early", "Late"]
+        assert rows[2]['id'] == str(appointments[0].id)
+        assert rows[2]['date'] == "2025-03-15"
+        assert rows[2]['time_slot'] == "10:30 AM"
+        assert rows[2]['provider_id'] == str(appointments[0].provider_id)
+        assert rows[2]['phone_number'] == "+1234567890"
+        assert rows[1]['provider_id'] == ""
+
+    def test_ndjson_gzip(self, admin_client, appointments):
+        """Test that the NDJSON export can be gzipped"""
+        response, content = export(admin_client, format='ndjson', gzip='true')
+
+        assert response['Content-Type'] == 'application/gzip'
+        assert response['Content-Disposition'].endswith('.ndjson.gz"')
+        records = [json.loads(line) for line in gzip.decompress(content).splitlines()]
+        assert [record['name'] for record in records] == ["First", "Early", "Late"]
+        assert records[0]['time_slot'] == "12:00 PM"
+        assert records[1]['provider_id'] is None
+
+    def test_includes_archived(self, admin_client, settings):
+        """Test that archived appointments of the range are exported with the live ones"""
+        settings.BOOKING_ARCHIVE_AFTER_DAYS = 90
+        day = date.today() - timedelta(days=365)
+        Appointment.objects.create(name="Live", phone_number="1", date=day, time_slot=600)
+        ArchivedAppointment.objects.create(id=1000, name="Archived", phone_number="2", date=day, time_slot=630,
+                                           created_at=day.isoformat() + 'T00:00:00Z')
+
+        response = admin_client.get(reverse('export_appointments'), {'start': str(day), 'end': str(day), 'format': 'ndjson'})
+        records = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        assert [record['name'] for record in records] == ["Live", "Archived"]
+
+    def test_formulas_escaped(self, admin_client):
+        """Test that names spreadsheets would evaluate are quoted in CSV"""
+        Appointment.objects.create(name="=HYPERLINK(\"x\")", phone_number="1", date=START, time_slot=600)
+        _, content = export(admin_client)
+        assert list(csv.reader(io.StringIO(content.decode())))[1][4] == "'=HYPERLINK(\"x\")"
+
+    def test_invalid_parameters(self, admin_client):
+        """Test that bad dates and formats are refused"""
+        url = reverse('export_appointments')
+        assert admin_client.get(url, {'start': "2025-03-01"}).status_code == 400
+        assert admin_client.get(url, {'start': "2025-03-31", 'end': "2025-03-01"}).status_code == 400
+        assert admin_client.get(url, {'start': "2025-03-01", 'end': "2025-03-31", 'format': "xml"}).status_code == 400
+
+    def test_staff_only(self, client, django_user_model):
+        """Test that only staff users can export"""
+        url = reverse('export_appointments')
+        params = {'start': str(START), 'end': str(END)}
+        assert client.get(url, params).status_code == 403
+
+        client.force_login(django_user_model.objects.create_user(username="user", password="password"))
+        assert client.get(url, params).status_code == 403
+
+    def test_command(self, appointments, tmp_path):
+        """Test that the command writes the same export to a file"""
+        path = tmp_path / 'export.csv.gz'
+        out = io.StringIO()
+        call_command('export_appointments', str(path), start=START, end=END, gzip=True, chunk_size=2, stdout=out)
+
+        rows = list(csv.reader(io.StringIO(gzip.decompress(path.read_bytes()).decode())))
+        assert rows[0] == ['id', 'date', 'time_slot', 'provider_id', 'name', 'phone_number', 'created_at']
+        assert [row[4] for row in rows[1:]] == ["First", "Early", "Late"]
+        assert f'Exported 3 appointments to {path}' in out.getvalue()
+        assert not path.with_suffix('.gz.tmp').exists()
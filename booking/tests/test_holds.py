@@ -0,0 +1,183 @@
+# booking/tests/test_holds.py
+import pytest
+import json
+from datetime import date, timedelta
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory
+from django.urls import reverse
+from django.utils import timezone
+from booking import async_views, holds
+from booking.models import Appointment, Provider, SlotHold
+
+DAY = "2025-03-15"
+
+def post(client, name, data):
+    return client.post(reverse(name), data=json.dumps(data), content_type='application/json')
+
+def available(client):
+    response = client.get(reverse('available_slots'), {'date': DAY})
+    return response, response.json()['available_slots']
+
+@pytest.fixture
+def hold(client, django_capture_on_commit_callbacks):
+    """Hold 10:00 AM on DAY and return the response body"""
+    with django_capture_on_commit_callbacks(execute=True):
+        response = post(client, 'create_hold', {"date": DAY, "time_slot": "10:00 AM"})
+    assert response.status_code == 201
+    return response.json()
+
+@pytest.mark.django_db
+class TestSlotHolds:
+
+    def test_hold_hides_slot(self, client, django_capture_on_commit_callbacks):
+        """Test that a held slot is no longer available and the ETag changes"""
+        before, slots = available(client)
+        assert "10:00 AM" in slots
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = post(client, 'create_hold', {"date": DAY, "time_slot": "10:00 AM"})
+
+        assert response.status_code == 201
+        data = response.json()
+        assert data['date'] == DAY
+        assert data['time_slot'] == "10:00 AM"
+        assert data['provider'] is None
+        assert SlotHold.objects.get().token.hex == data['hold'].replace('-', '')
+
+        after, slots = available(client)
+        assert "10:00 AM" not in slots
+        assert after['ETag'] != before['ETag']
+
+    def test_slot_cannot_be_held_twice(self, client, hold):
+        """Test that a held or booked slot cannot be held again"""
+        response = post(client, 'create_hold', {"date": DAY, "time_slot": "10:00 AM"})
+        assert response.status_code == 409
+        assert response.json()['error'] == holds.HELD_MESSAGE
+        assert response.json()['next_available_slots'][0] == "10:30 AM"
+
+        Appointment.objects.create(name="Other", phone_number="1", date=DAY, time_slot=630)
+        response = post(client, 'create_hold', {"date": DAY, "time_slot": "10:30 AM"})
+        assert response.status_code == 409
+        assert response.json()['error'] == holds.BOOKED_MESSAGE
+
+    def test_others_cannot_book_held_slot(self, client, hold):
+        """Test that booking a slot held by somebody else is refused"""
+        booking = {"name": "Other", "phone_number": "1", "date": DAY, "time_slot": "10:00 AM"}
+        response = post(client, 'book_appointment', booking)
+        assert response.status_code == 409
+        assert response.json()['error'] == holds.HELD_MESSAGE
+
+        response = post(client, 'book_appointment', {**booking, "hold": "00000000-0000-0000-0000-000000000000"})
+        assert response.status_code == 409
+
+        response = post(client, 'book_appointment', {**booking, "hold": "not-a-token"})
+        assert response.status_code == 400
+        assert response.json()['error'] == 'Invalid hold token'
+        assert not Appointment.objects.exists()
+
+    def test_hold_missing_from_cache(self, client):
+        """Test that a hold the cache does not list (another process, eviction, not yet committed) still stops bookings"""
+        SlotHold.objects.create(date=DAY, time_slot=600, expires_at=timezone.now() + timedelta(minutes=5))
+
+        response = post(client, 'book_appointment', {"name": "Other", "phone_number": "1", "date": DAY, "time_slot": "10:00 AM"})
+
+        assert response.status_code == 409
+        assert response.json()['error'] == holds.HELD_MESSAGE
+        assert not Appointment.objects.exists()
+
+    def test_holder_books_slot(self, client, hold, django_capture_on_commit_callbacks):
+        """Test that booking with the hold token turns the hold into the appointment"""
+        booking = {"name": "Holder", "phone_number": "1", "date": DAY, "time_slot": "10:00 AM", "hold": hold['hold']}
+        with django_capture_on_commit_callbacks(execute=True):
+            response = post(client, 'book_appointment', booking)
+
+        assert response.status_code == 200
+        assert Appointment.objects.get().name == "Holder"
+        assert not SlotHold.objects.exists()
+        assert "10:00 AM" not in available(client)[1]
+
+    def test_release(self, client, hold, django_capture_on_commit_callbacks):
+        """Test that a released hold frees its slot at once"""
+        url = reverse('release_hold', args=[hold['hold']])
+        with django_capture_on_commit_callbacks(execute=True):
+            assert client.delete(url).status_code == 204
+
+        assert not SlotHold.objects.exists()
+        assert "10:00 AM" in available(client)[1]
+        assert client.delete(url).status_code == 404
+
+    def test_expired_hold_frees_slot(self, client, hold, monkeypatch):
+        """Test that an expired hold stops counting without any write"""
+        assert "10:00 AM" not in available(client)[1]
+
+        later = timezone.now() + timedelta(hours=1)
+        monkeypatch.setattr('booking.cache.time.time', lambda: later.timestamp())
+        monkeypatch.setattr('booking.holds.timezone.now', lambda: later)
+
+        assert "10:00 AM" in available(client)[1]
+        assert SlotHold.objects.count() == 1
+
+        booking = {"name": "Other", "phone_number": "1", "date": DAY, "time_slot": "10:00 AM"}
+        assert post(client, 'book_appointment', booking).status_code == 200
+
+        # The next hold reclaims the expired one
+        assert post(client, 'create_hold', {"date": DAY, "time_slot": "11:00 AM"}).status_code == 201
+        assert SlotHold.objects.get().time_slot_label == "11:00 AM"
+
+    def test_provider_holds(self, client, django_capture_on_commit_callbacks):
+        """Test that holds are per provider"""
+        provider = Provider.objects.create(name="Dr. Smith")
+        with django_capture_on_commit_callbacks(execute=True):
+            response = post(client, 'create_hold', {"date": DAY, "time_slot": "10:00 AM", "provider": provider.id})
+        assert response.status_code == 201
+        assert response.json()['provider'] == provider.id
+
+        response = client.get(reverse('provider_available_slots'), {'date': DAY, 'providers': str(provider.id)})
+        assert "10:00 AM" not in response.json()['providers'][0]['available_slots']
+        assert "10:00 AM" in available(client)[1]
+
+    def test_bulk_booking_skips_held_slots(self, client, hold):
+        """Test that bulk booking reports held slots as conflicts"""
+        response = post(client, 'bulk_book_appointments', {
+            "mode": "best_effort",
+            "appointments": [
+                {"name": "A", "phone_number": "1", "date": DAY, "time_slot": "10:00 AM"},
+                {"name": "B", "phone_number": "2", "date": DAY, "time_slot": "10:30 AM"},
+            ]
+        })
+        results = response.json()['results']
+        assert results[0] == {'index': 0, 'status': 'conflict', 'error': holds.HELD_MESSAGE}
+        assert results[1]['status'] == 'created'
+
+    def test_reclaim_expired_in_batches(self, settings):
+        """Test that each new hold deletes a bounded batch of the oldest expired holds"""
+        settings.BOOKING_HOLD_RECLAIM_BATCH = 3
+        past = timezone.now() - timedelta(minutes=1)
+        SlotHold.objects.bulk_create([
+            SlotHold(date=date(2025, 3, 1) + timedelta(days=day), time_slot=600, expires_at=past - timedelta(seconds=day))
+            for day in range(5)
+        ])
+
+        holds.hold_slot({'date': date(2025, 3, 15), 'time_slot': 600, 'provider': None})
+
+        # The three oldest expired holds are gone, the newest two and the new hold remain
+        remaining = sorted(str(day) for day in SlotHold.objects.values_list('date', flat=True))
+        assert remaining == ["2025-03-01", "2025-03-02", "2025-03-15"]
+        assert holds.reclaim_expired() == 2
+
+    def test_async_view(self, client, hold):
+        """Test that the async booking view honours holds"""
+        def book(**fields):
+            request = AsyncRequestFactory().post(
+                '/',
+                data=json.dumps({"name": "A", "phone_number": "1", "date": DAY, "time_slot": "10:00 AM", **fields}),
+                content_type='application/json'
+            )
+            return async_to_sync(async_views.book_appointment)(request)
+
+        response = book()
+        assert response.status_code == 409
+        assert json.loads(response.content)['error'] == holds.HELD_MESSAGE
+
+        assert book(hold=hold['hold']).status_code == 200
+        assert not SlotHold.objects.exists()
@@ -0,0 +1,106 @@
+# booking/tests/test_idempotency.py
+import pytest
+import json
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory, RequestFactory
+from django.urls import reverse
+from booking import async_views, idempotency
+from booking.models import Appointment
+
+BOOKING = {
+    "name": "Test User",
+    "phone_number": "1234567890",
+    "date": "2025-03-15",
+    "time_slot": "10:00 AM"
+}
+
+def book(client, key=None, **fields):
+    headers = {'Idempotency-Key': key} if key is not None else {}
+    return client.post(
+        reverse('book_appointment'),
+        data=json.dumps({**BOOKING, **fields}),
+        content_type='application/json',
+        headers=headers
+    )
+
+@pytest.mark.django_db
+class TestIdempotency:
+
+    def test_retry_is_replayed(self, client, django_assert_num_queries):
+        """Test that a retry gets the first response back without touching the database"""
+        first = book(client, key="retry-1")
+        assert first.status_code == 200
+        assert 'Idempotent-Replayed' not in first
+
+        with django_assert_num_queries(0):
+            retry = book(client, key="retry-1")
+
+        assert retry.status_code == 200
+        assert retry['Idempotent-Replayed'] == 'true'
+        assert retry.content == first.content
+        assert Appointment.objects.count() == 1
+        assert idempotency.get_stats()['replayed'] == 1
+
+    def test_error_responses_are_replayed(self, client):
+        """Test that a 4xx outcome is stored like a success"""
+        Appointment.objects.create(name="Other", phone_number="1", date="2025-03-15", time_slot=600)
+
+        first = book(client, key="conflict-1")
+        assert first.status_code == 409
+
+        Appointment.objects.all().delete()
+        retry = book(client, key="conflict-1")
+        assert retry.status_code == 409
+        assert retry.content == first.content
+
+    def test_key_reused_for_other_body(self, client):
+        """Test that a key cannot be reused for a different booking"""
+        assert book(client, key="reuse-1").status_code == 200
+
+        response = book(client, key="reuse-1", time_slot="10:30 AM")
+
+        assert response.status_code == 422
+        assert Appointment.objects.count() == 1
+
+    def test_in_flight_request(self, client):
+        """Test that a retry of an unfinished request is asked to wait"""
+        request = RequestFactory().post(
+            reverse('book_appointment'),
+            data=json.dumps(BOOKING),
+            content_type='application/json',
+            headers={'Idempotency-Key': "in-flight-1"}
+        )
+        key, _, _ = idempotency._begin(request)
+        assert key is not None
+
+        response = book(client, key="in-flight-1")
+
+        assert response.status_code == 409
+        assert response['Retry-After'] == '1'
+        assert not Appointment.objects.exists()
+
+    def test_without_key_or_with_other_keys(self, client):
+        """Test that requests without a key, or with different keys, are processed normally"""
+        assert book(client).status_code == 200
+        assert book(client, key="a", time_slot="10:30 AM").status_code == 200
+        assert book(client, key="b", time_slot="10:30 AM").status_code == 409
+        assert book(client, key="x" * 256).status_code == 400
+        assert Appointment.objects.count() == 2
+
+    def test_async_view(self):
+        """Test that the async booking view replays retries too"""
+        def post():
+            return AsyncRequestFactory().post(
+                '/api/v1/book-appointment/',
+                data=json.dumps(BOOKING),
+                content_type='application/json',
+                headers={'Idempotency-Key': "async-1"}
+            )
+
+        first = async_to_sync(async_views.book_appointment)(post())
+        retry = async_to_sync(async_views.book_appointment)(post())
+
+        assert first.status_code == retry.status_code == 200
+        assert retry['Idempotent-Replayed'] == 'true'
+        assert json.loads(retry.content) == json.loads(first.content)
+        assert Appointment.objects.count() == 1
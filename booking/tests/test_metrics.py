@@ -0,0 +1,63 @@
+# booking/tests/test_metrics.py
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from appointment_system.metrics import registry
+
+@pytest.fixture
+def metrics_enabled(settings):
+    """Install the request metrics middleware and start from an empty registry"""
+    settings.MIDDLEWARE = ['appointment_system.middleware.RequestMetricsMiddleware'] + settings.MIDDLEWARE
+    registry.reset()
+    yield
+    registry.reset()
+
+@pytest.mark.django_db
+class TestRequestMetrics:
+    
+    def test_server_timing_header(self, client, metrics_enabled):
+        """Test that responses report wall time and database queries"""
+        response = client.get(reverse('available_slots') + '?date=2025-03-15')
+        
+        assert response.status_code == 200
+        assert response['Server-Timing'].startswith('app;dur=')
+        assert 'desc="1 queries"' in response['Server-Timing']
+    
+    def test_async_requests_are_timed(self, metrics_enabled):
+        """Test that queries run from the async handler are attributed to their request"""
+        response = async_to_sync(AsyncClient().get)(reverse('available_slots') + '?date=2025-03-15')
+        
+        assert response.status_code == 200
+        assert 'desc="1 queries"' in response['Server-Timing']
+    
+    def test_metrics_endpoint(self, client, admin_client, metrics_enabled):
+        """Test the Prometheus rendering and that it is restricted to staff"""
+        for _ in range(3):
+            client.get(reverse('available_slots') + '?date=2025-03-15')
+        
+        assert client.get(reverse('metrics')).status_code == 302
+        
+        response = admin_client.get(reverse('metrics'))
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+        body = response.content.decode()
+        labels = 'endpoint="available_slots",method="GET"'
+        assert f'http_request_duration_seconds{{{labels},quantile="0.99"}}' in body
+        assert f'http_request_duration_seconds_count{{{labels}}} 3' in body
+        assert f'http_request_db_queries_sum{{{labels}}} 1' in body
+        assert f'http_responses_total{{{labels},status="200"}} 3' in body
+        assert 'booking_availability_cache_requests_total{result="hit"} 2' in body
+    
+    def test_metrics_token(self, client, settings, metrics_enabled):
+        """Test that scrapers can authenticate with the configured bearer token"""
+        settings.METRICS_TOKEN = 'secret'
+        
+        assert client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong').status_code == 302
+        assert client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret').status_code == 200
+    
+    def test_disabled_by_default(self, client):
+        """Test that no timing is added unless the middleware is enabled"""
+        response = client.get(reverse('available_slots') + '?date=2025-03-15')
+        
+        assert 'Server-Timing' not in response
@@ -1,5 +1,7 @@
 # booking/tests/test_models.py
 import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
 from django.db.utils import IntegrityError
 from datetime import date
 from booking.models import Appointment
@@ -13,13 +15,13 @@ class TestAppointmentModel:
             name="Test User",
             phone_number="1234567890",
             date=date(2025, 3, 15),
-            time_slot="10:00 AM"
+            time_slot=600
         )
         assert appointment.id is not None
         assert appointment.name == "Test User"
         assert appointment.phone_number == "1234567890"
         assert appointment.date == date(2025, 3, 15)
-        assert appointment.time_slot == "10:00 AM"
+        assert appointment.time_slot == 600
     
     def test_prevent_double_booking(self):
         """Test that the same time slot cannot be booked twice on the same date"""
@@ -28,7 +30,7 @@ class TestAppointmentModel:
             name="Test User 1",
             phone_number="1234567890",
             date=date(2025, 3, 15),
-            time_slot="10:00 AM"
+            time_slot=600
         )
         
         # Try to create second appointment for same slot
@@ -37,7 +39,7 @@ class TestAppointmentModel:
                 name="Test User 2",
                 phone_number="0987654321",
                 date=date(2025, 3, 15),
-                time_slot="10:00 AM"
+                time_slot=600
             )
     
     def test_different_dates_same_slot(self):
@@ -47,7 +49,7 @@ class TestAppointmentModel:
             name="Test User 1",
             phone_number="1234567890",
             date=date(2025, 3, 15),
-            time_slot="10:00 AM"
+            time_slot=600
         )
         
         # Create appointment for second date
@@ -55,7 +57,81 @@ class TestAppointmentModel:
             name="Test User 2",
             phone_number="0987654321",
             date=date(2025, 3, 16),
-            time_slot="10:00 AM"
+            time_slot=600
         )
         
-        assert appointment2.id is not None
\ No newline at end of file
+        assert appointment2.id is not None
+    
+    def test_time_slot_label(self):
+        """Test that time slots are stored as minutes and rendered as labels"""
+        appointment = Appointment.objects.create(
+            name="Test User",
+            phone_number="1234567890",
+            date=date(2025, 3, 15),
+            time_slot=14 * 60
+        )
+        assert appointment.time_slot_label == "02:00 PM"
+        assert str(appointment) == "Test User - 2025-03-15 02:00 PM"
+    
+    def test_time_range_query(self):
+        """Test that integer time slots support range lookups"""
+        for minutes in (600, 690, 840):
+            Appointment.objects.create(
+                name="Test User",
+                phone_number="1234567890",
+                date=date(2025, 3, 15),
+                time_slot=minutes
+            )
+        
+        afternoon = Appointment.objects.filter(date=date(2025, 3, 15), time_slot__gte=12 * 60)
+        assert list(afternoon.values_list('time_slot', flat=True)) == [840]
+
+@pytest.mark.django_db(transaction=True)
+class TestTimeSlotMigration:
+    """Migration 0002 converts the time slot labels of 0001 to minutes of the day"""
+
+    @pytest.fixture
+    def legacy_appointment(self):
+        """Migrate back to 0001 and return a function creating appointments with a label"""
+        executor = MigrationExecutor(connection)
+        executor.migrate([('booking', '0001_initial')])
+        Appointment = executor.loader.project_state([('booking', '0001_initial')]).apps.get_model('booking', 'Appointment')
+        yield lambda label, day="2025-03-15": Appointment.objects.create(
+            name="Legacy", phone_number="1234567890", date=day, time_slot=label
+        ).id
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def migrate(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate([('booking', '0002_time_slot_minutes')])
+
+    def test_labels_converted(self, legacy_appointment):
+        """Test that labels, however written, become minutes of the day"""
+        ids = [legacy_appointment(" 2:00 PM"), legacy_appointment("10:30 am", day="2025-03-16")]
+        self.migrate()
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT id, time_slot FROM booking_appointment ORDER BY id')
+            assert cursor.fetchall() == [(ids[0], 840), (ids[1], 630)]
+
+    def test_conflicts_reported(self, legacy_appointment):
+        """Test that duplicate slots and unparseable labels abort with the offending rows listed"""
+        first = legacy_appointment("2:00 PM")
+        duplicate = legacy_appointment("02:00 PM")
+        invalid = legacy_appointment("noon")
+
+        with pytest.raises(ValueError) as error:
+            self.migrate()
+
+        message = str(error.value)
+        assert f"appointment {duplicate} on 2025-03-15: time slot '02:00 PM' is the same slot as '2:00 PM' of appointment {first}" in message
+        assert f"appointment {invalid} on 2025-03-15: time slot 'noon' is not a time" in message
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM booking_appointment')
+            assert cursor.fetchone() == (3,)
+        # Once fixed, migrating again succeeds
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM booking_appointment WHERE id IN (%s, %s)', [duplicate, invalid])
+        self.migrate()
@@ -0,0 +1,125 @@
+# booking/tests/test_next_available.py
+import pytest
+import json
+from datetime import date, timedelta
+from django.urls import reverse
+from booking import views
+from booking.archive import archive_cutoff
+from booking.models import Appointment, Provider
+from booking.schedule import DEFAULT_SCHEDULE
+
+def book_whole_days(first_day, days, provider=None):
+    Appointment.objects.bulk_create(
+        Appointment(
+            name="Test User",
+            phone_number="1234567890",
+            date=first_day + timedelta(days=day),
+            time_slot=minute,
+            provider=provider
+        )
+        for day in range(days)
+        for minute in DEFAULT_SCHEDULE.minutes
+    )
+
+@pytest.mark.django_db
+class TestNextAvailableAPI:
+    
+    def test_from_datetime(self, client):
+        """Test that the search starts at the given time and skips booked slots"""
+        Appointment.objects.create(
+            name="Test User",
+            phone_number="1234567890",
+            date=date(2025, 3, 15),
+            time_slot=720
+        )
+        
+        response = client.get(reverse('next_available_slots') + '?from=2025-03-15T11:15&count=3')
+        
+        assert response.status_code == 200
+        assert json.loads(response.content) == {
+            'slots': [
+                {'date': '2025-03-15', 'time_slot': "11:30 AM"},
+                {'date': '2025-03-15', 'time_slot': "12:30 PM"},
+                {'date': '2025-03-15', 'time_slot': "02:00 PM"},
+            ],
+            'searched_until': '2025-03-15'
+        }
+    
+    def test_scans_chunks_and_stops_early(self, client, django_assert_num_queries):
+        """Test that fully booked days are skipped with one query per chunk"""
+        book_whole_days(date(2025, 3, 1), 20)
+        
+        url = reverse('next_available_slots') + '?from=2025-03-01&count=2'
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        
+        assert json.loads(response.content) == {
+            'slots': [
+                {'date': '2025-03-21', 'time_slot': "10:00 AM"},
+                {'date': '2025-03-21', 'time_slot': "10:30 AM"},
+            ],
+            'searched_until': '2025-03-21'
+        }
+        
+        # The second search is answered from the availability cache
+        with django_assert_num_queries(0):
+            client.get(url)
+    
+    def test_horizon(self, client, monkeypatch):
+        """Test that the search gives up after the horizon"""
+        monkeypatch.setattr(views, 'NEXT_AVAILABLE_HORIZON_DAYS', 10)
+        monkeypatch.setattr(views, 'NEXT_AVAILABLE_CHUNK_DAYS', 4)
+        book_whole_days(date(2025, 3, 1), 10)
+        
+        response = client.get(reverse('next_available_slots') + '?from=2025-03-01')
+        
+        assert json.loads(response.content) == {'slots': [], 'searched_until': '2025-03-10'}
+    
+    def test_search_stops_at_last_date(self, client):
+        """Test that the search ends at the last representable date instead of overflowing"""
+        response = client.get(reverse('next_available_slots') + '?from=9999-12-30T17:00&count=2')
+        
+        assert response.status_code == 200
+        assert json.loads(response.content) == {
+            'slots': [{'date': '9999-12-31', 'time_slot': time_slot} for time_slot in ["10:00 AM", "10:30 AM"]],
+            'searched_until': '9999-12-31'
+        }
+    
+    def test_past_start(self, client, settings):
+        """Test that a search from a date that can no longer be booked starts at the first bookable date"""
+        settings.BOOKING_ARCHIVE_AFTER_DAYS = 90
+        
+        response = client.get(reverse('next_available_slots') + '?from=2001-01-01T11:15&count=1')
+        
+        slot = json.loads(response.content)['slots'][0]
+        assert slot == {'date': archive_cutoff().isoformat(), 'time_slot': "10:00 AM"}
+        response = client.post(reverse('book_appointment'), data=json.dumps({
+            "name": "Test User",
+            "phone_number": "1234567890",
+            **slot
+        }), content_type='application/json')
+        assert response.status_code == 200
+    
+    def test_provider(self, client):
+        """Test searching a provider's schedule"""
+        provider = Provider.objects.create(name="Room B", opens_at=480, closes_at=720, break_start=720, break_end=720, slot_interval=60)
+        
+        response = client.get(reverse('next_available_slots') + f'?from=2025-03-15T11:30&count=2&provider={provider.id}')
+        
+        assert [slot['time_slot'] for slot in json.loads(response.content)['slots']] == ["08:00 AM", "09:00 AM"]
+        assert json.loads(response.content)['searched_until'] == '2025-03-16'
+    
+    @pytest.mark.parametrize('query', [
+        '',
+        '?from=tomorrow',
+        '?from=2025-03-15&count=0',
+        f'?from=2025-03-15&count={views.MAX_NEXT_AVAILABLE + 1}',
+        '?from=2025-03-15&count=²',
+        '?from=2025-03-15&provider=9999',
+    ])
+    def test_validation(self, client, query):
+        """Test that bad parameters are rejected"""
+        response = client.get(reverse('next_available_slots') + query)
+        
+        assert response.status_code == 400
+        assert 'error' in json.loads(response.content)
@@ -0,0 +1,197 @@
+# booking/tests/test_providers.py
+import pytest
+import json
+from datetime import date
+from django.db.utils import IntegrityError
+from django.urls import reverse
+from booking.models import Appointment, Provider
+
+def book(client, **fields):
+    data = {
+        "name": "Test User",
+        "phone_number": "1234567890",
+        "date": "2025-03-15",
+        "time_slot": "10:00 AM",
+        **fields
+    }
+    return client.post(reverse('book_appointment'), data=json.dumps(data), content_type='application/json')
+
+@pytest.fixture
+def providers():
+    """A provider on the default hours and one working mornings in one hour slots"""
+    return [
+        Provider.objects.create(name="Dr. Smith"),
+        Provider.objects.create(name="Room B", opens_at=480, closes_at=720, break_start=720, break_end=720, slot_interval=60),
+    ]
+
+@pytest.mark.django_db
+class TestProviderModel:
+    
+    def test_slots_are_unique_per_provider(self, providers):
+        """Test that providers and the default schedule book the same slot independently"""
+        for provider in [None] + providers:
+            Appointment.objects.create(
+                name="Test User",
+                phone_number="1234567890",
+                date=date(2025, 3, 15),
+                time_slot=600,
+                provider=provider
+            )
+        
+        with pytest.raises(IntegrityError):
+            Appointment.objects.create(
+                name="Test User 2",
+                phone_number="0987654321",
+                date=date(2025, 3, 15),
+                time_slot=600,
+                provider=providers[0]
+            )
+    
+    def test_schedule(self, providers):
+        """Test that a provider's schedule follows its hours"""
+        assert providers[1].schedule.slots == ("08:00 AM", "09:00 AM", "10:00 AM", "11:00 AM")
+        assert len(providers[0].schedule) == 12
+
+@pytest.mark.django_db
+class TestProviderAvailableSlotsAPI:
+    
+    def test_available_slots(self, client, providers):
+        """Test that every provider's slots follow its own hours and bookings"""
+        Appointment.objects.create(
+            name="Test User",
+            phone_number="1234567890",
+            date=date(2025, 3, 15),
+            time_slot=540,
+            provider=providers[1]
+        )
+        # Bookings on the default schedule do not affect providers
+        Appointment.objects.create(
+            name="Test User",
+            phone_number="1234567890",
+            date=date(2025, 3, 15),
+            time_slot=600
+        )
+        
+        response = client.get(reverse('provider_available_slots') + '?date=2025-03-15')
+        
+        assert response.status_code == 200
+        assert json.loads(response.content) == {'providers': [
+            {'id': providers[0].id, 'name': "Dr. Smith", 'available_slots': providers[0].schedule.available(set())},
+            {'id': providers[1].id, 'name': "Room B", 'available_slots': ["08:00 AM", "10:00 AM", "11:00 AM"]},
+        ]}
+    
+    def test_range_for_many_providers_uses_two_queries(self, client, django_assert_num_queries):
+        """Test that hundreds of providers over a range are answered with one query for providers and one for bookings"""
+        providers = Provider.objects.bulk_create(Provider(name=f"Provider {i}") for i in range(300))
+        Appointment.objects.bulk_create(
+            Appointment(name="Test User", phone_number="1234567890", date=date(2025, 3, day), time_slot=600, provider=provider)
+            for provider in providers[::3]
+            for day in (1, 15, 31)
+        )
+        
+        url = reverse('provider_available_slots') + '?start=2025-03-01&end=2025-03-31'
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        
+        assert response.status_code == 200
+        results = json.loads(response.content)['providers']
+        assert len(results) == 300
+        assert "10:00 AM" not in results[0]['days']['2025-03-15']
+        assert "10:00 AM" in results[0]['days']['2025-03-16']
+        assert "10:00 AM" in results[1]['days']['2025-03-15']
+    
+    def test_provider_filter(self, client, providers):
+        """Test restricting the response to listed active providers"""
+        Provider.objects.create(name="Retired", is_active=False)
+        url = reverse('provider_available_slots') + f'?date=2025-03-15&providers={providers[1].id},9999'
+        
+        response = client.get(url)
+        
+        assert [result['id'] for result in json.loads(response.content)['providers']] == [providers[1].id]
+        
+        response = client.get(reverse('provider_available_slots') + '?date=2025-03-15')
+        assert len(json.loads(response.content)['providers']) == 2
+    
+    def test_invalid_provider_filter(self, client):
+        """Test that a malformed providers parameter is rejected"""
+        for providers in ("1,abc", "²", "1,-2"):
+            response = client.get(reverse('provider_available_slots'), {'date': "2025-03-15", 'providers': providers})
+            
+            assert response.status_code == 400
+            assert 'error' in json.loads(response.content)
+    
+    def test_etag_changes_with_provider_hours(self, client, providers):
+        """Test that editing a provider's hours changes the ETag"""
+        url = reverse('provider_available_slots') + '?date=2025-03-15'
+        etag = client.get(url)['ETag']
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        
+        providers[0].closes_at = 960
+        providers[0].save()
+        
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+@pytest.mark.django_db
+class TestProviderBooking:
+    
+    def test_book_provider_slot(self, client, providers):
+        """Test booking a provider and the default schedule at the same time"""
+        response = book(client, provider=providers[0].id)
+        assert response.status_code == 200
+        assert book(client).status_code == 200
+        
+        appointment = Appointment.objects.get(id=json.loads(response.content)['appointment_id'])
+        assert appointment.provider == providers[0]
+    
+    def test_conflict_suggests_provider_slots(self, client, providers):
+        """Test that a taken provider slot suggests the provider's next free slots"""
+        assert book(client, provider=providers[1].id, time_slot="09:00 AM").status_code == 200
+        
+        response = book(client, provider=providers[1].id, time_slot="09:00 AM")
+        
+        assert response.status_code == 409
+        assert json.loads(response.content)['next_available_slots'] == ["10:00 AM", "11:00 AM"]
+    
+    def test_provider_hours_are_enforced(self, client, providers):
+        """Test that slots outside the provider's hours are rejected"""
+        response = book(client, provider=providers[1].id, time_slot="02:00 PM")
+        
+        assert response.status_code == 400
+        assert json.loads(response.content)['error'] == "Appointments are only available between 8:00 AM and 12:00 PM"
+    
+    def test_unknown_provider(self, client):
+        """Test that missing and inactive providers cannot be booked"""
+        inactive = Provider.objects.create(name="Retired", is_active=False)
+        for provider in (9999, inactive.id, "abc", "²", 2 ** 64, str(2 ** 64)):
+            response = book(client, provider=provider)
+            assert response.status_code == 400
+            assert json.loads(response.content)['error'] == 'Unknown provider'
+        
+        response = client.get(reverse('next_available_slots'), {'from': "2025-03-15T09:00", 'provider': "²"})
+        assert response.status_code == 400
+        
+        response = client.post(
+            reverse('bulk_book_appointments'),
+            data=json.dumps({"mode": "best_effort", "appointments": [
+                {"name": "Test User", "phone_number": "1234567890", "date": "2025-03-15", "time_slot": "10:00 AM", "provider": "²"}
+            ]}),
+            content_type='application/json'
+        )
+        assert json.loads(response.content)['results'][0]['error'] == 'Unknown provider'
+    
+    def test_bulk_booking_with_providers(self, client, providers):
+        """Test that a batch may book the same slot for different providers"""
+        appointments = [
+            {"name": "Test User", "phone_number": "1234567890", "date": "2025-03-15", "time_slot": "10:00 AM", "provider": provider}
+            for provider in (providers[0].id, providers[1].id, None, providers[0].id)
+        ]
+        
+        response = client.post(
+            reverse('bulk_book_appointments'),
+            data=json.dumps({"mode": "best_effort", "appointments": appointments}),
+            content_type='application/json'
+        )
+        
+        statuses = [result['status'] for result in json.loads(response.content)['results']]
+        assert statuses == ['created', 'created', 'created', 'conflict']
+        assert Appointment.objects.filter(provider__isnull=False).count() == 2
@@ -0,0 +1,75 @@
+# booking/tests/test_renderers.py
+import pytest
+import json
+from datetime import date
+from django.urls import reverse
+from booking import renderers
+from booking.bitset import EMPTY, SlotSet
+from booking.schedule import CLOSED_SCHEDULE, DEFAULT_SCHEDULE
+
+class TestEncoding:
+
+    @pytest.mark.parametrize('fast', [True, False])
+    def test_dumps(self, monkeypatch, fast):
+        """Test that both encoders produce the same compact UTF-8 JSON"""
+        if not fast:
+            monkeypatch.setattr(renderers, 'orjson', None)
+        elif renderers.orjson is None:
+            pytest.skip('orjson is not installed')
+
+        data = {'name': "Zoë", 'date': date(2025, 3, 15), 'slots': ["10:00 AM"], 'ok': True, 'id': None}
+
+        assert renderers.dumps(data) == '{"name":"Zoë","date":"2025-03-15","slots":["10:00 AM"],"ok":true,"id":null}'.encode()
+
+    def test_pre_encoded_labels(self):
+        """Test that the pre-encoded slot arrays and objects decode to the plain values"""
+        booked = SlotSet([600, 840])
+
+        assert json.loads(DEFAULT_SCHEDULE.available_json(booked)) == DEFAULT_SCHEDULE.available(booked)
+        assert json.loads(DEFAULT_SCHEDULE.available_json(EMPTY)) == list(DEFAULT_SCHEDULE.slots)
+        assert CLOSED_SCHEDULE.available_json(EMPTY) == b'[]'
+        assert json.loads(renderers.json_object([('a', b'[]'), ('b', b'{}')])) == {'a': [], 'b': {}}
+        assert renderers.json_object([]) == b'{}'
+
+@pytest.mark.django_db
+class TestJSONOnlyViews:
+
+    def test_browsers_get_json(self, client):
+        """Test that the hot endpoints answer JSON whatever the Accept header asks for"""
+        url = reverse('available_slots') + '?date=2025-03-15'
+        response = client.get(url, HTTP_ACCEPT='text/html,application/xhtml+xml')
+
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/json'
+        assert len(json.loads(response.content)['available_slots']) == 12
+
+        response = client.post(reverse('book_appointment'), data={}, content_type='application/json', HTTP_ACCEPT='text/html')
+        assert response.status_code == 400
+        assert response['Content-Type'] == 'application/json'
+
+    def test_only_json_bodies(self, client):
+        """Test that form encoded bookings are rejected"""
+        response = client.post(reverse('book_appointment'), data={"name": "Test User"})
+
+        assert response.status_code == 415
+        assert 'Unsupported media type' in json.loads(response.content)['detail']
+
+    @pytest.mark.parametrize('body', [
+        '{"name": ',
+        '["Test User"]',
+        '{"name": "Test User", "phone_number": "1234567890", "date": "2025-03-15", "time_slot": ["10:00 AM"]}',
+    ])
+    def test_malformed_bodies(self, client, body):
+        """Test that bodies which are not a booking object are rejected without a server error"""
+        response = client.post(reverse('book_appointment'), data=body, content_type='application/json')
+
+        assert response.status_code == 400
+        assert response['Content-Type'] == 'application/json'
+
+    def test_range_body(self, client):
+        """Test the pre-encoded range response"""
+        response = client.get(reverse('available_slots') + '?start=2025-03-15&end=2025-03-17')
+
+        days = json.loads(response.content)['days']
+        assert list(days) == ['2025-03-15', '2025-03-16', '2025-03-17']
+        assert all(slots == list(DEFAULT_SCHEDULE.slots) for slots in days.values())
@@ -0,0 +1,67 @@
+# booking/tests/test_schedule.py
+import pytest
+from booking.bitset import EMPTY, SlotSet
+from booking.schedule import DEFAULT_SCHEDULE, InvalidTimeSlot, compile_schedule, minutes_to_label, label_to_minutes
+from booking.views import is_valid_time_slot
+
+class TestSchedule:
+    
+    def test_default_slot_table(self):
+        """Test the compiled default grid matches the business hours"""
+        assert len(DEFAULT_SCHEDULE) == 12
+        assert DEFAULT_SCHEDULE.slots[0] == "10:00 AM"
+        assert DEFAULT_SCHEDULE.slots[-1] == "04:30 PM"
+        assert "01:00 PM" not in DEFAULT_SCHEDULE
+        assert DEFAULT_SCHEDULE.index["02:00 PM"] == 6
+        assert DEFAULT_SCHEDULE.minutes[6] == 14 * 60
+    
+    def test_schedule_is_immutable(self):
+        """Test that a compiled schedule cannot be modified"""
+        with pytest.raises(AttributeError):
+            DEFAULT_SCHEDULE.interval = 15
+        with pytest.raises(TypeError):
+            DEFAULT_SCHEDULE.index["05:00 PM"] = 12
+    
+    def test_label_conversion(self):
+        """Test converting between labels and minutes of the day"""
+        assert minutes_to_label(600) == "10:00 AM"
+        assert minutes_to_label(750) == "12:30 PM"
+        assert minutes_to_label(0) == "12:00 AM"
+        assert label_to_minutes("2:30 PM") == 870
+    
+    def test_normalize(self):
+        """Test that non-canonical labels are normalized and invalid ones rejected"""
+        assert DEFAULT_SCHEDULE.normalize("10:00 AM") == "10:00 AM"
+        assert DEFAULT_SCHEDULE.normalize("2:00 PM") == "02:00 PM"
+        
+        with pytest.raises(InvalidTimeSlot, match="between 10:00 AM and 5:00 PM"):
+            DEFAULT_SCHEDULE.normalize("9:00 AM")
+        with pytest.raises(InvalidTimeSlot, match="lunch hour"):
+            DEFAULT_SCHEDULE.normalize("1:30 PM")
+        with pytest.raises(InvalidTimeSlot, match="30-minute intervals"):
+            DEFAULT_SCHEDULE.normalize("10:15 AM")
+        with pytest.raises(InvalidTimeSlot, match="Invalid time format"):
+            DEFAULT_SCHEDULE.normalize("noon")
+    
+    def test_parse_and_next_available(self):
+        """Test converting labels to minutes and finding free slots by minute"""
+        assert DEFAULT_SCHEDULE.parse("2:00 PM") == 840
+        assert DEFAULT_SCHEDULE.available(SlotSet([600, 630]))[0] == "11:00 AM"
+        assert DEFAULT_SCHEDULE.available(DEFAULT_SCHEDULE.mask) == []
+        assert DEFAULT_SCHEDULE.next_available(SlotSet([720, 750]), after=690, count=2) == ["02:00 PM", "02:30 PM"]
+        assert DEFAULT_SCHEDULE.first_available(SlotSet([600])) == 630
+        assert DEFAULT_SCHEDULE.first_available(DEFAULT_SCHEDULE.mask) is None
+        assert DEFAULT_SCHEDULE.available(EMPTY) == list(DEFAULT_SCHEDULE.slots)
+    
+    def test_compiled_schedules_are_shared(self):
+        """Test that schedules with the same rules are compiled once"""
+        schedule = compile_schedule(start=480, end=720, break_start=720, break_end=720, interval=60)
+        assert schedule.slots == ("08:00 AM", "09:00 AM", "10:00 AM", "11:00 AM")
+        assert compile_schedule(start=480, end=720, break_start=720, break_end=720, interval=60) is schedule
+    
+    def test_is_valid_time_slot(self):
+        """Test the view level validator keeps its (is_valid, message) contract"""
+        assert is_valid_time_slot("04:30 PM") == (True, "")
+        is_valid, message = is_valid_time_slot("05:00 PM")
+        assert is_valid is False
+        assert "between" in message
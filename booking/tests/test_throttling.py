@@ -0,0 +1,123 @@
+# booking/tests/test_throttling.py
+import pytest
+import json
+import threading
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory, Client
+from django.urls import reverse
+from appointment_system.metrics import registry
+from appointment_system.middleware import admission
+from booking import async_views, throttling, views
+from booking.throttling import TokenBucket, parse_rate
+
+def availability(client, **extra):
+    return client.get(reverse('available_slots') + '?date=2025-03-15', **extra)
+
+class TestTokenBucket:
+
+    def test_parse_rate(self):
+        """Test the accepted rate formats"""
+        assert parse_rate('10/s') == (10, 10)
+        assert parse_rate('30/min') == (30, 0.5)
+        assert parse_rate('') is None
+
+    def test_burst_then_refill(self, monkeypatch):
+        """Test that a bucket admits a burst of its capacity and then refills at its rate"""
+        now = [1000.0]
+        monkeypatch.setattr(throttling.time, 'time', lambda: now[0])
+        bucket = TokenBucket(capacity=3, refill_rate=1)
+
+        assert [bucket.take('test') for _ in range(3)] == [0, 0, 0]
+        assert bucket.take('test') == pytest.approx(1)
+
+        now[0] += 0.5
+        assert bucket.take('test') == pytest.approx(0.5)
+
+        now[0] += 0.5
+        assert bucket.take('test') == 0
+        assert bucket.take('other') == 0
+
+@pytest.mark.django_db
+class TestThrottles:
+
+    def test_endpoint_rate(self, client, settings):
+        """Test that an endpoint's rate applies per client and returns 429 with Retry-After"""
+        settings.BOOKING_THROTTLE_RATES = {'available_slots': '2/min'}
+
+        assert availability(client).status_code == 200
+        assert availability(client).status_code == 200
+        response = availability(client)
+
+        assert response.status_code == 429
+        assert response['Retry-After'] == '30'
+        assert availability(client, REMOTE_ADDR='10.0.0.2').status_code == 200
+        assert client.post(reverse('book_appointment'), data={}, content_type='application/json').status_code == 400
+
+    def test_ip_rate(self, client, settings):
+        """Test that the IP rate covers every endpoint"""
+        settings.BOOKING_THROTTLE_RATES = {'ip': '2/min'}
+
+        assert availability(client).status_code == 200
+        assert client.get(reverse('next_available_slots') + '?from=2025-03-15').status_code == 200
+        assert client.post(reverse('book_appointment'), data={}, content_type='application/json').status_code == 429
+        assert throttling.get_stats() == {('ip', 'allowed'): 2, ('ip', 'throttled'): 1}
+
+    def test_async_views(self, settings):
+        """Test that the native async views are throttled like the DRF views"""
+        settings.BOOKING_THROTTLE_RATES = {'available_slots': '1/min'}
+
+        def call():
+            request = AsyncRequestFactory().get(reverse('available_slots'), {'date': '2025-03-15'})
+            request.resolver_match = type('Match', (), {'url_name': 'available_slots'})()
+            return async_to_sync(async_views.get_available_slots)(request)
+
+        assert call().status_code == 200
+        response = call()
+        assert response.status_code == 429
+        assert response['Retry-After'] == '60'
+        assert 'detail' in json.loads(response.content)
+
+    def test_throttled_booking_is_not_replayed(self, client, settings):
+        """Test that a retry with the same Idempotency-Key is not answered with a stored 429"""
+        settings.BOOKING_THROTTLE_RATES = {'book_appointment': '1/min'}
+        data = json.dumps({"name": "Test User", "phone_number": "1234567890", "date": "2025-03-15", "time_slot": "10:00 AM"})
+
+        def book(key):
+            return client.post(reverse('book_appointment'), data=data, content_type='application/json', headers={'Idempotency-Key': key})
+
+        assert book("first").status_code == 200
+        assert book("second").status_code == 429
+        settings.BOOKING_THROTTLE_RATES = {}
+        assert book("second").status_code == 409
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrencyLimit:
+
+    def test_sheds_over_the_limit(self, settings, monkeypatch):
+        """Test that requests over the concurrency limit get 503 with Retry-After"""
+        settings.MAX_CONCURRENT_REQUESTS = 1
+        entered, release = threading.Event(), threading.Event()
+
+        def slow_available(day):
+            entered.set()
+            release.wait(5)
+            return views.EMPTY
+        monkeypatch.setattr(views, 'get_booked_slots', slow_available)
+
+        responses = []
+        worker = threading.Thread(target=lambda: responses.append(availability(Client())))
+        worker.start()
+        try:
+            assert entered.wait(5)
+            response = availability(Client())
+            assert response.status_code == 503
+            assert response['Retry-After'] == '1'
+            assert Client().get('/').status_code == 200
+        finally:
+            release.set()
+            worker.join()
+
+        assert responses[0].status_code == 200
+        assert availability(Client()).status_code == 200
+        assert admission.in_flight == 0
+        assert 'http_requests_shed_total 1' in registry.render()
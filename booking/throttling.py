@@ -0,0 +1,211 @@
+"""
+Token-bucket rate limits for the booking API.
+
+Every client IP has one bucket for the whole API (IPRateThrottle) and one
+per endpoint (EndpointRateThrottle). A bucket holds up to N tokens for a
+rate of "N/period", refills continuously at that rate and each request
+takes one token, so clients may burst up to N requests and are then held
+to the average rate. Rates come from settings.BOOKING_THROTTLE_RATES,
+keyed by 'ip' and by URL name; an empty rate disables that limit.
+
+Buckets live in the Django cache named by settings.BOOKING_CACHE_ALIAS, so
+all workers sharing that cache share the limits. A bucket is read and
+written without a lock; concurrent requests of one client can therefore
+be admitted slightly over the rate, which keeps the check to two cache
+round trips.
+
+The DRF views use these classes through REST_FRAMEWORK's
+DEFAULT_THROTTLE_CLASSES; the native async views use @throttled.
+"""
+import functools
+import threading
+import time
+
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+from rest_framework.exceptions import Throttled
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+KEY_PREFIX = 'booking:throttle'
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+def _cache():
+    return caches[settings.BOOKING_CACHE_ALIAS]
+
+
+def _count(scope, result):
+    with _stats_lock:
+        _stats[(scope, result)] = _stats.get((scope, result), 0) + 1
+
+
+def get_stats():
+    """Return a snapshot of the {(scope, 'allowed' | 'throttled'): count} counters of this process."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def collect_metrics():
+    """Throttle counters for appointment_system.metrics.register_collector()."""
+    return [
+        ('booking_throttle_requests_total', 'Rate limited requests by throttle scope and result.', 'counter', [
+            ({'scope': scope, 'result': result}, count) for (scope, result), count in sorted(get_stats().items())
+        ]),
+    ]
+
+
+def parse_rate(rate):
+    """
+    Parse "<requests>/<period>" (period s, m, h or d, optionally spelled
+    out, e.g. "10/s" or "30/min") into (capacity, tokens per second).
+
+    Returns None for an empty rate.
+    """
+    if not rate:
+        return None
+    requests, period = rate.split('/')
+    capacity = int(requests)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+class TokenBucket:
+    """A token bucket stored in the cache as (tokens, time of the last update)."""
+
+    __slots__ = ('capacity', 'refill_rate', 'timeout')
+
+    def __init__(self, capacity, refill_rate):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        # An expired bucket is a full bucket, so keep keys only until they refill
+        self.timeout = int(capacity / refill_rate) + 1
+
+    def _take(self, state, now):
+        tokens = self.capacity
+        if state is not None:
+            tokens = min(self.capacity, state[0] + (now - state[1]) * self.refill_rate)
+        if tokens >= 1:
+            return (tokens - 1, now), 0.0
+        return (tokens, now), (1 - tokens) / self.refill_rate
+
+    def take(self, key):
+        """Take a token; return 0 when it was available, or the seconds until one is."""
+        now = time.time()
+        state, wait = self._take(_cache().get(key), now)
+        _cache().set(key, state, self.timeout)
+        return wait
+
+    async def atake(self, key):
+        """Async version of take()."""
+        now = time.time()
+        state, wait = self._take(await _cache().aget(key), now)
+        await _cache().aset(key, state, self.timeout)
+        return wait
+
+
+@functools.lru_cache(maxsize=64)
+def _bucket(rate):
+    parsed = parse_rate(rate)
+    return TokenBucket(*parsed) if parsed else None
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Base class; subclasses name the rate and bucket of a request."""
+
+    scope = None
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_rate(self, request):
+        raise NotImplementedError
+
+    def get_cache_key(self, request):
+        raise NotImplementedError
+
+    def _bucket(self, request):
+        bucket = _bucket(self.get_rate(request))
+        if bucket is None:
+            return None, None
+        return bucket, f'{KEY_PREFIX}:{self.get_cache_key(request)}'
+
+    def _result(self, wait):
+        self.wait_seconds = wait
+        _count(self.scope, 'throttled' if wait else 'allowed')
+        return not wait
+
+    def allow_request(self, request, view=None):
+        bucket, key = self._bucket(request)
+        if bucket is None:
+            return True
+        return self._result(bucket.take(key))
+
+    async def aallow_request(self, request):
+        """Async version of allow_request()."""
+        bucket, key = self._bucket(request)
+        if bucket is None:
+            return True
+        return self._result(await bucket.atake(key))
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPRateThrottle(TokenBucketThrottle):
+    """Limits each client IP across the whole API (rate 'ip')."""
+
+    scope = 'ip'
+
+    def get_rate(self, request):
+        return settings.BOOKING_THROTTLE_RATES.get('ip')
+
+    def get_cache_key(self, request):
+        return f'ip:{self.get_ident(request)}'
+
+
+class EndpointRateThrottle(TokenBucketThrottle):
+    """Limits each client IP per endpoint, with the rate keyed by the endpoint's URL name."""
+
+    scope = 'endpoint'
+
+    def get_rate(self, request):
+        match = request.resolver_match
+        return settings.BOOKING_THROTTLE_RATES.get(match.url_name) if match else None
+
+    def get_cache_key(self, request):
+        return f'endpoint:{request.resolver_match.url_name}:{self.get_ident(request)}'
+
+
+def throttled(view):
+    """
+    Apply REST_FRAMEWORK's DEFAULT_THROTTLE_CLASSES to a native async view.
+
+    Rejected requests get the same 429 response with Retry-After as the
+    DRF views.
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        waits = []
+        for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+            throttle = throttle_class()
+            if not await throttle.aallow_request(request):
+                waits.append(throttle.wait())
+        if waits:
+            exc = Throttled(max(waits))
+            response = JsonResponse({'detail': exc.detail}, status=exc.status_code)
+            response['Retry-After'] = str(exc.wait)
+            return response
+        return await view(request, *args, **kwargs)
+
+    return markcoroutinefunction(wrapper)
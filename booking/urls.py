@@ -1,7 +1,14 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     path('available-slots/', views.get_available_slots, name='available_slots'),
+    path('providers/available-slots/', views.get_provider_available_slots, name='provider_available_slots'),
+    path('next-available/', views.get_next_available_slots, name='next_available_slots'),
     path('book-appointment/', views.book_appointment, name='book_appointment'),
+    path('book-appointments/bulk/', views.bulk_book_appointments, name='bulk_book_appointments'),
+    path('holds/', views.create_hold, name='create_hold'),
+    path('holds/<uuid:token>/', views.release_slot_hold, name='release_hold'),
+    path('appointments/export/', views.export_appointments, name='export_appointments'),
+    path('slot-events/', async_views.slot_events, name='slot_events'),
 ]
\ No newline at end of file
@@ -1,11 +1,58 @@
-from datetime import datetime, timedelta
+import hashlib
+import uuid
+from datetime import date, datetime, timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import CharField, Value
+from django.http import HttpResponseNotModified, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
 from django.views.decorators.csrf import csrf_exempt
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from rest_framework import status
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
-from .models import Appointment
+from . import events
+from .bitset import EMPTY, SlotSet
+from .archive import archive_cutoff
+from .calendars import get_calendar
+from .export import FORMATS as EXPORT_FORMATS, export_chunks, export_filename, export_rows
+from .cache import (
+    get_booked_slots, get_booked_slots_for_dates, get_provider_bookings_for_dates, get_versions,
+    invalidate_on_commit,
+)
+from .holds import BOOKED_MESSAGE, HELD_MESSAGE, SlotUnavailable, claim_slot, hold_slot, release_hold
+from .idempotency import idempotent
+from .models import Appointment, Provider, SlotHold
+from .renderers import RawJSONResponse, json_object, json_only
+from .schedule import DEFAULT_SCHEDULE, InvalidTimeSlot
+from .signals import publish_on_commit
+
+# Upper bound on the number of days a single range query may cover
+MAX_RANGE_DAYS = 62
+
+# Upper bound on the number of appointments in one bulk booking request
+MAX_BULK_APPOINTMENTS = 500
+
+BULK_MODES = ('atomic', 'best_effort')
+
+PAST_DATE_MESSAGE = 'Appointments can no longer be booked on this date'
+
+# Upper bound on the number of providers listed in one availability request
+MAX_PROVIDERS = 500
+
+# Largest id a database column can hold; larger ids cannot exist
+MAX_ID = 2 ** 63 - 1
+
+# Days loaded per query, days searched at most and slots returned at most
+# by the next-available search
+NEXT_AVAILABLE_CHUNK_DAYS = 14
+NEXT_AVAILABLE_HORIZON_DAYS = 90
+MAX_NEXT_AVAILABLE = 50
+
 
 @swagger_auto_schema(
     methods=['get'],
@@ -13,25 +60,51 @@ from .models import Appointment
         openapi.Parameter(
             'date',
             openapi.IN_QUERY,
-            description="Date in YYYY-MM-DD format",
+            description="Date in YYYY-MM-DD format (single-day mode)",
             type=openapi.TYPE_STRING,
-            required=True,
+            required=False,
             example="2024-03-09"
+        ),
+        openapi.Parameter(
+            'start',
+            openapi.IN_QUERY,
+            description="First date of the range in YYYY-MM-DD format (range mode)",
+            type=openapi.TYPE_STRING,
+            required=False,
+            example="2024-03-01"
+        ),
+        openapi.Parameter(
+            'end',
+            openapi.IN_QUERY,
+            description=f"Last date of the range in YYYY-MM-DD format, at most {MAX_RANGE_DAYS} days after start (range mode)",
+            type=openapi.TYPE_STRING,
+            required=False,
+            example="2024-03-31"
         )
     ],
     responses={
         200: openapi.Response(
-            description="List of available time slots",
+            description="List of available time slots, or a per-day map of them in range mode",
             schema=openapi.Schema(
                 type=openapi.TYPE_OBJECT,
                 properties={
                     'available_slots': openapi.Schema(
                         type=openapi.TYPE_ARRAY,
                         items=openapi.Schema(type=openapi.TYPE_STRING)
+                    ),
+                    'days': openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        additional_properties=openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(type=openapi.TYPE_STRING)
+                        )
                     )
                 }
             )
         ),
+        304: openapi.Response(
+            description="Availability unchanged since the ETag sent in If-None-Match"
+        ),
         400: openapi.Response(
             description="Bad request",
             schema=openapi.Schema(
@@ -43,65 +116,457 @@ from .models import Appointment
         )
     }
 )
+@json_only
 @api_view(['GET'])
 def get_available_slots(request):
     """
-    Retrieve available appointment slots for a specific date.
+    Retrieve available appointment slots for a specific date or a date range.
 
     Parameters:
-    - request: HTTP GET request with 'date' parameter (YYYY-MM-DD format)
+    - request: HTTP GET request with either a 'date' parameter (YYYY-MM-DD format)
+      or 'start' and 'end' parameters (YYYY-MM-DD format, inclusive)
 
     Returns:
     - JsonResponse with available time slots
-    - Time slots are between 10:00 AM and 5:00 PM, excluding lunch hour (1:00-2:00 PM)
-    - Each slot is 30 minutes long
+    - Time slots follow the business-hours calendar of each date: by default
+      between 10:00 AM and 5:00 PM, excluding lunch hour (1:00-2:00 PM), with
+      30 minute slots, unless weekly hours, a date override or a holiday apply
+    - Booked slots are cached per date; in range mode all dates missing from
+      the cache are loaded with a single query
+    - Responses carry a strong ETag derived from per-date versions that change
+      on every booking and on the calendar rules version; a matching
+      If-None-Match is answered with 304 before any slots are computed
 
     Example Response:
     {
         "available_slots": ["10:00 AM", "10:30 AM", "11:00 AM", ...]
     }
 
+    Example Range Response:
+    {
+        "days": {
+            "2024-03-01": ["10:00 AM", "10:30 AM", ...],
+            "2024-03-02": [...]
+        }
+    }
+
     Error Response:
     {
         "error": "error message"
     }
     """
-    date_str = request.query_params.get('date')
+    range_mode = 'start' in request.query_params or 'end' in request.query_params
+    if range_mode:
+        dates, error_message = parse_date_range(request.query_params.get('start'), request.query_params.get('end'))
+    else:
+        dates, error_message = parse_date(request.query_params.get('date'))
+    if error_message:
+        return Response({'error': error_message}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Answer revalidations from the per-date and calendar versions alone
+    calendar = get_calendar()
+    etag = availability_etag(get_versions(dates), calendar.version)
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+
+    if range_mode:
+        # Dates missing from the cache are loaded together with a single query
+        booked_by_date = get_booked_slots_for_dates(dates)
+        content = availability_range_content(calendar, dates, booked_by_date)
+    else:
+        # Booked slots of the selected date are served from the availability cache
+        content = availability_content(calendar, dates[0], get_booked_slots(dates[0]))
+
+    return set_availability_caching(RawJSONResponse(content), etag)
+
+def availability_content(calendar, day, booked):
+    """The encoded {"available_slots": [...]} body of a single-date availability response."""
+    return json_object([('available_slots', calendar.schedule_for(day).available_json(booked))])
+
+def availability_range_content(calendar, dates, booked_by_date):
+    """The encoded {"days": {...}} body of a range availability response."""
+    return json_object([('days', json_object(
+        (day.isoformat(), calendar.schedule_for(day).available_json(booked_by_date[day]))
+        for day in dates
+    ))])
+
+def parse_date(date_str):
+    """Validate the 'date' parameter, returning a ([date], error_message) tuple."""
     if not date_str:
-        return Response({'error': 'Date parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
-    
+        return None, 'Date parameter is required'
     try:
-        # Parse the date
-        selected_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-        
-        # Generate all possible slots (10:00 AM to 5:00 PM, excluding 1:00-2:00 PM)
-        all_slots = []
-        current_time = datetime.strptime("10:00 AM", "%I:%M %p")
-        end_time = datetime.strptime("5:00 PM", "%I:%M %p")
-        
-        while current_time < end_time:
-            # Skip lunch break (1:00 PM to 2:00 PM)
-            time_str = current_time.strftime('%I:%M %p')
-            if not (time_str == "01:00 PM" or time_str == "01:30 PM"):
-                all_slots.append(time_str)
-            
-            # Add 30 minutes
-            current_time = current_time + timedelta(minutes=30)
-        
-        # Get booked slots for the selected date
-        booked_appointments = Appointment.objects.filter(date=selected_date)
-        booked_slots = [appointment.time_slot for appointment in booked_appointments]
-        
-        # Filter out booked slots
-        available_slots = [slot for slot in all_slots if slot not in booked_slots]
-        
-        return Response({'available_slots': available_slots})
-    
-    except Exception as e:
-        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return [datetime.strptime(date_str, '%Y-%m-%d').date()], ''
+    except ValueError as e:
+        return None, str(e)
+
+def parse_date_range(start_str, end_str):
+    """
+    Validate the 'start'/'end' parameters of a range query.
+
+    Returns a (dates, error_message) tuple where dates lists every day of
+    the inclusive range.
+    """
+    if not start_str or not end_str:
+        return None, 'Both start and end parameters are required'
+
+    try:
+        start_date = datetime.strptime(start_str, '%Y-%m-%d').date()
+        end_date = datetime.strptime(end_str, '%Y-%m-%d').date()
+    except ValueError as e:
+        return None, str(e)
+
+    if end_date < start_date:
+        return None, 'End date must not be before start date'
+    if (end_date - start_date).days >= MAX_RANGE_DAYS:
+        return None, f'Date range cannot exceed {MAX_RANGE_DAYS} days'
+
+    return [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)], ''
+
+@swagger_auto_schema(
+    methods=['get'],
+    manual_parameters=[
+        openapi.Parameter(
+            'date',
+            openapi.IN_QUERY,
+            description="Date in YYYY-MM-DD format (single-day mode)",
+            type=openapi.TYPE_STRING,
+            required=False,
+            example="2024-03-09"
+        ),
+        openapi.Parameter(
+            'start',
+            openapi.IN_QUERY,
+            description="First date of the range in YYYY-MM-DD format (range mode)",
+            type=openapi.TYPE_STRING,
+            required=False,
+            example="2024-03-01"
+        ),
+        openapi.Parameter(
+            'end',
+            openapi.IN_QUERY,
+            description=f"Last date of the range in YYYY-MM-DD format, at most {MAX_RANGE_DAYS} days after start (range mode)",
+            type=openapi.TYPE_STRING,
+            required=False,
+            example="2024-03-31"
+        ),
+        openapi.Parameter(
+            'providers',
+            openapi.IN_QUERY,
+            description=f"Comma separated ids of up to {MAX_PROVIDERS} providers (default: all active providers)",
+            type=openapi.TYPE_STRING,
+            required=False,
+            example="1,2,3"
+        )
+    ],
+    responses={
+        200: openapi.Response(
+            description="Available time slots of each provider, as a list or a per-day map of them in range mode",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'providers': openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                'id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                'name': openapi.Schema(type=openapi.TYPE_STRING),
+                                'available_slots': openapi.Schema(
+                                    type=openapi.TYPE_ARRAY,
+                                    items=openapi.Schema(type=openapi.TYPE_STRING)
+                                ),
+                                'days': openapi.Schema(
+                                    type=openapi.TYPE_OBJECT,
+                                    additional_properties=openapi.Schema(
+                                        type=openapi.TYPE_ARRAY,
+                                        items=openapi.Schema(type=openapi.TYPE_STRING)
+                                    )
+                                )
+                            }
+                        )
+                    )
+                }
+            )
+        ),
+        304: openapi.Response(
+            description="Availability unchanged since the ETag sent in If-None-Match"
+        ),
+        400: openapi.Response(
+            description="Bad request",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'error': openapi.Schema(type=openapi.TYPE_STRING)
+                }
+            )
+        )
+    }
+)
+@api_view(['GET'])
+def get_provider_available_slots(request):
+    """
+    Retrieve the available slots of many providers for a date or a date range.
+
+    Parameters:
+    - request: HTTP GET request with either a 'date' parameter or 'start' and
+      'end' parameters (YYYY-MM-DD format), and optionally 'providers', a
+      comma separated list of provider ids
+
+    Returns:
+    - JsonResponse with the available slots of every requested active provider,
+      each on its own working hours and calendar rules
+    - The bookings of all providers are loaded with one query per request
+      (or served from the per-date cache) and held as one SlotSet bitset of
+      booked minutes per provider and date, so adding providers adds no queries
+    - Responses carry an ETag like available-slots, which also changes when
+      a provider's hours are edited
+
+    Example Response:
+    {
+        "providers": [
+            {"id": 1, "name": "Dr. Smith", "available_slots": ["10:00 AM", ...]},
+            {"id": 2, "name": "Room B", "available_slots": [...]}
+        ]
+    }
+
+    Example Range Response:
+    {
+        "providers": [
+            {"id": 1, "name": "Dr. Smith", "days": {"2024-03-01": ["10:00 AM", ...], ...}}
+        ]
+    }
+    """
+    range_mode = 'start' in request.query_params or 'end' in request.query_params
+    if range_mode:
+        dates, error_message = parse_date_range(request.query_params.get('start'), request.query_params.get('end'))
+    else:
+        dates, error_message = parse_date(request.query_params.get('date'))
+    if not error_message:
+        provider_ids, error_message = parse_provider_ids(request.query_params.get('providers'))
+    if error_message:
+        return Response({'error': error_message}, status=status.HTTP_400_BAD_REQUEST)
+
+    providers = Provider.objects.filter(is_active=True)
+    if provider_ids is not None:
+        providers = providers.filter(id__in=provider_ids)
+    providers = list(providers)
+
+    calendar = get_calendar()
+    etag = availability_etag(
+        get_versions(dates),
+        calendar.version,
+        *(f'{provider.id}:{provider.updated_at.isoformat()}' for provider in providers)
+    )
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+
+    bookings_by_date = get_provider_bookings_for_dates(dates)
+    results = []
+    for provider in providers:
+        result = {'id': provider.id, 'name': provider.name}
+        if range_mode:
+            result['days'] = {
+                day.isoformat(): calendar.schedule_for(day, provider).available(bookings_by_date[day].get(provider.id, EMPTY))
+                for day in dates
+            }
+        else:
+            day = dates[0]
+            result['available_slots'] = calendar.schedule_for(day, provider).available(bookings_by_date[day].get(provider.id, EMPTY))
+        results.append(result)
+
+    return set_availability_caching(Response({'providers': results}), etag)
+
+@swagger_auto_schema(
+    methods=['get'],
+    manual_parameters=[
+        openapi.Parameter(
+            'from',
+            openapi.IN_QUERY,
+            description="Search from this date (YYYY-MM-DD) or date and time (YYYY-MM-DDTHH:MM)",
+            type=openapi.TYPE_STRING,
+            required=True,
+            example="2024-03-09T11:15"
+        ),
+        openapi.Parameter(
+            'count',
+            openapi.IN_QUERY,
+            description=f"Number of slots to return, at most {MAX_NEXT_AVAILABLE} (default 3)",
+            type=openapi.TYPE_INTEGER,
+            required=False,
+            example=3
+        ),
+        openapi.Parameter(
+            'provider',
+            openapi.IN_QUERY,
+            description="Provider id; omit to search the default schedule",
+            type=openapi.TYPE_INTEGER,
+            required=False,
+            example=1
+        )
+    ],
+    responses={
+        200: openapi.Response(
+            description=f"The first free slots within {NEXT_AVAILABLE_HORIZON_DAYS} days, possibly fewer than count",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'slots': openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                'date': openapi.Schema(type=openapi.TYPE_STRING, format='date'),
+                                'time_slot': openapi.Schema(type=openapi.TYPE_STRING),
+                            }
+                        )
+                    ),
+                    'searched_until': openapi.Schema(type=openapi.TYPE_STRING, format='date')
+                }
+            )
+        ),
+        400: openapi.Response(
+            description="Bad request",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'error': openapi.Schema(type=openapi.TYPE_STRING)
+                }
+            )
+        )
+    }
+)
+@api_view(['GET'])
+def get_next_available_slots(request):
+    """
+    Find the first free slots at or after a date and time.
+
+    Parameters:
+    - request: HTTP GET request with a 'from' parameter (YYYY-MM-DD or
+      YYYY-MM-DDTHH:MM), optionally 'count' and 'provider'
+
+    Returns:
+    - JsonResponse with up to 'count' free slots in chronological order and
+      the last date searched
+    - Days are searched in chunks of 14, each loaded with one query (dates
+      already in the availability cache need none); the search stops as soon
+      as enough slots are found, or after 90 days
+    - Dates that can no longer be booked are skipped
+
+    Example Response:
+    {
+        "slots": [
+            {"date": "2024-03-09", "time_slot": "11:30 AM"},
+            {"date": "2024-03-11", "time_slot": "10:00 AM"}
+        ],
+        "searched_until": "2024-03-11"
+    }
+    """
+    start, error_message = parse_search_start(request.query_params.get('from'))
+    if not error_message:
+        count, error_message = parse_count(request.query_params.get('count', '3'))
+    if error_message:
+        return Response({'error': error_message}, status=status.HTTP_400_BAD_REQUEST)
+
+    provider = None
+    if 'provider' in request.query_params:
+        provider_id = parse_provider_id(request.query_params['provider'])
+        if provider_id is not None:
+            provider = Provider.objects.filter(is_active=True, id=provider_id).first()
+        if provider is None:
+            return Response({'error': 'Unknown provider'}, status=status.HTTP_400_BAD_REQUEST)
+
+    slots, searched_until = find_next_available(start, count, provider)
+    return Response({
+        'slots': [{'date': day.isoformat(), 'time_slot': label} for day, label in slots],
+        'searched_until': searched_until.isoformat()
+    })
+
+def parse_search_start(start_str):
+    """Validate the 'from' parameter, returning a ((date, minute of the day), error_message) tuple."""
+    if not start_str:
+        return None, 'From parameter is required'
+    try:
+        start = datetime.fromisoformat(start_str)
+    except ValueError:
+        return None, 'From must be a date (YYYY-MM-DD) or date and time (YYYY-MM-DDTHH:MM)'
+    return (start.date(), start.hour * 60 + start.minute), ''
+
+def is_number(text):
+    """Whether text is a non-negative integer in ASCII digits, which int() always accepts."""
+    # str.isdigit() alone also accepts digits such as '²' that int() rejects
+    return text.isascii() and text.isdigit()
+
+def parse_count(count_str):
+    """Validate the 'count' parameter, returning a (count, error_message) tuple."""
+    if not is_number(count_str) or not 1 <= int(count_str) <= MAX_NEXT_AVAILABLE:
+        return None, f'Count must be a number between 1 and {MAX_NEXT_AVAILABLE}'
+    return int(count_str), ''
+
+def find_next_available(start, count, provider=None):
+    """
+    Return ([(date, label), ...], last date searched) for the first count free
+    slots at or after start, a (date, minute of the day) pair. Searches from
+    an earlier start begin at archive_cutoff(), the first date that can be
+    booked (see clean_slot_data()).
+
+    Dates are loaded NEXT_AVAILABLE_CHUNK_DAYS at a time through the
+    availability cache and the search ends after NEXT_AVAILABLE_HORIZON_DAYS,
+    or at the last representable date.
+    """
+    first_day, first_minute = max(start, (archive_cutoff(), 0))
+    horizon = min(NEXT_AVAILABLE_HORIZON_DAYS, (date.max - first_day).days + 1)
+    calendar = get_calendar()
+    found = []
+    for offset in range(0, horizon, NEXT_AVAILABLE_CHUNK_DAYS):
+        days = [
+            first_day + timedelta(days=day)
+            for day in range(offset, min(offset + NEXT_AVAILABLE_CHUNK_DAYS, horizon))
+        ]
+        if provider is None:
+            booked_by_date = get_booked_slots_for_dates(days)
+        else:
+            booked_by_date = {
+                day: bookings.get(provider.id, EMPTY)
+                for day, bookings in get_provider_bookings_for_dates(days).items()
+            }
+
+        for day in days:
+            schedule = calendar.schedule_for(day, provider)
+            free = schedule.free(booked_by_date[day])
+            if day == first_day and first_minute:
+                free = free.after(first_minute - 1)
+            found.extend((day, label) for label in schedule.labels(free)[:count - len(found)])
+            if len(found) == count:
+                return found, day
+
+    return found, days[-1]
+
+def parse_provider_ids(providers_str):
+    """
+    Validate the 'providers' parameter, returning a (provider_ids, error_message)
+    tuple where provider_ids is None when the parameter is absent.
+    """
+    if providers_str is None:
+        return None, ''
+    ids = providers_str.split(',')
+    if not all(is_number(provider_id) for provider_id in ids):
+        return None, 'Providers must be a comma separated list of ids'
+    if len(ids) > MAX_PROVIDERS:
+        return None, f'A request cannot list more than {MAX_PROVIDERS} providers'
+    return {int(provider_id) for provider_id in ids if int(provider_id) <= MAX_ID}, ''
 
 @swagger_auto_schema(
     methods=['post'],
+    manual_parameters=[
+        openapi.Parameter(
+            'Idempotency-Key',
+            openapi.IN_HEADER,
+            description="Unique key of this booking attempt; retries with the same key and body get the first response back",
+            type=openapi.TYPE_STRING,
+            required=False,
+            example="4f0c8a5e-6c1b-4f47-9a8e-3b1d2c9e7f10"
+        ),
+    ],
     request_body=openapi.Schema(
         type=openapi.TYPE_OBJECT,
         required=['name', 'phone_number', 'date', 'time_slot'],
@@ -110,6 +575,17 @@ def get_available_slots(request):
             'phone_number': openapi.Schema(type=openapi.TYPE_STRING, example="+1234567890"),
             'date': openapi.Schema(type=openapi.TYPE_STRING, format='date', example="2025-03-09"),
             'time_slot': openapi.Schema(type=openapi.TYPE_STRING, example="10:00 AM"),
+            'provider': openapi.Schema(
+                type=openapi.TYPE_INTEGER,
+                description="Provider id; omit to book on the default schedule",
+                example=1
+            ),
+            'hold': openapi.Schema(
+                type=openapi.TYPE_STRING,
+                format='uuid',
+                description="Token of the caller's hold on this slot (see holds/); the hold is turned into the appointment",
+                example="9b2f3c1e-8a4d-4c6b-9f0e-2d7a5b1c3e4f"
+            ),
         }
     ),
     responses={
@@ -132,9 +608,24 @@ def get_available_slots(request):
                     'error': openapi.Schema(type=openapi.TYPE_STRING)
                 }
             )
+        ),
+        409: openapi.Response(
+            description="Slot already booked or held by someone else",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'error': openapi.Schema(type=openapi.TYPE_STRING),
+                    'next_available_slots': openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(type=openapi.TYPE_STRING)
+                    )
+                }
+            )
         )
     }
 )
+@idempotent
+@json_only
 @api_view(['POST'])
 @csrf_exempt
 def book_appointment(request):
@@ -147,6 +638,8 @@ def book_appointment(request):
         - phone_number: string
         - date: string (YYYY-MM-DD format)
         - time_slot: string (hh:mm AM/PM format)
+        - provider: integer (optional, id of an active provider)
+        - hold: string (optional, token of the caller's hold on the slot)
 
     Returns:
     - JsonResponse with booking confirmation
@@ -162,73 +655,643 @@ def book_appointment(request):
     {
         "error": "error message"
     }
+
+    Conflict Response (409, the slot was taken by another booking, or is
+    held by someone else):
+    {
+        "error": "This slot is already booked",
+        "next_available_slots": ["10:30 AM", "11:00 AM", "11:30 AM"]
+    }
+
+    A request with an Idempotency-Key header is processed once; retries
+    with the same key and body get the stored response back with an
+    Idempotent-Replayed: true header (see booking.idempotency).
+    """
+    if not isinstance(request.data, dict):
+        return Response({'error': 'Request body must be a JSON object'}, status=status.HTTP_400_BAD_REQUEST)
+    providers = load_booking_providers([request.data])
+    calendar = get_calendar()
+    booking, error_message = clean_booking_data(request.data, providers, calendar)
+    if not error_message:
+        hold, error_message = parse_hold_token(request.data.get('hold'))
+    if error_message:
+        return Response({'error': error_message}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Insert directly and let the unique constraints decide concurrent
+    # bookings of the same slot
+    try:
+        appointment = insert_appointment(booking, hold)
+    except (IntegrityError, SlotUnavailable) as e:
+        error = str(e) if isinstance(e, SlotUnavailable) else BOOKED_MESSAGE
+        schedule = calendar.schedule_for(booking['date'], booking['provider'])
+        return Response(slot_taken_data(booking, booked_slots_of(booking), schedule, error), status=status.HTTP_409_CONFLICT)
+    
+    return Response({
+        'success': True,
+        'message': 'Appointment booked successfully',
+        'appointment_id': appointment.id
+    })
+
+def availability_etag(versions, *extra):
+    """
+    Strong ETag for the availability of the dates in a {date: version} map,
+    optionally combined with further strings the response depends on.
+    """
+    parts = [f'{day}:{version}' for day, version in versions.items()]
+    parts.extend(extra)
+    digest = hashlib.sha1('|'.join(parts).encode())
+    return f'"{digest.hexdigest()}"'
+
+def etag_matches(request, etag):
+    """Whether the request's If-None-Match header lists etag."""
+    if_none_match = request.headers.get('If-None-Match')
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return etags == ['*'] or etag in etags
+
+def not_modified_response(etag):
+    return set_availability_caching(HttpResponseNotModified(), etag)
+
+def set_availability_caching(response, etag):
+    """Add the ETag and Cache-Control headers of an availability response."""
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=settings.BOOKING_AVAILABILITY_MAX_AGE)
+    return response
+
+def parse_provider_id(value):
+    """Return the provider id given as an integer or a string of digits, or None."""
+    if isinstance(value, str) and is_number(value):
+        value = int(value)
+    if isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= MAX_ID:
+        return value
+    return None
+
+def booking_provider_ids(items):
+    """Ids of the providers referenced by booking items."""
+    ids = {parse_provider_id(item.get('provider')) for item in items if isinstance(item, dict)}
+    ids.discard(None)
+    return ids
+
+def load_booking_providers(items):
+    """Fetch the active providers referenced by booking items with one query, as {id: Provider}."""
+    ids = booking_provider_ids(items)
+    if not ids:
+        return {}
+    return Provider.objects.filter(is_active=True).in_bulk(ids)
+
+def clean_booking_data(data, providers=None, calendar=None):
+    """
+    Validate the fields of one booking request.
+
+    providers maps the ids of the active providers the request may refer
+    to (see load_booking_providers()) to Provider objects. The time slot is
+    checked against the calendar's schedule for the date (by default the
+    current compiled calendar).
+
+    Returns a (booking, error_message) tuple where booking holds the
+    Appointment field values with a parsed date, the time slot as a
+    minute of the day and the Provider (or None for the default schedule).
     """
+    name = data.get('name')
+    phone_number = data.get('phone_number')
+
+    # Validate required fields
+    if not all([name, phone_number, data.get('date'), data.get('time_slot')]):
+        return None, 'All fields are required'
+
+    slot, error_message = clean_slot_data(data, providers, calendar)
+    if error_message:
+        return None, error_message
+    return {'name': name, 'phone_number': phone_number, **slot}, ''
+
+def clean_slot_data(data, providers=None, calendar=None):
+    """
+    Validate the date, time_slot and provider fields of a booking or hold
+    request (see clean_booking_data()).
+
+    Returns a (slot, error_message) tuple where slot holds the parsed date,
+    the time slot as a minute of the day and the Provider or None.
+    """
+    date_str = data.get('date')
+    time_slot = data.get('time_slot')
+    if not date_str or not time_slot:
+        return None, 'Date and time slot are required'
+
+    # Parse date
     try:
-        data = request.data
-        name = data.get('name')
-        phone_number = data.get('phone_number')
-        date_str = data.get('date')
-        time_slot = data.get('time_slot')
-        
-        # Validate required fields
-        if not all([name, phone_number, date_str, time_slot]):
-            return Response({'error': 'All fields are required'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Parse date
         date = datetime.strptime(date_str, '%Y-%m-%d').date()
-        
-        # Validate time slot
-        is_valid, error_message = is_valid_time_slot(time_slot)
-        if not is_valid:
-            return Response({'error': error_message}, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Check if slot is already booked
-        if Appointment.objects.filter(date=date, time_slot=time_slot).exists():
-            return Response({'error': 'This slot is already booked'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Create appointment
-        appointment = Appointment(
-            name=name,
-            phone_number=phone_number,
-            date=date,
-            time_slot=time_slot
+    except (TypeError, ValueError) as e:
+        return None, str(e)
+    if date < archive_cutoff():
+        # Such dates may have been archived, and only live appointments
+        # are checked when booking
+        return None, PAST_DATE_MESSAGE
+
+    provider = None
+    if data.get('provider') is not None:
+        provider = (providers or {}).get(parse_provider_id(data.get('provider')))
+        if provider is None:
+            return None, 'Unknown provider'
+
+    # Validate time slot against the date's hours and convert it to its minute of the day
+    try:
+        schedule = (calendar or get_calendar()).schedule_for(date, provider)
+        time_slot = schedule.parse(time_slot)
+    except InvalidTimeSlot as e:
+        return None, str(e)
+
+    return {'date': date, 'time_slot': time_slot, 'provider': provider}, ''
+
+def parse_hold_token(value):
+    """Return the UUID of an optional 'hold' field as a (token or None, error_message) tuple."""
+    if value is None:
+        return None, ''
+    try:
+        return uuid.UUID(str(value)), ''
+    except ValueError:
+        return None, 'Invalid hold token'
+
+def insert_appointment(booking, hold=None):
+    """
+    Insert an appointment in its own (nested) transaction, taking over the
+    slot's hold when hold is its token (see holds.claim_slot()).
+
+    Raises IntegrityError when the slot is already booked and
+    SlotUnavailable when somebody else holds it, without breaking a
+    surrounding transaction.
+    """
+    with transaction.atomic():
+        claim_slot(booking, hold)
+        return Appointment.objects.create(**booking)
+
+def booking_key(booking):
+    """(provider id, date, time slot) identifying the slot a booking takes."""
+    provider = booking['provider']
+    return (provider.id if provider is not None else None, booking['date'], booking['time_slot'])
+
+def booked_slots_of(booking):
+    """SlotSet of the booked slots on the booking's date and schedule."""
+    provider = booking['provider']
+    if provider is None:
+        return get_booked_slots(booking['date'])
+    return get_provider_bookings_for_dates([booking['date']])[booking['date']].get(provider.id, EMPTY)
+
+def slot_taken_data(booking, booked_slots, schedule, error=BOOKED_MESSAGE):
+    """Body of the 409 response for a slot that is booked or held, suggesting the next free slots of schedule that day."""
+    time_slot = booking['time_slot']
+    return {
+        'error': error,
+        'next_available_slots': schedule.next_available(booked_slots | SlotSet([time_slot]), after=time_slot)
+    }
+
+@swagger_auto_schema(
+    methods=['post'],
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        required=['appointments'],
+        properties={
+            'mode': openapi.Schema(
+                type=openapi.TYPE_STRING,
+                enum=list(BULK_MODES),
+                default='atomic',
+                description="'atomic' books all appointments or none, 'best_effort' books every valid one"
+            ),
+            'appointments': openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                max_items=MAX_BULK_APPOINTMENTS,
+                items=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    required=['name', 'phone_number', 'date', 'time_slot'],
+                    properties={
+                        'name': openapi.Schema(type=openapi.TYPE_STRING, example="John Doe"),
+                        'phone_number': openapi.Schema(type=openapi.TYPE_STRING, example="+1234567890"),
+                        'date': openapi.Schema(type=openapi.TYPE_STRING, format='date', example="2025-03-09"),
+                        'time_slot': openapi.Schema(type=openapi.TYPE_STRING, example="10:00 AM"),
+                        'provider': openapi.Schema(type=openapi.TYPE_INTEGER, example=1),
+                    }
+                )
+            ),
+        }
+    ),
+    responses={
+        200: openapi.Response(
+            description="Batch processed; see the per-item results",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                    'created': openapi.Schema(type=openapi.TYPE_INTEGER),
+                    'results': openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                'index': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                'status': openapi.Schema(
+                                    type=openapi.TYPE_STRING,
+                                    enum=['created', 'invalid', 'conflict', 'skipped']
+                                ),
+                                'appointment_id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                                'error': openapi.Schema(type=openapi.TYPE_STRING),
+                            }
+                        )
+                    )
+                }
+            )
+        ),
+        400: openapi.Response(
+            description="Bad request, or an atomic batch rejected because of invalid items"
+        ),
+        409: openapi.Response(
+            description="Atomic batch rejected because some slots are already booked or duplicated"
+        )
+    }
+)
+@api_view(['POST'])
+@csrf_exempt
+def bulk_book_appointments(request):
+    """
+    Book a batch of appointments.
+
+    Parameters:
+    - request: HTTP POST request with JSON body containing:
+        - mode: "atomic" (default) or "best_effort"
+        - appointments: list of objects with the same fields as book-appointment
+
+    Returns:
+    - JsonResponse with one result per submitted appointment, in order
+    - The whole batch is validated against the slot tables, checked for
+      duplicates within the batch and against existing bookings with one
+      query, and inserted with a single bulk_create()
+    - In atomic mode nothing is booked unless every item can be booked
+
+    Example Response:
+    {
+        "success": true,
+        "created": 1,
+        "results": [
+            {"index": 0, "status": "created", "appointment_id": 123},
+            {"index": 1, "status": "conflict", "error": "This slot is already booked"}
+        ]
+    }
+
+    Error Response:
+    {
+        "error": "error message"
+    }
+    """
+    try:
+        mode = request.data.get('mode', 'atomic')
+        items = request.data.get('appointments')
+    except AttributeError:
+        return Response({'error': 'Request body must be a JSON object'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if mode not in BULK_MODES:
+        return Response({'error': f"Mode must be one of: {', '.join(BULK_MODES)}"}, status=status.HTTP_400_BAD_REQUEST)
+    if not isinstance(items, list) or not items:
+        return Response({'error': 'Appointments must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > MAX_BULK_APPOINTMENTS:
+        return Response(
+            {'error': f'A batch cannot contain more than {MAX_BULK_APPOINTMENTS} appointments'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    results = [{'index': index} for index in range(len(items))]
+    bookings = {}
+    providers = load_booking_providers(items)
+    calendar = get_calendar()
+
+    # Validate every item and catch duplicates within the batch
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            booking, error_message = None, 'Appointment must be a JSON object'
+        else:
+            booking, error_message = clean_booking_data(item, providers, calendar)
+        if error_message:
+            results[index].update(status='invalid', error=error_message)
+            continue
+
+        key = booking_key(booking)
+        if key in bookings:
+            results[index].update(status='conflict', error=f'Duplicate of appointment {bookings[key][0]} in this batch')
+            continue
+        bookings[key] = (index, booking)
+
+    # Check existing bookings and live holds for all requested dates with one query
+    if bookings:
+        days = {day for _, day, _ in bookings}
+        taken = Appointment.objects.filter(date__in=days).annotate(
+            error=Value(BOOKED_MESSAGE, output_field=CharField())
+        ).values_list('provider_id', 'date', 'time_slot', 'error').union(
+            SlotHold.objects.filter(date__in=days, expires_at__gt=timezone.now()).annotate(
+                error=Value(HELD_MESSAGE, output_field=CharField())
+            ).values_list('provider_id', 'date', 'time_slot', 'error'),
+            all=True
+        )
+        for provider_id, day, time_slot, error in taken:
+            key = (provider_id, day, time_slot)
+            if key in bookings:
+                index, _ = bookings.pop(key)
+                results[index].update(status='conflict', error=error)
+
+    failed = len(items) - len(bookings)
+    if mode == 'atomic' and failed:
+        return bulk_rejected_response(results, bookings)
+
+    try:
+        created = bulk_insert_appointments(bookings.values(), atomic=(mode == 'atomic'))
+    except IntegrityError:
+        # A concurrent booking took one of the slots after the check above
+        for key, (index, _) in bookings.items():
+            results[index].update(status='skipped', error='Batch rejected because of a concurrent booking')
+        return Response({'success': False, 'created': 0, 'results': results}, status=status.HTTP_409_CONFLICT)
+
+    for index, appointment in created.items():
+        if appointment is None:
+            results[index].update(status='conflict', error='This slot is already booked')
+        else:
+            results[index].update(status='created', appointment_id=appointment.id)
+
+    created_count = sum(1 for appointment in created.values() if appointment is not None)
+    return Response({
+        'success': created_count == len(items),
+        'created': created_count,
+        'results': results
+    })
+
+def bulk_rejected_response(results, bookings):
+    """Response for an atomic batch in which some items cannot be booked."""
+    for index, _ in bookings.values():
+        results[index].update(status='skipped', error='Batch rejected because other appointments failed')
+
+    only_conflicts = all(result['status'] in ('conflict', 'skipped') for result in results)
+    return Response(
+        {'success': False, 'created': 0, 'results': results},
+        status=status.HTTP_409_CONFLICT if only_conflicts else status.HTTP_400_BAD_REQUEST
+    )
+
+def bulk_insert_appointments(bookings, atomic):
+    """
+    Insert (index, booking) pairs with one bulk_create() and return {index: Appointment}.
+
+    In best-effort mode a concurrent booking that makes the bulk insert
+    fail is handled by retrying item by item, mapping lost slots to None.
+    In atomic mode the IntegrityError propagates.
+    """
+    bookings = list(bookings)
+    appointments = [Appointment(**booking) for _, booking in bookings]
+
+    try:
+        with transaction.atomic():
+            Appointment.objects.bulk_create(appointments)
+    except IntegrityError:
+        if atomic:
+            raise
+        created = {}
+        for (index, _), appointment in zip(bookings, appointments):
+            appointment.pk = None
+            try:
+                with transaction.atomic():
+                    appointment.save(force_insert=True)
+            except IntegrityError:
+                appointment = None
+            created[index] = appointment
+        return created
+
+    # bulk_create() sends no post_save signals
+    invalidate_on_commit(*{appointment.date for appointment in appointments})
+    for appointment in appointments:
+        publish_on_commit(events.SLOT_TAKEN, appointment.date, appointment.time_slot, appointment.provider_id)
+    return {index: appointment for (index, _), appointment in zip(bookings, appointments)}
+
+@swagger_auto_schema(
+    methods=['post'],
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        required=['date', 'time_slot'],
+        properties={
+            'date': openapi.Schema(type=openapi.TYPE_STRING, format='date', example="2025-03-09"),
+            'time_slot': openapi.Schema(type=openapi.TYPE_STRING, example="10:00 AM"),
+            'provider': openapi.Schema(
+                type=openapi.TYPE_INTEGER,
+                description="Provider id; omit to hold a slot of the default schedule",
+                example=1
+            ),
+        }
+    ),
+    responses={
+        201: openapi.Response(
+            description="Slot held",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'hold': openapi.Schema(type=openapi.TYPE_STRING, format='uuid'),
+                    'date': openapi.Schema(type=openapi.TYPE_STRING, format='date'),
+                    'time_slot': openapi.Schema(type=openapi.TYPE_STRING),
+                    'provider': openapi.Schema(type=openapi.TYPE_INTEGER),
+                    'expires_at': openapi.Schema(type=openapi.TYPE_STRING, format='date-time'),
+                }
+            )
+        ),
+        400: openapi.Response(
+            description="Bad request",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'error': openapi.Schema(type=openapi.TYPE_STRING)
+                }
+            )
+        ),
+        409: openapi.Response(
+            description="Slot already booked or held by someone else",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'error': openapi.Schema(type=openapi.TYPE_STRING),
+                    'next_available_slots': openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Schema(type=openapi.TYPE_STRING)
+                    )
+                }
+            )
         )
-        appointment.save()
-        
-        return Response({
-            'success': True,
-            'message': 'Appointment booked successfully',
-            'appointment_id': appointment.id
-        })
-        
-    except Exception as e:
-        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
-
-def is_valid_time_slot(time_slot):
-    """Validate if the time slot is within business hours."""
+    }
+)
+@json_only
+@api_view(['POST'])
+@csrf_exempt
+def create_hold(request):
+    """
+    Hold a free slot while its booking is completed.
+
+    Parameters:
+    - request: HTTP POST request with JSON body containing:
+        - date: string (YYYY-MM-DD format)
+        - time_slot: string (hh:mm AM/PM format)
+        - provider: integer (optional, id of an active provider)
+
+    Returns:
+    - JsonResponse with the hold token; until expires_at
+      (settings.BOOKING_HOLD_TTL seconds) the slot is not available to
+      anybody else, and book-appointment with the token books it
+
+    Example Response (201):
+    {
+        "hold": "9b2f3c1e-8a4d-4c6b-9f0e-2d7a5b1c3e4f",
+        "date": "2025-03-09",
+        "time_slot": "10:00 AM",
+        "provider": null,
+        "expires_at": "2025-03-08T09:05:00Z"
+    }
+
+    Conflict Response (409, the slot is booked or held):
+    {
+        "error": "This slot is being booked by someone else",
+        "next_available_slots": ["10:30 AM", "11:00 AM", "11:30 AM"]
+    }
+    """
+    if not isinstance(request.data, dict):
+        return Response({'error': 'Request body must be a JSON object'}, status=status.HTTP_400_BAD_REQUEST)
+    calendar = get_calendar()
+    slot, error_message = clean_slot_data(request.data, load_booking_providers([request.data]), calendar)
+    if error_message:
+        return Response({'error': error_message}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        hold = hold_slot(slot)
+    except SlotUnavailable as e:
+        schedule = calendar.schedule_for(slot['date'], slot['provider'])
+        return Response(slot_taken_data(slot, booked_slots_of(slot), schedule, str(e)), status=status.HTTP_409_CONFLICT)
+
+    return Response({
+        'hold': str(hold.token),
+        'date': hold.date.isoformat(),
+        'time_slot': hold.time_slot_label,
+        'provider': hold.provider_id,
+        'expires_at': hold.expires_at.isoformat(),
+    }, status=status.HTTP_201_CREATED)
+
+@swagger_auto_schema(
+    methods=['delete'],
+    responses={
+        204: openapi.Response(description="Hold released"),
+        404: openapi.Response(description="No hold with this token"),
+    }
+)
+@json_only
+@api_view(['DELETE'])
+@csrf_exempt
+def release_slot_hold(request, token):
+    """
+    Release a hold, making its slot available again at once.
+
+    Parameters:
+    - token: the hold token returned by holds/
+    """
+    if not release_hold(token):
+        return Response({'error': 'Hold not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+@swagger_auto_schema(
+    methods=['get'],
+    manual_parameters=[
+        openapi.Parameter(
+            'start',
+            openapi.IN_QUERY,
+            description="First date to export in YYYY-MM-DD format",
+            type=openapi.TYPE_STRING,
+            required=True,
+            example="2025-03-01"
+        ),
+        openapi.Parameter(
+            'end',
+            openapi.IN_QUERY,
+            description="Last date to export in YYYY-MM-DD format",
+            type=openapi.TYPE_STRING,
+            required=True,
+            example="2025-03-31"
+        ),
+        openapi.Parameter(
+            'format',
+            openapi.IN_QUERY,
+            description="Export format",
+            type=openapi.TYPE_STRING,
+            enum=list(EXPORT_FORMATS),
+            default='csv',
+            required=False
+        ),
+        openapi.Parameter(
+            'gzip',
+            openapi.IN_QUERY,
+            description="Send the file gzip compressed",
+            type=openapi.TYPE_BOOLEAN,
+            default=False,
+            required=False
+        ),
+    ],
+    responses={
+        200: openapi.Response(description="The appointments of the range as a CSV or NDJSON file, by date and slot"),
+        400: openapi.Response(
+            description="Bad request",
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'error': openapi.Schema(type=openapi.TYPE_STRING)
+                }
+            )
+        ),
+        403: openapi.Response(description="Not a staff user"),
+    }
+)
+@json_only
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_appointments(request):
+    """
+    Export the appointments of a date range, live and archived, for staff users.
+
+    Parameters:
+    - request: HTTP GET request with 'start' and 'end' parameters
+      (YYYY-MM-DD format, inclusive), 'format' ("csv" or "ndjson") and
+      'gzip' ("true" to compress)
+
+    Returns:
+    - A streamed file attachment with one row per appointment: id, date,
+      time_slot, provider_id, name, phone_number, created_at. Rows are read
+      and encoded in chunks (see booking.export), so any range can be
+      exported in constant memory.
+    """
+    params = request.query_params
     try:
-        # Convert time slot string to datetime object for comparison
-        slot_time = datetime.strptime(time_slot, '%I:%M %p')
-        
-        # Define business hours
-        business_start = datetime.strptime('10:00 AM', '%I:%M %p')
-        business_end = datetime.strptime('5:00 PM', '%I:%M %p')
-        lunch_start = datetime.strptime('1:00 PM', '%I:%M %p')
-        lunch_end = datetime.strptime('2:00 PM', '%I:%M %p')
-        
-        # Check if time is within business hours
-        if not (business_start <= slot_time < business_end):
-            return False, "Appointments are only available between 10:00 AM and 5:00 PM"
-            
-        # Check if time is during lunch break
-        if lunch_start <= slot_time < lunch_end:
-            return False, "Appointments are not available during lunch hour (1:00 PM - 2:00 PM)"
-            
-        # Check if time is at 30-minute intervals
-        minutes = slot_time.hour * 60 + slot_time.minute
-        if minutes % 30 != 0:
-            return False, "Appointments must be scheduled at 30-minute intervals"
-            
-        return True, ""
+        start = datetime.strptime(params.get('start') or '', '%Y-%m-%d').date()
+        end = datetime.strptime(params.get('end') or '', '%Y-%m-%d').date()
     except ValueError:
-        return False, "Invalid time format. Please use format like '10:00 AM'"
\ No newline at end of file
+        return Response({'error': 'Start and end dates are required in YYYY-MM-DD format'}, status=status.HTTP_400_BAD_REQUEST)
+    if start > end:
+        return Response({'error': 'End date must not be before start date'}, status=status.HTTP_400_BAD_REQUEST)
+
+    export_format = params.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return Response({'error': f"Format must be one of: {', '.join(EXPORT_FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
+    compress = params.get('gzip', '').lower() in ('1', 'true')
+
+    response = StreamingHttpResponse(
+        export_chunks(export_rows(start, end), export_format, compress),
+        content_type='application/gzip' if compress else EXPORT_FORMATS[export_format]
+    )
+    filename = export_filename(start, end, export_format, compress)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+def is_valid_time_slot(time_slot, day=None, provider=None):
+    """
+    Validate if the time slot is within business hours: the calendar's hours
+    of day (and provider) when a date is given, the default hours otherwise.
+    """
+    schedule = get_calendar().schedule_for(day, provider) if day is not None else DEFAULT_SCHEDULE
+    try:
+        schedule.normalize(time_slot)
+    except InvalidTimeSlot as e:
+        return False, str(e)
+    return True, ""
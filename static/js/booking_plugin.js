@@ -147,6 +147,7 @@
         // Fetch available slots when date changes
         dateInput.addEventListener('change', function() {
             fetchAvailableSlots(dateInput.value);
+            watchSlotEvents(dateInput.value);
         });
 
         // Handle form submission
@@ -155,22 +156,37 @@
             bookAppointment();
         });
 
+        // Per-day availability, filled a month at a time from the range API
+        const availabilityCache = {};
+
         // Function to fetch available slots
         function fetchAvailableSlots(date) {
-            slotsContainer.innerHTML = '<p>Loading available slots...</p>';
-            
-            fetch(`${apiBaseUrl}/api/v1/available-slots/?date=${date}`)
+            // Show what is known at once, but always revalidate: only the
+            // watched date is kept up to date by slot events
+            if (availabilityCache[date]) {
+                showAvailableSlots(availabilityCache[date]);
+            } else {
+                slotsContainer.innerHTML = '<p>Loading available slots...</p>';
+            }
+
+            // Load the whole month containing the selected date in one request
+            const [year, month] = date.split('-').map(Number);
+            const lastDay = new Date(Date.UTC(year, month, 0)).getUTCDate();
+            const monthPrefix = `${year}-${String(month).padStart(2, '0')}`;
+            const start = `${monthPrefix}-01`;
+            const end = `${monthPrefix}-${String(lastDay).padStart(2, '0')}`;
+
+            // Always revalidate: unchanged months are answered with a cheap 304
+            fetch(`${apiBaseUrl}/api/v1/available-slots/?start=${start}&end=${end}`, { cache: 'no-cache' })
                 .then(response => response.json())
                 .then(data => {
                     if (data.error) {
                         throw new Error(data.error);
                     }
-                    
-                    if (data.available_slots && data.available_slots.length > 0) {
-                        renderTimeSlots(data.available_slots);
-                    } else {
-                        slotsContainer.innerHTML = '<p>No available slots for this date</p>';
-                        submitButton.disabled = true;
+
+                    Object.assign(availabilityCache, data.days);
+                    if (date === dateInput.value) {
+                        showAvailableSlots(availabilityCache[date] || []);
                     }
                 })
                 .catch(error => {
@@ -179,12 +195,96 @@
                 });
         }
 
+        // Live updates for the selected date, pushed with Server-Sent Events
+        let slotEvents = null;
+        // Without a stream (no EventSource, or a server that answers 204
+        // because it does not run under ASGI) the selected date is refetched
+        let slotPolling = null;
+        const POLL_MILLISECONDS = 30000;
+
+        function pollSlots(date) {
+            slotPolling = setInterval(function() {
+                if (dateInput.value === date) {
+                    fetchAvailableSlots(date);
+                }
+            }, POLL_MILLISECONDS);
+        }
+
+        function watchSlotEvents(date) {
+            if (slotEvents) {
+                slotEvents.close();
+                slotEvents = null;
+            }
+            clearInterval(slotPolling);
+            slotPolling = null;
+            if (!date) {
+                return;
+            }
+            if (!window.EventSource) {
+                pollSlots(date);
+                return;
+            }
+
+            const source = new EventSource(`${apiBaseUrl}/api/v1/slot-events/?date=${date}`);
+            slotEvents = source;
+
+            slotEvents.addEventListener('error', function() {
+                // EventSource reconnects by itself unless the stream is refused
+                if (slotEvents === source && source.readyState === EventSource.CLOSED) {
+                    slotEvents = null;
+                    pollSlots(date);
+                }
+            });
+
+            slotEvents.addEventListener('slot_taken', function(e) {
+                const event = JSON.parse(e.data);
+                if (event.provider !== null) {
+                    // The widget books on the default schedule only
+                    return;
+                }
+                if (availabilityCache[event.date]) {
+                    availabilityCache[event.date] = availabilityCache[event.date].filter(slot => slot !== event.time_slot);
+                }
+                if (event.date === dateInput.value) {
+                    const timeSlotInput = document.getElementById('booking-time-slot');
+                    if (timeSlotInput.value === event.time_slot) {
+                        timeSlotInput.value = '';
+                        submitButton.disabled = true;
+                    }
+                    showAvailableSlots(availabilityCache[event.date] || []);
+                }
+            });
+
+            slotEvents.addEventListener('slot_freed', function(e) {
+                const event = JSON.parse(e.data);
+                if (event.provider !== null) {
+                    // The widget books on the default schedule only
+                    return;
+                }
+                delete availabilityCache[event.date];
+                if (event.date === dateInput.value) {
+                    fetchAvailableSlots(event.date);
+                }
+            });
+        }
+
+        // Function to show the available slots of one day
+        function showAvailableSlots(slots) {
+            if (slots.length > 0) {
+                renderTimeSlots(slots);
+            } else {
+                slotsContainer.innerHTML = '<p>No available slots for this date</p>';
+                submitButton.disabled = true;
+            }
+        }
+
         // Function to render time slots
         function renderTimeSlots(slots) {
+            const selectedSlot = document.getElementById('booking-time-slot').value;
             slotsContainer.innerHTML = '';
             slots.forEach(slot => {
                 const slotElement = document.createElement('div');
-                slotElement.className = 'booking-slot';
+                slotElement.className = slot === selectedSlot ? 'booking-slot selected' : 'booking-slot';
                 slotElement.textContent = slot;
                 slotElement.addEventListener('click', function() {
                     // Remove selected class from all slots
@@ -226,11 +326,20 @@
             })
             .then(response => response.json())
             .then(data => {
+                // Availability for the booked date has changed either way
+                delete availabilityCache[formData.date];
+
                 if (data.error) {
-                    showMessage(data.error, false);
+                    let message = data.error;
+                    if (data.next_available_slots && data.next_available_slots.length > 0) {
+                        message += `. Next available: ${data.next_available_slots.join(', ')}`;
+                    }
+                    showMessage(message, false);
+                    fetchAvailableSlots(formData.date);
                 } else {
                     showMessage('Appointment booked successfully!', true);
                     form.reset();
+                    watchSlotEvents(null);
                     slotsContainer.innerHTML = '<p>Select a date to see available time slots</p>';
                 }
                 submitButton.textContent = 'Book Appointment';